@@ -47,6 +47,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'ask.identity.IdentityMapMiddleware',
+    'ask.replicas.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -70,22 +72,85 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'QaA.wsgi.application'
+ASGI_APPLICATION = 'QaA.asgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
+# connections are taken from pool of each worker process instead of being
+# opened for every request, see ask.db.pool for POOL options; CONN_MAX_AGE
+# stays 0, so connection goes back to pool at the end of request
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'ask.db.backends.postgresql',
         'NAME': 'postgres',
         'USER': 'postgres',
         'PASSWORD': 'qwerty1234',
         'HOST': '127.0.0.1',
         'PORT': 5432,
-    }
+        'POOL': {
+            'MAX_SIZE': 10,
+            'TIMEOUT': 10,
+            'MAX_IDLE': 5 * 60,
+            'MAX_LIFETIME': 60 * 60,
+            'STATS_INTERVAL': 60,
+        },
+    },
+    # streaming replica of default, tests use default in its place
+    'replica': {
+        'ENGINE': 'ask.db.backends.postgresql',
+        'NAME': 'postgres',
+        'USER': 'postgres',
+        'PASSWORD': 'qwerty1234',
+        'HOST': '127.0.0.1',
+        'PORT': 5432,
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
 }
 
+# read-only queries of views with ReplicaReadsMixIn go to one of replicas,
+# writes and transactions to default
+DATABASE_ROUTERS = ['ask.replicas.ReplicaRouter']
+DATABASE_REPLICAS = ['replica']
+# seconds browser reads from default after its request wrote something, and
+# fragments are not cached from replicas after invalidation; should exceed
+# replication lag
+REPLICA_STICKINESS = 10
+
+DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
+
+# async views run independent queries of one request at the same time, each
+# in own thread and database connection; with False they run one by one
+CONCURRENT_LOOKUPS = True
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+# cached fragments are invalidated by changing version keys, with more than
+# one worker process use backend shared between them, e.g. memcached
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # sessions are not evicted by fragments
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
+    },
+}
+
+# sessions are read from cache and written through to database, so page
+# view of logged in user does no session query; with
+# 'django.contrib.sessions.backends.signed_cookies' they are kept only in
+# browser. Session is saved only when it changed.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+SESSION_SAVE_EVERY_REQUEST = False
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -124,6 +189,28 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/2.2/howto/static-files/
 
 STATIC_URL = '/static/'
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+# collectstatic builds bundles, fingerprints files and writes precompressed
+# siblings, see ask.staticfiles
+STATICFILES_STORAGE = 'ask.staticfiles.BundledManifestStorage'
+
+# stylesheets of every page concatenated into one file
+STYLESHEET_BUNDLES = {
+    'base': ['ask/login_bar.css'],
+    'login': ['ask/login.css'],
+    'signup': ['ask/signup.css'],
+    'navigation_bar': ['ask/login_bar.css', 'ask/navigation_bar.css'],
+    'profile': ['ask/login_bar.css', 'ask/navigation_bar.css',
+                'ask/questions.css', 'ask/profile.css'],
+    'friends': ['ask/login_bar.css', 'ask/navigation_bar.css',
+                'ask/questions.css', 'ask/friends.css'],
+    'user': ['ask/login_bar.css', 'ask/navigation_bar.css',
+             'ask/questions.css', 'ask/user.css'],
+    'unanswered': ['ask/login_bar.css', 'ask/navigation_bar.css',
+                   'ask/questions.css', 'ask/unanswered.css'],
+    'settings': ['ask/login_bar.css', 'ask/navigation_bar.css',
+                 'ask/questions.css', 'ask/settings.css'],
+}
 
 LOGIN_REDIRECT_URL = '/ask/profile'
 
@@ -135,3 +222,32 @@ EMAIL_PORT = 1025
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# worker processes rendering avatar thumbnails, 0 renders them in request
+AVATAR_THUMBNAIL_WORKERS = 2
+
+# how media files are delivered: 'django' streams them from Django (with
+# zero-copy sendfile when server's wsgi.file_wrapper supports it),
+# 'x-accel-redirect' (nginx) and 'x-sendfile' (Apache, lighttpd) hand them
+# off to front server after checking conditional headers
+MEDIA_DELIVERY = 'django'
+# internal nginx location aliased to MEDIA_ROOT, used by 'x-accel-redirect'
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
+# metrics of connection pool are logged by every worker every
+# POOL['STATS_INTERVAL'] seconds
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'ask.db.pool': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
@@ -5,3 +5,4 @@ admin.site.register(UserModel)
 admin.site.register(FriendsModel)
 admin.site.register(AnswerModel)
 admin.site.register(QuestionModel)
+admin.site.register(OutgoingEmailModel)
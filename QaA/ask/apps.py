@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class AskConfig(AppConfig):
     name = 'ask'
+
+    def ready(self):
+        from . import signals
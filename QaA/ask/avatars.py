@@ -0,0 +1,56 @@
+import posixpath
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import AVATAR_DIRECTORY, UserModel
+from .storage import avatar_storage
+from .thumbnails import thumbnail_names
+
+# files younger than that are kept, their user could still be saving them
+GRACE_PERIOD = timedelta(hours=1)
+# directories of avatars stored before they were content addressed
+LEGACY_DIRECTORY_PREFIX = 'user_id_'
+
+
+def referenced_files():
+    names = set()
+    avatars = UserModel.objects.exclude(avatar='').exclude(
+        avatar=None).values_list('avatar', flat=True)
+    for name in avatars.iterator():
+        names.add(name)
+        names.update(thumbnail_names(name))
+    return names
+
+
+def avatar_files():
+    # every file in avatar directory and in legacy per user directories
+    directories = [AVATAR_DIRECTORY]
+    if avatar_storage.exists(''):
+        directories += [directory for directory in avatar_storage.listdir('')[0]
+                        if directory.startswith(LEGACY_DIRECTORY_PREFIX)]
+    while directories:
+        directory = directories.pop()
+        if not avatar_storage.exists(directory):
+            continue
+        subdirectories, files = avatar_storage.listdir(directory)
+        directories += [posixpath.join(directory, subdirectory)
+                        for subdirectory in subdirectories]
+        for name in files:
+            yield posixpath.join(directory, name)
+
+
+def sweep_avatars(grace_period=GRACE_PERIOD):
+    # deletes avatars and thumbnails no user refers to anymore,
+    # returns names of deleted files
+    deadline = timezone.now() - grace_period
+    referenced = referenced_files()
+    deleted = []
+    for name in avatar_files():
+        if name in referenced:
+            continue
+        if avatar_storage.get_modified_time(name) > deadline:
+            continue
+        avatar_storage.delete(name)
+        deleted.append(name)
+    return deleted
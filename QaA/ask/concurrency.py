@@ -0,0 +1,43 @@
+import asyncio
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+
+async def run(function, *args, **kwargs):
+    # blocking call (ORM, session, template rendering) of async view; runs
+    # in thread of request, which owns its database connection
+    return await sync_to_async(function)(*args, **kwargs)
+
+
+async def lookup(function, *args, **kwargs):
+    # independent blocking call, runs in own thread with own database
+    # connection, so lookups awaited together query at the same time
+    if not await run(concurrency_allowed):
+        return await run(function, *args, **kwargs)
+    return await sync_to_async(in_own_connection, thread_sensitive=False)(
+        partial(function, *args, **kwargs))
+
+
+async def gather(*calls):
+    # runs calls without arguments as concurrent lookups, results are
+    # returned in order of calls
+    return await asyncio.gather(*(lookup(call) for call in calls))
+
+
+def concurrency_allowed():
+    # other connections do not see changes of not yet committed transaction
+    # (e.g. ATOMIC_REQUESTS or tests), then lookups run in request's thread
+    return settings.CONCURRENT_LOOKUPS and not connection.in_atomic_block
+
+
+def in_own_connection(call):
+    # connection of worker thread is reused until it gets older than
+    # CONN_MAX_AGE, like connection of sync request
+    close_old_connections()
+    try:
+        return call()
+    finally:
+        close_old_connections()
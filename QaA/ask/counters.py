@@ -0,0 +1,67 @@
+from collections import Counter
+
+from django.db.models import Count, F
+
+from .identity import forget_users
+from .navigation import bump_navigation_version
+from .models import FriendsModel, QuestionModel, UserModel
+
+COUNTERS = ('num_unanswered', 'num_invites')
+
+
+def change_counter(counter, deltas):
+    # deltas maps user id to value added to counter, users with the same
+    # delta are updated with single UPDATE statement
+    by_delta = {}
+    for user_id, delta in deltas.items():
+        if delta != 0:
+            by_delta.setdefault(delta, []).append(user_id)
+    for delta, user_ids in by_delta.items():
+        UserModel.objects.filter(pk__in=user_ids).update(
+            **{counter: F(counter) + delta})
+        forget_users(user_ids)
+        bump_navigation_version(user_ids)
+
+
+def count_unanswered(user_ids=None):
+    questions = QuestionModel.objects.filter(answer=None)
+    if user_ids is not None:
+        questions = questions.filter(owner__in=user_ids)
+    rows = questions.values('owner').annotate(n=Count('id'))
+    return Counter({row['owner']: row['n'] for row in rows})
+
+
+def count_invites(user_ids=None):
+    invites = FriendsModel.objects.filter(accepted=False)
+    counts = Counter()
+    for side in ('first', 'second'):
+        side_invites = invites
+        if user_ids is not None:
+            side_invites = invites.filter(**{side + '__in': user_ids})
+        rows = side_invites.values(side).annotate(n=Count('id'))
+        counts.update({row[side]: row['n'] for row in rows})
+    return counts
+
+
+def rebuild_counters(user_ids=None, batch_size=1000):
+    expected = {
+        'num_unanswered': count_unanswered(user_ids),
+        'num_invites': count_invites(user_ids),
+    }
+    users = UserModel.objects.only('id', *COUNTERS).order_by('id')
+    if user_ids is not None:
+        users = users.filter(pk__in=user_ids)
+
+    changed = []
+    for user in users.iterator(chunk_size=batch_size):
+        drifted = False
+        for counter in COUNTERS:
+            value = expected[counter][user.id]
+            if getattr(user, counter) != value:
+                setattr(user, counter, value)
+                drifted = True
+        if drifted:
+            changed.append(user)
+    UserModel.objects.bulk_update(changed, COUNTERS, batch_size=batch_size)
+    bump_navigation_version(user.id for user in changed)
+    return changed
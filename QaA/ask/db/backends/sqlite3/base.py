@@ -0,0 +1,12 @@
+from django.db.backends.sqlite3 import base
+
+from ...pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    # local stand-in for pooled PostgreSQL backend
+
+    def pooled(self):
+        # Django never closes connection of in-memory database (that would
+        # drop the database), so it would never go back to pool
+        return not self.is_in_memory_db()
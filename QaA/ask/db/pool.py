@@ -0,0 +1,329 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from functools import partial
+
+from django.db.utils import OperationalError
+
+logger = logging.getLogger(__name__)
+
+# DATABASES[alias]['POOL'] options, see README
+POOL_DEFAULTS = {
+    # open connections per worker process, idle and checked out together
+    'MAX_SIZE': 10,
+    # seconds request waits for free connection before PoolTimeout
+    'TIMEOUT': 10,
+    # idle connections are closed after that many seconds
+    'MAX_IDLE': 5 * 60,
+    # connections are replaced after that many seconds, so server side
+    # memory of long living backends is released
+    'MAX_LIFETIME': 60 * 60,
+    # seconds between logged metrics of each worker, None disables them
+    'STATS_INTERVAL': 60,
+}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class PooledConnection:
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created = time.monotonic()
+        self.released = self.created
+
+
+def ping(connection):
+    # health check run on checkout; rollback ends transaction SELECT could
+    # start when connection is not in autocommit mode
+    cursor = connection.cursor()
+    try:
+        cursor.execute('SELECT 1')
+    finally:
+        cursor.close()
+    connection.rollback()
+
+
+class ConnectionPool:
+    # connections of one worker process shared by its threads; checkout
+    # waits when MAX_SIZE connections are in use, idle and old connections
+    # are closed on next checkout or release
+
+    def __init__(self, connect, name='default', max_size=10, timeout=10,
+                 max_idle=300, max_lifetime=3600, stats_interval=None,
+                 check=ping):
+        self.connect = connect
+        self.name = name
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.stats_interval = stats_interval
+        self.check = check
+
+        self.condition = threading.Condition()
+        # most recently released on the right, checkout takes it so rarely
+        # used connections on the left reach MAX_IDLE and are closed
+        self.idle = deque()
+        self.in_use = {}
+        self.opening = 0
+
+        self.started = self.changed = self.reported = time.monotonic()
+        self.busy_time = 0.0
+        self.counters = dict.fromkeys((
+            'checkouts', 'waits', 'timeouts', 'connects', 'failed_checks',
+            'recycled', 'discarded'), 0)
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.peak_in_use = 0
+
+    @property
+    def size(self):
+        return len(self.idle) + len(self.in_use) + self.opening
+
+    def acquire(self):
+        started = time.monotonic()
+        while True:
+            entry = self.checkout(started)
+            if entry is None:
+                entry = self.open()
+            elif not self.healthy(entry):
+                self.discard(entry, 'failed_checks')
+                continue
+            with self.condition:
+                self.track_busy_time()
+                self.in_use[id(entry.connection)] = entry
+                self.peak_in_use = max(self.peak_in_use, len(self.in_use))
+                self.record_checkout(time.monotonic() - started)
+            return entry.connection
+
+    def checkout(self, started):
+        # idle connection or None when new one may be opened
+        expired = []
+        try:
+            with self.condition:
+                waited = False
+                while True:
+                    expired.extend(self.expired_idle())
+                    if self.idle:
+                        return self.idle.pop()
+                    if self.size < self.max_size:
+                        self.opening += 1
+                        return None
+                    remaining = started + self.timeout - time.monotonic()
+                    if remaining <= 0:
+                        self.counters['timeouts'] += 1
+                        raise PoolTimeout(
+                            'No connection of pool "{}" was released in {} '
+                            'seconds'.format(self.name, self.timeout))
+                    if not waited:
+                        self.counters['waits'] += 1
+                        waited = True
+                    self.condition.wait(remaining)
+        finally:
+            self.close_connections(expired)
+
+    def open(self):
+        try:
+            connection = self.connect()
+        except BaseException:
+            with self.condition:
+                self.opening -= 1
+                self.condition.notify()
+            raise
+        with self.condition:
+            self.opening -= 1
+            self.counters['connects'] += 1
+        return PooledConnection(connection)
+
+    def healthy(self, entry):
+        try:
+            self.check(entry.connection)
+        except Exception:
+            return False
+        return True
+
+    def release(self, connection):
+        # connection goes back to pool, or is closed when its transaction
+        # cannot be rolled back
+        with self.condition:
+            self.track_busy_time()
+            entry = self.in_use.pop(id(connection), None)
+        if entry is None:
+            # opened by other pool, e.g. of parent process before fork
+            self.close_connections([PooledConnection(connection)])
+            return
+        try:
+            connection.rollback()
+        except Exception:
+            self.discard(entry, 'discarded')
+            return
+
+        entry.released = time.monotonic()
+        with self.condition:
+            if self.is_expired(entry, entry.released):
+                recycled = [entry]
+                self.counters['recycled'] += 1
+            else:
+                recycled = []
+                self.idle.append(entry)
+            self.condition.notify()
+            report = self.stats_due()
+        self.close_connections(recycled)
+        if report:
+            self.log_stats()
+
+    def discard(self, entry, reason):
+        with self.condition:
+            self.counters[reason] += 1
+            self.condition.notify()
+        self.close_connections([entry])
+
+    def expired_idle(self):
+        # called with condition held
+        now = time.monotonic()
+        expired = []
+        while self.idle and self.is_expired(self.idle[0], now):
+            expired.append(self.idle.popleft())
+        for entry in [entry for entry in self.idle
+                      if now - entry.created >= self.max_lifetime]:
+            self.idle.remove(entry)
+            expired.append(entry)
+        self.counters['recycled'] += len(expired)
+        return expired
+
+    def is_expired(self, entry, now):
+        return (now - entry.released >= self.max_idle or
+                now - entry.created >= self.max_lifetime)
+
+    def close_connections(self, entries):
+        for entry in entries:
+            try:
+                entry.connection.close()
+            except Exception:
+                pass
+
+    def close(self):
+        # closes idle connections, checked out ones are closed on release
+        with self.condition:
+            idle = list(self.idle)
+            self.idle.clear()
+            self.max_idle = 0
+        self.close_connections(idle)
+
+    def track_busy_time(self):
+        # called with condition held; integral of connections in use over
+        # time, utilisation is its share of MAX_SIZE connections
+        now = time.monotonic()
+        self.busy_time += len(self.in_use) * (now - self.changed)
+        self.changed = now
+
+    def record_checkout(self, wait_time):
+        self.counters['checkouts'] += 1
+        self.wait_time += wait_time
+        self.max_wait_time = max(self.max_wait_time, wait_time)
+
+    def stats_due(self):
+        if self.stats_interval is None:
+            return False
+        now = time.monotonic()
+        if now - self.reported < self.stats_interval:
+            return False
+        self.reported = now
+        return True
+
+    def stats(self):
+        with self.condition:
+            self.track_busy_time()
+            elapsed = self.changed - self.started
+            checkouts = self.counters['checkouts']
+            stats = dict(self.counters)
+            stats.update({
+                'max_size': self.max_size,
+                'size': self.size,
+                'in_use': len(self.in_use),
+                'idle': len(self.idle),
+                'peak_in_use': self.peak_in_use,
+                'utilisation': (self.busy_time / (elapsed * self.max_size)
+                                if elapsed else 0.0),
+                'wait_time': self.wait_time,
+                'average_wait_time': (self.wait_time / checkouts
+                                      if checkouts else 0.0),
+                'max_wait_time': self.max_wait_time,
+            })
+        return stats
+
+    def log_stats(self):
+        stats = self.stats()
+        logger.info(
+            'pool %s of worker %s: %s/%s in use (peak %s), utilisation '
+            '%.0f%%, %s checkouts, %s waited (average %.1f ms, max %.1f ms), '
+            '%s timeouts, %s connects, %s recycled, %s failed checks',
+            self.name, os.getpid(), stats['in_use'], stats['max_size'],
+            stats['peak_in_use'], stats['utilisation'] * 100,
+            stats['checkouts'], stats['waits'],
+            stats['average_wait_time'] * 1000, stats['max_wait_time'] * 1000,
+            stats['timeouts'], stats['connects'], stats['recycled'],
+            stats['failed_checks'])
+
+
+def connection_pool(alias, create=None):
+    # pools belong to process, forked workers create their own
+    key = (alias, os.getpid())
+    with _pools_lock:
+        if key not in _pools and create is not None:
+            _pools[key] = create()
+        return _pools.get(key)
+
+
+def pool_stats():
+    # metrics of pools of current worker process by database alias
+    pid = os.getpid()
+    with _pools_lock:
+        pools = {alias: pool for (alias, key_pid), pool in _pools.items()
+                 if key_pid == pid}
+    return {alias: pool.stats() for alias, pool in pools.items()}
+
+
+class PooledDatabaseWrapperMixin:
+    # database backend taking connections from pool instead of opening
+    # them; Django closes connection at the end of request (CONN_MAX_AGE
+    # should stay 0) and close returns it to pool
+
+    def pooled(self):
+        return True
+
+    def get_new_connection(self, conn_params):
+        if not self.pooled():
+            return super().get_new_connection(conn_params)
+        pool = connection_pool(
+            self.alias, partial(self.create_pool, conn_params))
+        return pool.acquire()
+
+    def create_pool(self, conn_params):
+        options = dict(POOL_DEFAULTS, **self.settings_dict.get('POOL', {}))
+        return ConnectionPool(
+            partial(super().get_new_connection, conn_params),
+            name=self.alias,
+            max_size=options['MAX_SIZE'],
+            timeout=options['TIMEOUT'],
+            max_idle=options['MAX_IDLE'],
+            max_lifetime=options['MAX_LIFETIME'],
+            stats_interval=options['STATS_INTERVAL'])
+
+    def _close(self):
+        if self.connection is None:
+            return
+        pool = connection_pool(self.alias) if self.pooled() else None
+        if pool is None:
+            with self.wrap_database_errors:
+                self.connection.close()
+        else:
+            pool.release(self.connection)
@@ -29,6 +29,18 @@ class EmailField(forms.EmailField):
             raise forms.ValidationError("Email address already taken")
 
 
+class IntegerListField(forms.Field):
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        if not value:
+            return []
+        try:
+            return [int(v) for v in value]
+        except (TypeError, ValueError):
+            raise forms.ValidationError("Enter a list of whole numbers")
+
+
 class SpecialCharactersValidator:
     special_characters = ['@', '!', '#', '$', '%', '^', '&', '*', ]
 
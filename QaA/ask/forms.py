@@ -50,11 +50,20 @@ class QuestionForm(forms.Form):
                  ])
 
 
+class BroadcastQuestionForm(forms.Form):
+    question_content = forms.CharField(max_length=1000, required=True)
+    # ids of friends to ask, all friends are asked when empty
+    recipients = IntegerListField(required=False)
+
+
 class AnswerForm(forms.Form):
     answer_content = forms.CharField(max_length=1000, required=True)
     question_id = forms.IntegerField(required=True)
 
 
+AnswerFormSet = forms.formset_factory(AnswerForm, max_num=100, validate_max=True)
+
+
 class FriendAcceptedForm(forms.Form):
     user_id = forms.IntegerField(required=True)
 
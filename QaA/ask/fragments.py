@@ -0,0 +1,94 @@
+import time
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from .replicas import reads_from_replica
+
+# concurrent misses wait for the first renderer at most that many seconds
+LOCK_TIMEOUT = 10
+POLL_INTERVAL = 0.05
+
+
+def bump_versions(key_format, ids):
+    # replaces versions, so fragments rendered for old ones are not used;
+    # inside transaction versions are replaced again after commit, so
+    # fragment rendered from not yet committed state is not reused
+    ids = list(ids)
+    if not ids:
+        return
+    set_new_versions(key_format, ids)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: set_new_versions(key_format, ids))
+
+
+def set_new_versions(key_format, ids):
+    version = new_version()
+    cache.set_many({key_format.format(id): version for id in ids},
+                   timeout=None)
+
+
+def new_version(created=None):
+    # creation time is part of version, see is_recent
+    if created is None:
+        created = time.time()
+    return '{:x}.{}'.format(int(created), uuid4().hex)
+
+
+def is_recent(version):
+    # replicas may not have yet the change that replaced version
+    created = version.partition('.')[0]
+    try:
+        return time.time() - int(created, 16) < settings.REPLICA_STICKINESS
+    except ValueError:
+        return False
+
+
+def get_or_render(version_key, content_key, render, timeout, coalesce=False):
+    # fragment is stored together with version it was rendered for, so
+    # both are fetched with single cache read; returns (fragment, hit)
+    cached = cache.get_many([version_key, content_key])
+    version = cached.get(version_key)
+    content = cached.get(content_key)
+    if version is not None and content is not None and content[0] == version:
+        return content[1], True
+
+    if version is None:
+        # evicted or never bumped, not a recent change
+        version = new_version(created=0)
+        if not cache.add(version_key, version, timeout=None):
+            version = cache.get(version_key, version)
+    if is_recent(version) and reads_from_replica():
+        # fragment could be rendered from replica lagging behind change,
+        # it is not stored until replicas catch up
+        return render(), False
+    if coalesce:
+        return render_once(version, content_key, render, timeout), False
+    fragment = render()
+    cache.set(content_key, (version, fragment), timeout)
+    return fragment, False
+
+
+def render_once(version, content_key, render, timeout):
+    # only one of concurrent misses renders, others wait for its result
+    lock_key = '{}:lock:{}'.format(content_key, version)
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            fragment = render()
+            cache.set(content_key, (version, fragment), timeout)
+        finally:
+            cache.delete(lock_key)
+        return fragment
+
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        content = cache.get(content_key)
+        if content is not None and content[0] == version:
+            return content[1]
+        if cache.get(lock_key) is None:
+            # renderer failed or version was replaced meanwhile
+            break
+    return render()
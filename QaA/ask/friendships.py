@@ -0,0 +1,61 @@
+from django.db.models import (BooleanField, Case, IntegerField, OuterRef, Q,
+                              Subquery, Value, When)
+
+from .models import FriendsModel, UserModel
+
+
+def friends_of(user, accepted=True):
+    # friends in both directions of FriendsModel as single lazy queryset,
+    # annotated with friendship id and date so it can be ordered in database
+    invited = FriendsModel.objects.filter(first=user, accepted=accepted)
+    invited_by = FriendsModel.objects.filter(second=user, accepted=accepted)
+    friendship = FriendsModel.objects.filter(
+        Q(first=user, second=OuterRef('pk')) |
+        Q(first=OuterRef('pk'), second=user)).order_by('id')
+
+    return UserModel.objects.filter(
+        Q(pk__in=invited.values('second')) |
+        Q(pk__in=invited_by.values('first'))
+    ).annotate(
+        invited_by_user=Case(
+            When(pk__in=invited.values('second'), then=Value(True)),
+            default=Value(False), output_field=BooleanField()),
+        friendship_id=Subquery(friendship.values('id')[:1]),
+        friendship_date=Subquery(friendship.values('date')[:1]),
+    ).order_by('-invited_by_user', 'friendship_id')
+
+
+def search_friends(user, text):
+    # case insensitive substring match, usernames starting with text first;
+    # on PostgreSQL it is served by trigram index on UPPER(username)
+    return friends_of(user).filter(username__icontains=text).annotate(
+        prefix_match=Case(
+            When(username__istartswith=text, then=Value(1)),
+            default=Value(0), output_field=IntegerField()),
+    ).order_by('-prefix_match', 'username')
+
+
+def neighbours(user):
+    # accepted friends ids as two indexed lookups, on (first, second) unique
+    # constraint and on (second, first) index
+    return (Q(pk__in=FriendsModel.objects.filter(
+                first=user, accepted=True).values('second')) |
+            Q(pk__in=FriendsModel.objects.filter(
+                second=user, accepted=True).values('first')))
+
+
+def mutual_friends(user, other):
+    # intersection of both neighbour sets computed in database, users are
+    # never materialized in Python
+    return UserModel.objects.filter(
+        neighbours(user)).filter(neighbours(other)).order_by('username')
+
+
+def mutual_friends_preview(user, other, limit=5):
+    # preview list and total count; count query is skipped when whole
+    # intersection fits into preview
+    preview = list(mutual_friends(user, other).only(
+        'id', 'username', 'avatar', 'avatar_thumbnails')[:limit])
+    if len(preview) < limit:
+        return preview, len(preview)
+    return preview, mutual_friends(user, other).count()
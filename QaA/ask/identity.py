@@ -0,0 +1,110 @@
+import asyncio
+from contextvars import ContextVar
+
+from django.contrib.auth import SESSION_KEY
+from django.contrib.auth.middleware import get_user as get_auth_user
+
+from .models import UserModel
+
+_identity_map = ContextVar('ask_user_identity_map', default=None)
+
+
+class UserIdentityMap:
+    # users loaded during one request, each of them is fetched at most once
+
+    def __init__(self, request=None):
+        self.request = request
+        self.users = {}
+        self.pk_by_username = {}
+        self.auth_user_used = False
+
+    def get(self, pk):
+        pk = int(pk)
+        if pk not in self.users:
+            self.add(self.load(pk))
+        return self.users[pk]
+
+    def get_by_username(self, username):
+        if username not in self.pk_by_username:
+            self.add(UserModel.objects.get(username=username))
+        return self.users[self.pk_by_username[username]]
+
+    def add(self, user):
+        self.users[user.pk] = user
+        self.pk_by_username[user.username] = user.pk
+
+    def forget(self, pks):
+        for pk in pks:
+            user = self.users.pop(pk, None)
+            if user is not None:
+                del self.pk_by_username[user.username]
+
+    def load(self, pk):
+        # logged in user is shared with request.user loaded by
+        # AuthenticationMiddleware, so it costs no extra query
+        if self.is_auth_user_pk(pk) and not self.auth_user_used:
+            self.auth_user_used = True
+            user = get_auth_user(self.request)
+            if user.is_authenticated:
+                return user
+        return UserModel.objects.get(pk=pk)
+
+    def is_auth_user_pk(self, pk):
+        if self.request is None or not hasattr(self.request, 'session'):
+            return False
+        return str(self.request.session.get(SESSION_KEY)) == str(pk)
+
+
+class NoIdentityMap(UserIdentityMap):
+    # used outside of request cycle, nothing is cached
+
+    def add(self, user):
+        pass
+
+    def get(self, pk):
+        return self.load(int(pk))
+
+    def get_by_username(self, username):
+        return UserModel.objects.get(username=username)
+
+
+def current_identity_map():
+    identity_map = _identity_map.get()
+    if identity_map is None:
+        return NoIdentityMap()
+    return identity_map
+
+
+def forget_users(pks):
+    identity_map = _identity_map.get()
+    if identity_map is not None:
+        identity_map.forget(pks)
+
+
+class IdentityMapMiddleware:
+    # under ASGI stays in event loop, so async views get identity map
+    # without switching to thread and back
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # tells handler that middleware has to be awaited
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        token = _identity_map.set(UserIdentityMap(request))
+        try:
+            return self.get_response(request)
+        finally:
+            _identity_map.reset(token)
+
+    async def __acall__(self, request):
+        token = _identity_map.set(UserIdentityMap(request))
+        try:
+            return await self.get_response(request)
+        finally:
+            _identity_map.reset(token)
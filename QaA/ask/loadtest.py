@@ -0,0 +1,285 @@
+import html
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode, urljoin, urlsplit
+from urllib.request import (HTTPCookieProcessor, HTTPRedirectHandler,
+                            Request, build_opener)
+
+from django.conf import settings
+from django.urls import Resolver404, resolve, reverse
+
+PERCENTILES = (50, 95, 99)
+# profile pages followed by one journey through "older" links
+PROFILE_PAGES = 3
+
+NEXT_PAGE = re.compile(r'href="\?after=([^"&]+)"')
+UNANSWERED_QUESTION = re.compile(r'name="question_id" value="?(\d+)')
+INVITATION = re.compile(r'name="user_id" value="?(\d+)')
+
+
+class LoadTestError(Exception):
+    pass
+
+
+def percentile(values, percent):
+    # nearest rank of sorted values
+    if not values:
+        return None
+    rank = max(1, math.ceil(percent / 100 * len(values)))
+    return values[rank - 1]
+
+
+def url_name(method, path):
+    # requests are grouped by view, not by username or cursor in URL
+    try:
+        name = resolve(path).view_name
+    except Resolver404:
+        name = path
+    return '{} {}'.format(method, name)
+
+
+class Recorder:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.failures = []
+        self.started = None
+        self.finished = None
+
+    def start(self):
+        self.started = time.perf_counter()
+
+    def stop(self):
+        self.finished = time.perf_counter()
+
+    def record(self, name, seconds, ok):
+        with self.lock:
+            self.latencies[name].append(seconds)
+            if not ok:
+                self.errors[name] += 1
+
+    def fail(self, message):
+        with self.lock:
+            self.failures.append(message)
+
+    def report(self):
+        duration = (self.finished or time.perf_counter()) - self.started
+        urls = {name: self.url_report(name, latencies, duration)
+                for name, latencies in self.latencies.items()}
+        requests = sum(url['requests'] for url in urls.values())
+        return {
+            'duration': round(duration, 3),
+            'requests': requests,
+            'errors': sum(self.errors.values()),
+            'throughput': round(requests / duration, 3) if duration else None,
+            'failures': sorted(self.failures),
+            'urls': urls,
+        }
+
+    def url_report(self, name, latencies, duration):
+        # latencies in milliseconds
+        latencies = sorted(seconds * 1000 for seconds in latencies)
+        report = {
+            'requests': len(latencies),
+            'errors': self.errors[name],
+            'throughput': round(len(latencies) / duration, 3) if duration else None,
+            'mean': round(sum(latencies) / len(latencies), 3),
+            'max': round(latencies[-1], 3),
+        }
+        for percent in PERCENTILES:
+            report['p{}'.format(percent)] = round(
+                percentile(latencies, percent), 3)
+        return report
+
+
+class NoRedirect(HTTPRedirectHandler):
+    # redirect after login or post is measured on its own
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Client:
+
+    def __init__(self, base_url, recorder, timeout=30):
+        self.base_url = base_url
+        self.recorder = recorder
+        self.timeout = timeout
+        self.cookies = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies), NoRedirect)
+
+    def csrf_token(self):
+        for cookie in self.cookies:
+            if cookie.name == settings.CSRF_COOKIE_NAME:
+                return cookie.value
+        return ''
+
+    def request(self, method, path, data=None):
+        url = urljoin(self.base_url, path)
+        body = None
+        headers = {}
+        if method == 'POST':
+            data = dict(data or {}, csrfmiddlewaretoken=self.csrf_token())
+            body = urlencode(data, doseq=True).encode()
+            headers = {'Content-Type': 'application/x-www-form-urlencoded',
+                       'Referer': url}
+        started = time.perf_counter()
+        try:
+            with self.opener.open(Request(url, body, headers, method=method),
+                                  timeout=self.timeout) as response:
+                status, content = response.status, response.read()
+        except HTTPError as error:
+            status, content = error.code, error.read()
+        except (URLError, OSError):
+            status, content = None, b''
+        self.recorder.record(url_name(method, urlsplit(url).path),
+                             time.perf_counter() - started,
+                             status is not None and status < 400)
+        return status, content.decode('utf-8', 'replace')
+
+    def get(self, path, **params):
+        if params:
+            path = '{}?{}'.format(path, urlencode(params))
+        return self.request('GET', path)
+
+    def post(self, path, data):
+        return self.request('POST', path, data)
+
+
+class VirtualUser:
+    # one browser going through journeys of logged in user
+
+    def __init__(self, client, username, password, others, rng):
+        self.client = client
+        self.username = username
+        self.password = password
+        self.others = [other for other in others if other != username]
+        self.rng = rng
+
+    def run(self):
+        for step in (self.page_profile, self.ask_question,
+                     self.answer_question, self.add_friend,
+                     self.accept_invitation, self.search_friends):
+            step()
+
+    def log_in(self):
+        self.client.get(reverse('ask:login'))
+        status, _ = self.client.post(reverse('ask:login'), {
+            'username': self.username, 'password': self.password})
+        if status != 302:
+            raise LoadTestError('{} could not log in ({})'.format(
+                self.username, status))
+
+    def page_profile(self):
+        _, content = self.client.get(reverse('ask:profile'))
+        for _ in range(PROFILE_PAGES - 1):
+            cursor = NEXT_PAGE.search(content)
+            if cursor is None:
+                break
+            _, content = self.client.get(
+                reverse('ask:profile'), after=html.unescape(cursor.group(1)))
+
+    def other(self):
+        return self.rng.choice(self.others) if self.others else self.username
+
+    def ask_question(self):
+        url = reverse('ask:user', args=[self.other()])
+        self.client.get(url)
+        self.client.post(url, {
+            'action': 'ask_question',
+            'question_content': 'Load test question {}'.format(
+                self.rng.randrange(10 ** 6))})
+
+    def answer_question(self):
+        _, content = self.client.get(reverse('ask:unanswered'))
+        questions = UNANSWERED_QUESTION.findall(content)
+        if questions:
+            self.client.post(reverse('ask:unanswered'), {
+                'question_id': self.rng.choice(questions),
+                'answer_content': 'Load test answer'})
+
+    def add_friend(self):
+        url = reverse('ask:user', args=[self.other()])
+        self.client.post(url, {'action': 'add_friend'})
+
+    def accept_invitation(self):
+        _, content = self.client.get(reverse('ask:friends.inv'))
+        invitations = INVITATION.findall(content)
+        if invitations:
+            self.client.post(reverse('ask:friends.accept'),
+                             {'user_id': self.rng.choice(invitations)})
+
+    def search_friends(self):
+        self.client.get(reverse('ask:friends'))
+        self.client.get(reverse('ask:friends.search'),
+                        search_text=self.other()[:3])
+
+
+def run_load_test(base_url, credentials, iterations=1, duration=None,
+                  seed=0, timeout=30):
+    # one virtual user per (username, password) runs journeys in parallel,
+    # `iterations` times or until `duration` seconds passed
+    recorder = Recorder()
+    usernames = [username for username, _ in credentials]
+    deadline = None
+
+    def run_user(number, username, password):
+        # seeded per user, so same run asks and answers same way
+        user = VirtualUser(Client(base_url, recorder, timeout), username,
+                           password, usernames, random.Random(seed + number))
+        try:
+            user.log_in()
+            done = 0
+            while (time.perf_counter() < deadline if deadline is not None
+                   else done < iterations):
+                user.run()
+                done += 1
+        except LoadTestError as error:
+            recorder.fail(str(error))
+
+    threads = [threading.Thread(target=run_user, args=(number, *user))
+               for number, user in enumerate(credentials)]
+    recorder.start()
+    if duration is not None:
+        deadline = recorder.started + duration
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    recorder.stop()
+
+    report = recorder.report()
+    report.update(base_url=base_url, users=len(credentials), seed=seed)
+    return report
+
+
+def write_report(report, path):
+    # sorted keys and one value per line, so reports of two releases diff
+    # cleanly
+    with open(path, 'w') as file:
+        json.dump(report, file, indent=2, sort_keys=True)
+        file.write('\n')
+
+
+def read_report(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+def compare_reports(baseline, report):
+    # (URL name, metric, baseline value, new value) of URL names present
+    # in both reports
+    metrics = ['p{}'.format(percent) for percent in PERCENTILES] + ['throughput']
+    return [(name, metric, baseline['urls'][name][metric], url[metric])
+            for name, url in sorted(report['urls'].items())
+            if name in baseline['urls']
+            for metric in metrics]
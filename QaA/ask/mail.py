@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutgoingEmailModel
+
+MAX_ATTEMPTS = 5
+# delay before first retry, doubled with every next failed attempt
+RETRY_DELAY = timedelta(minutes=1)
+# how long claimed emails are left to one sender
+SEND_LEASE = timedelta(minutes=10)
+
+
+def enqueue_mail(subject, message, from_email, recipient_list):
+    return OutgoingEmailModel.objects.create(
+        subject=subject, body=message, from_email=from_email,
+        to=','.join(recipient_list))
+
+
+def send_queued_mail(batch_size=100, max_attempts=MAX_ATTEMPTS):
+    # sends one batch of due emails over single connection,
+    # returns number of sent and failed emails
+    emails = claim_due_mail(batch_size)
+    if not emails:
+        return 0, 0
+
+    # no transaction is held while talking to SMTP server, every email is
+    # marked as sent or failed on its own
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        for email in emails:
+            mark_failed(email, e, max_attempts)
+        return 0, len(emails)
+
+    sent = failed = 0
+    try:
+        for email in emails:
+            try:
+                connection.send_messages([to_message(email)])
+            except Exception as e:
+                mark_failed(email, e, max_attempts)
+                failed += 1
+            else:
+                mark_sent(email)
+                sent += 1
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def claim_due_mail(batch_size):
+    # postpones next attempt of due emails by lease, so other senders skip
+    # them; emails of sender which died meanwhile are retried once it expires
+    with transaction.atomic():
+        emails = list(OutgoingEmailModel.objects.select_for_update(
+            skip_locked=True).filter(
+            status=OutgoingEmailModel.PENDING,
+            next_attempt__lte=timezone.now()).order_by('next_attempt')[:batch_size])
+        OutgoingEmailModel.objects.filter(
+            pk__in=[email.pk for email in emails]).update(
+            next_attempt=timezone.now() + SEND_LEASE)
+    return emails
+
+
+def to_message(email):
+    return EmailMessage(email.subject, email.body, email.from_email,
+                        email.to.split(','))
+
+
+def mark_sent(email):
+    email.status = OutgoingEmailModel.SENT
+    email.attempts += 1
+    email.save(update_fields=['status', 'attempts'])
+
+
+def mark_failed(email, error, max_attempts):
+    email.attempts += 1
+    email.last_error = repr(error)
+    if email.attempts >= max_attempts:
+        email.status = OutgoingEmailModel.DEAD
+    else:
+        email.next_attempt = timezone.now() + RETRY_DELAY * 2 ** (email.attempts - 1)
+    email.save(update_fields=['status', 'attempts', 'last_error', 'next_attempt'])
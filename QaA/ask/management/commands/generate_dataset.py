@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from ...models import UserModel
+from ...synthetic import Loader, SyntheticDataset
+
+
+class Command(BaseCommand):
+    help = ('Generate synthetic users with power-law friendship graph and '
+            'skewed questions and answers for benchmarks')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000000)
+        parser.add_argument('--friends-per-user', type=int, default=5,
+                            help='invitations sent by each new user')
+        parser.add_argument('--questions-per-user', type=int, default=5,
+                            help='average number of questions per user')
+        parser.add_argument('--accepted-ratio', type=float, default=0.9,
+                            help='share of invitations which were accepted')
+        parser.add_argument('--prefix', default='synthetic_',
+                            help='usernames are prefix followed by number')
+        parser.add_argument('--password', default='synthetic',
+                            help='password of all generated users')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--no-copy', action='store_true',
+                            help='use bulk_create also on PostgreSQL')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if UserModel.objects.using(options['database']).filter(
+                username__startswith=options['prefix']).exists():
+            raise CommandError('Users with prefix {} already exist'.format(
+                options['prefix']))
+
+        dataset = SyntheticDataset(
+            options['users'], options['friends_per_user'],
+            options['questions_per_user'], options['accepted_ratio'],
+            options['prefix'], options['password'], options['seed'])
+        loader = Loader(options['database'], options['batch_size'],
+                        copy=False if options['no_copy'] else None)
+        with transaction.atomic(using=options['database']):
+            dataset.load(loader, self.stdout.write)
+
+        self.stdout.write(self.style.SUCCESS(
+            'Generated {} users, run refresh_suggestions to compute their '
+            'suggestions'.format(options['users'])))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from ...models import UserModel
+from ...thumbnails import mark_thumbnails_ready, render_thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Render missing avatar thumbnails, e.g. of avatars uploaded before they existed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='render thumbnails of every avatar again')
+
+    def handle(self, *args, **options):
+        users = UserModel.objects.exclude(avatar='').exclude(avatar=None)
+        if not options['all']:
+            users = users.filter(avatar_thumbnails=False)
+
+        rendered = 0
+        for user in users.only('id', 'avatar').iterator():
+            try:
+                render_thumbnails(user.avatar.path)
+            except (OSError, ValueError) as e:
+                self.stderr.write('avatar of user {} skipped: {}'.format(user.id, e))
+                continue
+            mark_thumbnails_ready(user.id, user.avatar.name)
+            rendered += 1
+        self.stdout.write(self.style.SUCCESS(
+            'Rendered thumbnails of {} avatars'.format(rendered)))
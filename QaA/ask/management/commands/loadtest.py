@@ -0,0 +1,83 @@
+from django.core.management.base import BaseCommand
+
+from ...loadtest import (compare_reports, read_report, run_load_test,
+                         write_report)
+from ...models import UserModel
+
+USERNAME = 'loadtest_{}'
+
+
+def format_value(value):
+    return 'n/a' if value is None else '{:.1f}'.format(value)
+
+
+class Command(BaseCommand):
+    help = ('Drive journeys of logged in users against running server and '
+            'report latency percentiles per URL name')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000',
+                            help='address of server under test')
+        parser.add_argument('--users', type=int, default=10,
+                            help='number of concurrent virtual users')
+        parser.add_argument('--iterations', type=int, default=5,
+                            help='journeys run by each virtual user')
+        parser.add_argument('--duration', type=float,
+                            help='seconds to run journeys for, '
+                                 'instead of --iterations')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='seed of choices made by virtual users')
+        parser.add_argument('--password', default='loadtest',
+                            help='password of loadtest_<n> users')
+        parser.add_argument('--create-users', action='store_true',
+                            help='create loadtest_<n> users in database '
+                                 'of server first')
+        parser.add_argument('--report', default='loadtest.json',
+                            help='path of JSON report')
+        parser.add_argument('--baseline',
+                            help='JSON report of earlier run to compare with')
+
+    def handle(self, *args, **options):
+        usernames = [USERNAME.format(number)
+                     for number in range(options['users'])]
+        if options['create_users']:
+            self.create_users(usernames, options['password'])
+
+        report = run_load_test(
+            options['base_url'],
+            [(username, options['password']) for username in usernames],
+            iterations=options['iterations'], duration=options['duration'],
+            seed=options['seed'])
+        write_report(report, options['report'])
+
+        self.stdout.write(
+            '{} requests, {} errors, {} requests/s'.format(
+                report['requests'], report['errors'],
+                format_value(report['throughput'])))
+        for failure in report['failures']:
+            self.stderr.write(failure)
+        for name, url in sorted(report['urls'].items()):
+            self.stdout.write(
+                '{name:32} {requests:6} p50 {p50:9.1f} ms  p95 {p95:9.1f} ms  '
+                'p99 {p99:9.1f} ms'.format(name=name, **url))
+
+        if options['baseline']:
+            self.stdout.write('compared with {}:'.format(options['baseline']))
+            self.write_comparison(read_report(options['baseline']), report)
+
+    def write_comparison(self, baseline, report):
+        for name, metric, before, after in compare_reports(baseline, report):
+            # throughput is None when run took no measurable time
+            change = ''
+            if before and after is not None:
+                change = ' ({:+.1%})'.format((after - before) / before)
+            self.stdout.write('{:32} {:10} {:>10} -> {:>10}{}'.format(
+                name, metric, format_value(before), format_value(after),
+                change))
+
+    def create_users(self, usernames, password):
+        existing = set(UserModel.objects.filter(
+            username__in=usernames).values_list('username', flat=True))
+        for username in usernames:
+            if username not in existing:
+                UserModel.objects.create_user(username, password=password)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from ...navigation import navigation_stats, reset_navigation_stats
+
+
+class Command(BaseCommand):
+    help = 'Show hit and miss statistics of navigation bar cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true',
+                            help='reset statistics after showing them')
+
+    def handle(self, *args, **options):
+        stats = navigation_stats()
+        self.stdout.write('hits {hits}, misses {misses}, hit ratio {hit_ratio:.2%}'.format(
+            **stats))
+        if options['reset']:
+            reset_navigation_stats()
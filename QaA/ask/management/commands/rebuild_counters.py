@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ...counters import rebuild_counters
+from ...models import UserModel
+
+
+class Command(BaseCommand):
+    help = 'Recompute num_unanswered and num_invites counters of users'
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='*',
+                            help='rebuild only counters of given users')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['usernames']:
+            user_ids = list(UserModel.objects.filter(
+                username__in=options['usernames']).values_list('id', flat=True))
+
+        with transaction.atomic():
+            changed = rebuild_counters(user_ids, options['batch_size'])
+
+        for user in changed:
+            self.stdout.write('fixed counters of user {}'.format(user.id))
+        self.stdout.write(self.style.SUCCESS(
+            'Counters rebuilt, {} users were out of date'.format(len(changed))))
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...models import UserModel
+from ...suggestions import SUGGESTIONS_PER_USER, refresh_suggestions
+
+
+class Command(BaseCommand):
+    help = 'Recompute "people you may know" suggestions of outdated users'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='refresh suggestions of all users')
+        parser.add_argument('--limit', type=int, default=SUGGESTIONS_PER_USER,
+                            help='number of suggestions stored per user')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--interval', type=float,
+                            help='keep refreshing outdated users, waiting '
+                                 'that many seconds between runs')
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['all']:
+            user_ids = UserModel.objects.values_list('id', flat=True)
+        while True:
+            refreshed = refresh_suggestions(
+                user_ids, options['limit'], options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                'Refreshed suggestions of {} users'.format(refreshed)))
+            if options['interval'] is None:
+                return
+            # --all applies to first run only, later ones catch up with
+            # friendships changed meanwhile
+            user_ids = None
+            time.sleep(options['interval'])
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...mail import MAX_ATTEMPTS, send_queued_mail
+
+
+class Command(BaseCommand):
+    help = 'Send emails waiting in outbox, in batches over one SMTP connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS,
+                            help='failed emails are marked as dead after that many attempts')
+        parser.add_argument('--interval', type=float, default=5,
+                            help='seconds to wait when outbox is empty')
+        parser.add_argument('--once', action='store_true',
+                            help='send all due emails and exit')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_queued_mail(
+                options['batch_size'], options['max_attempts'])
+            if sent or failed:
+                self.stdout.write('sent {}, failed {}'.format(sent, failed))
+            if sent + failed < options['batch_size']:
+                if options['once']:
+                    return
+                time.sleep(options['interval'])
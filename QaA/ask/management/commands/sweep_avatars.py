@@ -0,0 +1,29 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from ...avatars import GRACE_PERIOD, sweep_avatars
+
+
+class Command(BaseCommand):
+    help = 'Delete avatar files and thumbnails which are no longer used by any user'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-period', type=float,
+                            default=GRACE_PERIOD.total_seconds(),
+                            help='seconds for which new files are kept')
+        parser.add_argument('--interval', type=float, default=3600,
+                            help='seconds to wait between sweeps')
+        parser.add_argument('--once', action='store_true',
+                            help='sweep once and exit')
+
+    def handle(self, *args, **options):
+        grace_period = timedelta(seconds=options['grace_period'])
+        while True:
+            deleted = sweep_avatars(grace_period)
+            for name in deleted:
+                self.stdout.write('deleted {}'.format(name))
+            if options['once']:
+                return
+            time.sleep(options['interval'])
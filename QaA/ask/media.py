@@ -0,0 +1,180 @@
+import mimetypes
+import posixpath
+import re
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                patch_vary_headers)
+from django.utils.http import http_date, parse_http_date_safe
+
+from .models import AVATAR_DIRECTORY
+
+# content addressed files never change, browsers may keep them for a year
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+BLOCK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+UNSATISFIABLE = 'unsatisfiable'
+# encoding and extension of precompressed static files, preferred first
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+
+class FileRange:
+    # part of open file; exposes fileno and tell so wsgi.file_wrapper of
+    # server (e.g. gunicorn) can send it with sendfile, other servers read
+    # it block by block
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.file.seek(start)
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def serve(request, path, document_root=None):
+    # serves media file according to MEDIA_DELIVERY, answering conditional
+    # requests with 304 and range requests with 206
+    return serve_file(
+        request, path, document_root or settings.MEDIA_ROOT,
+        immutable=path.startswith(AVATAR_DIRECTORY + '/'),
+        delivery=settings.MEDIA_DELIVERY)
+
+
+def serve_static(request, path):
+    # files built by collectstatic; fingerprinted ones never change and
+    # precompressed siblings are sent to clients accepting them
+    hashed_files = getattr(staticfiles_storage, 'hashed_files', {})
+    return serve_file(
+        request, path, settings.STATIC_ROOT,
+        immutable=path in hashed_files.values(),
+        precompressed=True)
+
+
+def serve_file(request, path, document_root, immutable=False,
+               delivery='django', precompressed=False):
+    path = posixpath.normpath(path).lstrip('/')
+    fullpath = Path(safe_join(document_root, path))
+    if not fullpath.is_file():
+        raise Http404('"{}" does not exist'.format(path))
+
+    content_type, encoding = mimetypes.guess_type(str(fullpath))
+    content_type = content_type or 'application/octet-stream'
+    if precompressed:
+        fullpath, encoding = precompressed_variant(request, fullpath, encoding)
+
+    stat = fullpath.stat()
+    etag = '"{:x}-{:x}"'.format(stat.st_mtime_ns, stat.st_size)
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified)
+    if response is None:
+        if delivery == 'x-accel-redirect':
+            # front server takes care of ranges itself; paths are
+            # percent-encoded, as Django would MIME-encode non-ASCII headers
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = quote(
+                settings.MEDIA_ACCEL_REDIRECT_PREFIX + path)
+        elif delivery == 'x-sendfile':
+            response = HttpResponse(content_type=content_type)
+            response['X-Sendfile'] = quote(str(fullpath))
+        else:
+            response = stream(request, fullpath, content_type, stat.st_size,
+                              etag, last_modified)
+        if encoding:
+            response['Content-Encoding'] = encoding
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if precompressed:
+        patch_vary_headers(response, ['Accept-Encoding'])
+    if immutable:
+        patch_cache_control(response, public=True,
+                            max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    return response
+
+
+def precompressed_variant(request, fullpath, encoding):
+    # .br or .gz sibling of file if client accepts its encoding
+    if encoding:
+        return fullpath, encoding
+    accepted = set()
+    for coding in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, parameters = coding.partition(';')
+        quality = parameters.replace(' ', '').partition('q=')[2]
+        try:
+            if quality and float(quality) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip().lower())
+    for coding, extension in PRECOMPRESSED:
+        variant = fullpath.with_name(fullpath.name + extension)
+        if coding in accepted and variant.is_file():
+            return variant, coding
+    return fullpath, None
+
+
+def stream(request, fullpath, content_type, size, etag, last_modified):
+    byte_range = requested_range(request, size, etag, last_modified)
+    if byte_range == UNSATISFIABLE:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = 'bytes */{}'.format(size)
+        return response
+
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1
+    response = FileResponse(FileRange(fullpath.open('rb'), start, length),
+                            content_type=content_type)
+    response.block_size = BLOCK_SIZE
+    response['Content-Length'] = length
+    response['Accept-Ranges'] = 'bytes'
+    if byte_range:
+        response.status_code = 206
+        response['Content-Range'] = 'bytes {}-{}/{}'.format(start, end, size)
+    return response
+
+
+def requested_range(request, size, etag, last_modified):
+    # (start, end) of single satisfiable range, None when whole file should
+    # be sent; multiple ranges are answered with whole file
+    header = request.META.get('HTTP_RANGE')
+    if not header:
+        return None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range and if_range != etag and \
+            parse_http_date_safe(if_range) != last_modified:
+        return None
+
+    match = RANGE_RE.match(header.strip())
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        # suffix range, last N bytes
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return UNSATISFIABLE
+    return start, end
@@ -0,0 +1,52 @@
+# Generated by Django 2.2.5 on 2026-10-18 12:46
+
+import ask.models
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_counters(apps, schema_editor):
+    UserModel = apps.get_model('ask', 'UserModel')
+    QuestionModel = apps.get_model('ask', 'QuestionModel')
+    FriendsModel = apps.get_model('ask', 'FriendsModel')
+
+    unanswered = QuestionModel.objects.filter(
+        answer=None).values('owner').annotate(n=Count('id'))
+    for row in unanswered:
+        UserModel.objects.filter(pk=row['owner']).update(
+            num_unanswered=row['n'])
+
+    invites = {}
+    for side in ('first', 'second'):
+        rows = FriendsModel.objects.filter(
+            accepted=False).values(side).annotate(n=Count('id'))
+        for row in rows:
+            invites[row[side]] = invites.get(row[side], 0) + row['n']
+    for user_id, n in invites.items():
+        UserModel.objects.filter(pk=user_id).update(num_invites=n)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ask', '0003_usermodel_avatar'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usermodel',
+            name='num_invites',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='usermodel',
+            name='num_unanswered',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='usermodel',
+            name='avatar',
+            field=models.ImageField(null=True, upload_to=ask.models.user_directory_path),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 2.2.5 on 2026-10-18 12:51
+
+import ask.operations
+from django.db import migrations, models
+from django.db.models import Count, Exists, OuterRef, Q
+
+
+def remove_duplicated_friends(apps, schema_editor):
+    # one row is kept per pair of users, whichever of them invited the
+    # other: the accepted one if any, otherwise the oldest; invitation
+    # counters of users in removed rows are recomputed, as deleting with
+    # historical models sends no signals
+    FriendsModel = apps.get_model('ask', 'FriendsModel')
+    UserModel = apps.get_model('ask', 'UserModel')
+
+    same_pair = FriendsModel.objects.exclude(id=OuterRef('id')).filter(
+        Q(first=OuterRef('first'), second=OuterRef('second')) |
+        Q(first=OuterRef('second'), second=OuterRef('first')))
+    duplicated = FriendsModel.objects.annotate(
+        duplicated=Exists(same_pair)).filter(duplicated=True).order_by(
+        '-accepted', 'id').values_list('id', 'first', 'second')
+
+    kept = set()
+    removed = []
+    user_ids = set()
+    for friends_id, first, second in duplicated:
+        pair = frozenset((first, second))
+        if pair in kept:
+            removed.append(friends_id)
+        else:
+            kept.add(pair)
+        user_ids.update(pair)
+    if not removed:
+        return
+    FriendsModel.objects.filter(id__in=removed).delete()
+
+    invites = dict.fromkeys(user_ids, 0)
+    pending = FriendsModel.objects.filter(accepted=False)
+    for side in ('first', 'second'):
+        rows = pending.filter(**{side + '__in': user_ids}).values(
+            side).annotate(n=Count('id'))
+        for row in rows:
+            invites[row[side]] += row['n']
+    for user_id, n in invites.items():
+        UserModel.objects.filter(pk=user_id).update(num_invites=n)
+
+
+class Migration(migrations.Migration):
+    # indexes are built concurrently on PostgreSQL, which is not allowed
+    # inside transaction
+    atomic = False
+
+    dependencies = [
+        ('ask', '0004_usermodel_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicated_friends,
+                             migrations.RunPython.noop, atomic=True),
+        ask.operations.AddUniqueConstraintConcurrently(
+            model_name='friendsmodel',
+            constraint=models.UniqueConstraint(fields=('first', 'second'), name='friends_unique_pair'),
+        ),
+        ask.operations.AddIndexConcurrently(
+            model_name='friendsmodel',
+            index=models.Index(fields=['second', 'first'], name='friends_second_first_idx'),
+        ),
+        ask.operations.AddIndexConcurrently(
+            model_name='friendsmodel',
+            index=models.Index(condition=models.Q(accepted=False), fields=['first'], name='friends_first_pending_idx'),
+        ),
+        ask.operations.AddIndexConcurrently(
+            model_name='friendsmodel',
+            index=models.Index(condition=models.Q(accepted=False), fields=['second'], name='friends_second_pending_idx'),
+        ),
+        ask.operations.AddIndexConcurrently(
+            model_name='questionmodel',
+            index=models.Index(condition=models.Q(answer__isnull=True), fields=['owner', 'date', 'id'], name='question_unanswered_idx'),
+        ),
+        ask.operations.AddIndexConcurrently(
+            model_name='questionmodel',
+            index=models.Index(condition=models.Q(answer__isnull=False), fields=['owner', 'date', 'id'], name='question_answered_idx'),
+        ),
+    ]
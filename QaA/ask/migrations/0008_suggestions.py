@@ -0,0 +1,37 @@
+# Generated by Django 2.2.5 on 2026-10-18 12:57
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ask', '0007_outgoingemailmodel'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usermodel',
+            name='suggestions_outdated',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.CreateModel(
+            name='SuggestionModel',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mutual_friends', models.PositiveIntegerField()),
+                ('suggested', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='suggestions', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='suggestionmodel',
+            index=models.Index(fields=['user', '-mutual_friends'], name='suggestion_user_rank_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='suggestionmodel',
+            constraint=models.UniqueConstraint(fields=('user', 'suggested'), name='suggestion_unique_pair'),
+        ),
+    ]
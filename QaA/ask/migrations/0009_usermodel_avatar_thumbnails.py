@@ -0,0 +1,18 @@
+# Generated by Django 2.2.5 on 2026-10-18 13:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ask', '0008_suggestions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usermodel',
+            name='avatar_thumbnails',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.5 on 2026-10-18 13:04
+
+import ask.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ask', '0009_usermodel_avatar_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='usermodel',
+            name='avatar',
+            field=models.ImageField(null=True, storage=ask.storage.ContentAddressedStorage(), upload_to='avatars'),
+        ),
+    ]
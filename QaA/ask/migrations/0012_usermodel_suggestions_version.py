@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ask', '0011_alter_usermodel_first_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usermodel',
+            name='suggestions_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
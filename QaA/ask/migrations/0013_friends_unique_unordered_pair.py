@@ -0,0 +1,48 @@
+from importlib import import_module
+
+from django.db import migrations
+
+remove_duplicated_friends = import_module(
+    'ask.migrations.0005_hot_query_indexes').remove_duplicated_friends
+
+# friends_unique_pair allows one row per direction, this index allows one
+# row per pair of users, whichever of them invited the other
+INDEX_SQL = {
+    'postgresql': 'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS '
+                  'friends_unique_unordered_pair ON ask_friendsmodel '
+                  '(LEAST(first_id, second_id), GREATEST(first_id, second_id))',
+    'sqlite': 'CREATE UNIQUE INDEX IF NOT EXISTS '
+              'friends_unique_unordered_pair ON ask_friendsmodel '
+              '(min(first_id, second_id), max(first_id, second_id))',
+}
+
+
+def create_unordered_pair_index(apps, schema_editor):
+    sql = INDEX_SQL.get(schema_editor.connection.vendor)
+    if sql is not None:
+        schema_editor.execute(sql)
+
+
+def drop_unordered_pair_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor in INDEX_SQL:
+        schema_editor.execute('DROP INDEX {}IF EXISTS friends_unique_unordered_pair'.format(
+            'CONCURRENTLY ' if vendor == 'postgresql' else ''))
+
+
+class Migration(migrations.Migration):
+    # index is built concurrently on PostgreSQL, which is not allowed
+    # inside transaction
+    atomic = False
+
+    dependencies = [
+        ('ask', '0012_usermodel_suggestions_version'),
+    ]
+
+    operations = [
+        # pairs invited from both sides since 0005
+        migrations.RunPython(remove_duplicated_friends,
+                             migrations.RunPython.noop, atomic=True),
+        migrations.RunPython(create_unordered_pair_index,
+                             drop_unordered_pair_index),
+    ]
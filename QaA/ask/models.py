@@ -1,9 +1,15 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
 import pathlib
 
+from .storage import avatar_storage
+
+AVATAR_DIRECTORY = 'avatars'
+
 
 def user_directory_path(instance, filename):
+    # avatars are content addressed now, kept for old migrations
     # file will be uploaded to MEDIA_ROOT/user_<id>/avatar<extension>
     fileextension = pathlib.Path(filename).suffix
     # print('filename = ', filename)
@@ -15,7 +21,20 @@ def user_directory_path(instance, filename):
 class UserModel(AbstractUser):
     friends = models.ManyToManyField(
         'self', through='FriendsModel', symmetrical=False)
-    avatar = models.ImageField(null=True, upload_to=user_directory_path)
+    # named by content hash, see ask.storage
+    avatar = models.ImageField(
+        null=True, upload_to=AVATAR_DIRECTORY, storage=avatar_storage)
+    # set when resized variants of avatar were rendered by ask.thumbnails
+    avatar_thumbnails = models.BooleanField(default=False)
+    # denormalized counters shown in navigation bar, kept up to date
+    # by ask.signals and rebuilt with `manage.py rebuild_counters`
+    num_unanswered = models.PositiveIntegerField(default=0)
+    num_invites = models.PositiveIntegerField(default=0)
+    # set when friendships around user changed, cleared by
+    # `manage.py refresh_suggestions`
+    suggestions_outdated = models.BooleanField(default=True)
+    # bumped with every change, so refresh only clears flags it has seen
+    suggestions_version = models.PositiveIntegerField(default=0)
 
 
 class FriendsModel(models.Model):
@@ -25,6 +44,40 @@ class FriendsModel(models.Model):
     date = models.DateTimeField(auto_now_add=True)
     accepted = models.BooleanField(default=False)
 
+    class Meta:
+        # pair is also unique regardless of direction, by expression index
+        # friends_unique_unordered_pair created in migration 0013
+        constraints = [
+            models.UniqueConstraint(
+                fields=['first', 'second'], name='friends_unique_pair'),
+        ]
+        indexes = [
+            models.Index(fields=['second', 'first'],
+                         name='friends_second_first_idx'),
+            models.Index(fields=['first'], name='friends_first_pending_idx',
+                         condition=models.Q(accepted=False)),
+            models.Index(fields=['second'], name='friends_second_pending_idx',
+                         condition=models.Q(accepted=False)),
+        ]
+
+
+class SuggestionModel(models.Model):
+    user = models.ForeignKey(
+        UserModel, on_delete=models.CASCADE, related_name="suggestions")
+    suggested = models.ForeignKey(
+        UserModel, on_delete=models.CASCADE, related_name="+")
+    mutual_friends = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'suggested'], name='suggestion_unique_pair'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-mutual_friends'],
+                         name='suggestion_user_rank_idx'),
+        ]
+
 
 class AnswerModel(models.Model):
     content = models.CharField(max_length=1000)
@@ -40,3 +93,38 @@ class QuestionModel(models.Model):
     date = models.DateTimeField(auto_now_add=True)
     answer = models.OneToOneField(
         AnswerModel, null=True, on_delete=models.CASCADE)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'date', 'id'],
+                         name='question_unanswered_idx',
+                         condition=models.Q(answer__isnull=True)),
+            models.Index(fields=['owner', 'date', 'id'],
+                         name='question_answered_idx',
+                         condition=models.Q(answer__isnull=False)),
+        ]
+
+
+class OutgoingEmailModel(models.Model):
+    PENDING = 'pending'
+    SENT = 'sent'
+    DEAD = 'dead'
+    STATUSES = [(PENDING, 'pending'), (SENT, 'sent'), (DEAD, 'dead')]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    # comma separated list of recipients
+    to = models.TextField()
+    status = models.CharField(
+        max_length=10, choices=STATUSES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    date = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['next_attempt'], name='outbox_pending_idx',
+                         condition=models.Q(status='pending')),
+        ]
@@ -0,0 +1,73 @@
+import threading
+
+from django.core.cache import cache
+
+from .fragments import bump_versions, get_or_render
+
+# version of user's navigation bar, replaced whenever avatar or counters
+# shown in navigation bar change
+VERSION_KEY = 'navigation:version:{}'
+FRAGMENT_KEY = 'navigation:fragment:{}'
+FRAGMENT_TIMEOUT = 24 * 60 * 60
+# hit and miss counters are kept in process and added to shared counters
+# in cache every STATS_FLUSH_EVERY lookups
+STATS_KEY = 'navigation:stats:{}'
+STATS_FLUSH_EVERY = 100
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def bump_navigation_version(user_ids):
+    bump_versions(VERSION_KEY, user_ids)
+
+
+def cached_navigation(user_id, render):
+    # returns navigation bar of user, calls render only on miss
+    fragment, hit = get_or_render(
+        VERSION_KEY.format(user_id), FRAGMENT_KEY.format(user_id),
+        render, FRAGMENT_TIMEOUT)
+    record('hits' if hit else 'misses')
+    return fragment
+
+
+def record(outcome):
+    with _stats_lock:
+        _stats[outcome] += 1
+        if _stats['hits'] + _stats['misses'] < STATS_FLUSH_EVERY:
+            return
+        pending = dict(_stats)
+        _stats['hits'] = _stats['misses'] = 0
+    flush_stats(pending)
+
+
+def flush_stats(pending):
+    for outcome, count in pending.items():
+        if not count:
+            continue
+        key = STATS_KEY.format(outcome)
+        cache.add(key, 0, timeout=None)
+        try:
+            cache.incr(key, count)
+        except ValueError:
+            # evicted between add and incr
+            cache.set(key, count, timeout=None)
+
+
+def navigation_stats():
+    # hits and misses of all processes, including not yet flushed ones
+    # of current process
+    with _stats_lock:
+        pending = dict(_stats)
+    shared = cache.get_many([STATS_KEY.format(outcome) for outcome in pending])
+    stats = {outcome: shared.get(STATS_KEY.format(outcome), 0) + count
+             for outcome, count in pending.items()}
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+    return stats
+
+
+def reset_navigation_stats():
+    with _stats_lock:
+        _stats['hits'] = _stats['misses'] = 0
+    cache.delete_many([STATS_KEY.format(outcome) for outcome in _stats])
@@ -0,0 +1,43 @@
+from django.db import models
+from django.db.migrations import AddConstraint, AddIndex
+
+
+class AddIndexConcurrently(AddIndex):
+    # on PostgreSQL index is built without locking writes to the table,
+    # migration using it must be declared with atomic = False
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            sql = str(self.index.create_sql(model, schema_editor))
+            schema_editor.execute(sql.replace(
+                'CREATE INDEX', 'CREATE INDEX CONCURRENTLY', 1))
+
+    def describe(self):
+        return 'Concurrently ' + super().describe()
+
+
+class AddUniqueConstraintConcurrently(AddConstraint):
+    # builds unique index concurrently and then turns it into constraint,
+    # which takes only short lock on PostgreSQL
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            index = models.Index(fields=list(self.constraint.fields),
+                                 name=self.constraint.name,
+                                 condition=self.constraint.condition)
+            sql = str(index.create_sql(model, schema_editor))
+            schema_editor.execute(sql.replace(
+                'CREATE INDEX', 'CREATE UNIQUE INDEX CONCURRENTLY', 1))
+            schema_editor.execute(
+                'ALTER TABLE {table} ADD CONSTRAINT {name} UNIQUE USING INDEX {name}'.format(
+                    table=schema_editor.quote_name(model._meta.db_table),
+                    name=schema_editor.quote_name(self.constraint.name)))
+
+    def describe(self):
+        return 'Concurrently ' + super().describe()
@@ -0,0 +1,96 @@
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(obj):
+    key = '{}|{}'.format(obj.date.isoformat(), obj.id)
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        date, id = base64.urlsafe_b64decode(
+            cursor.encode()).decode().split('|')
+        date = parse_datetime(date)
+        id = int(id)
+    except (binascii.Error, UnicodeError, ValueError):
+        return None
+    if date is None:
+        return None
+    return date, id
+
+
+class KeysetPage:
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+
+class KeysetPaginator:
+    # newest first pagination on (date, id), unlike Paginator each page
+    # costs single LIMIT query no matter how deep it is
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    def get_page(self, after=None, before=None):
+        after = decode_cursor(after) if after else None
+        before = decode_cursor(before) if before else None
+        if before is not None:
+            return self.page_before(*before)
+        return self.page_after(after)
+
+    def page_after(self, cursor):
+        queryset = self.queryset.order_by('-date', '-id')
+        if cursor is not None:
+            date, id = cursor
+            queryset = queryset.filter(
+                Q(date__lt=date) | Q(date=date, id__lt=id))
+        objects = list(queryset[:self.per_page + 1])
+
+        has_next = len(objects) > self.per_page
+        objects = objects[:self.per_page]
+        return self.make_page(objects, has_next, cursor is not None)
+
+    def page_before(self, date, id):
+        queryset = self.queryset.order_by('date', 'id').filter(
+            Q(date__gt=date) | Q(date=date, id__gt=id))
+        objects = list(queryset[:self.per_page + 1])
+        if not objects:
+            return self.page_after(None)
+
+        has_previous = len(objects) > self.per_page
+        objects = objects[:self.per_page][::-1]
+        return self.make_page(objects, True, has_previous)
+
+    def make_page(self, objects, has_next, has_previous):
+        if not objects:
+            return KeysetPage(objects)
+        return KeysetPage(
+            objects,
+            next_cursor=encode_cursor(objects[-1]) if has_next else None,
+            previous_cursor=encode_cursor(objects[0]) if has_previous else None)
@@ -0,0 +1,31 @@
+from .fragments import bump_versions, get_or_render
+
+# version of user's public profile, replaced when answered questions of
+# user change; rendered profile is cached separately for every viewer
+# relationship, so friendship changes switch to other entry
+VERSION_KEY = 'profile:version:{}'
+CONTENT_KEY = 'profile:content:{}:{}:{}'
+CONTENT_TIMEOUT = 60 * 60
+
+NONE = 'none'
+PENDING = 'pending'
+FRIEND = 'friend'
+
+
+def relationship(is_friend, accepted):
+    if not is_friend:
+        return NONE
+    return FRIEND if accepted else PENDING
+
+
+def bump_profile_version(user_ids):
+    bump_versions(VERSION_KEY, user_ids)
+
+
+def cached_profile(user_id, relationship, logged_in, render):
+    # concurrent misses of the same profile are rendered once
+    fragment, hit = get_or_render(
+        VERSION_KEY.format(user_id),
+        CONTENT_KEY.format(user_id, relationship, int(logged_in)),
+        render, CONTENT_TIMEOUT, coalesce=True)
+    return fragment
@@ -0,0 +1,107 @@
+import asyncio
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# present while browser has to read from primary after its own write
+PIN_COOKIE = 'ask_primary'
+# sessions are read from primary, one created at login could be missing
+# on lagging replica
+PRIMARY_APPS = {'sessions'}
+
+_state = ContextVar('ask_replica_state', default=None)
+
+
+class ReplicaState:
+    # routing of one request; views opt in to replica reads, any write
+    # sends the rest of request to primary and pins browser to it
+
+    def __init__(self, pinned):
+        self.pinned = pinned
+        self.replica_reads = False
+        self.wrote = False
+
+
+def replicas():
+    return [alias for alias in settings.DATABASE_REPLICAS
+            if alias in connections.databases]
+
+
+def allow_replica_reads():
+    state = _state.get()
+    if state is not None:
+        state.replica_reads = True
+
+
+def reads_from_replica():
+    state = _state.get()
+    return (state is not None and state.replica_reads and
+            not state.pinned and not state.wrote and
+            # transaction has to see its own changes
+            not connections[DEFAULT_DB_ALIAS].in_atomic_block and
+            bool(replicas()))
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_APPS or not reads_from_replica():
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas())
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None and model._meta.app_label not in PRIMARY_APPS:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold copy of primary's data
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # replicas get schema by replication
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # tells handler that middleware has to be awaited
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        state = ReplicaState(pinned=PIN_COOKIE in request.COOKIES)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.pin(state, response)
+
+    async def __acall__(self, request):
+        state = ReplicaState(pinned=PIN_COOKIE in request.COOKIES)
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.pin(state, response)
+
+    def pin(self, state, response):
+        # replicas may not have the write yet, so browser reads from
+        # primary for REPLICA_STICKINESS seconds
+        if state.wrote:
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.REPLICA_STICKINESS,
+                secure=settings.SESSION_COOKIE_SECURE, httponly=True,
+                samesite='Lax')
+        return response
@@ -0,0 +1,99 @@
+from collections import Counter
+
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .counters import change_counter
+from .models import FriendsModel, QuestionModel, UserModel
+from .navigation import bump_navigation_version
+from .profiles import bump_profile_version
+from .suggestions import mark_suggestions_outdated
+
+
+@receiver(post_save, sender=UserModel)
+def update_fragments_on_user_save(sender, instance, created, **kwargs):
+    # avatar is shown in navigation bar
+    bump_navigation_version([instance.pk])
+    if created:
+        bump_profile_version([instance.pk])
+
+
+@receiver(post_init, sender=QuestionModel)
+def remember_question_answer(sender, instance, **kwargs):
+    instance._loaded_answer_id = instance.__dict__.get('answer_id')
+
+
+@receiver(post_save, sender=QuestionModel)
+def update_unanswered_on_save(sender, instance, created, **kwargs):
+    was_unanswered = not created and instance._loaded_answer_id is None
+    is_unanswered = instance.answer_id is None
+    if was_unanswered != is_unanswered:
+        delta = 1 if is_unanswered else -1
+        change_counter('num_unanswered', {instance.owner_id: delta})
+    was_answered = not created and instance._loaded_answer_id is not None
+    if was_answered or not is_unanswered:
+        # answered questions are shown on cached profile
+        bump_profile_version([instance.owner_id])
+    instance._loaded_answer_id = instance.answer_id
+
+
+@receiver(post_delete, sender=QuestionModel)
+def update_unanswered_on_delete(sender, instance, **kwargs):
+    if instance.answer_id is None:
+        change_counter('num_unanswered', {instance.owner_id: -1})
+    else:
+        bump_profile_version([instance.owner_id])
+
+
+@receiver(post_init, sender=FriendsModel)
+def remember_friends_accepted(sender, instance, **kwargs):
+    instance._loaded_accepted = instance.__dict__.get('accepted')
+
+
+@receiver(post_save, sender=FriendsModel)
+def update_on_friends_save(sender, instance, created, **kwargs):
+    was_pending = not created and instance._loaded_accepted is False
+    was_accepted = not created and instance._loaded_accepted is True
+    is_pending = not instance.accepted
+    if was_pending != is_pending:
+        delta = 1 if is_pending else -1
+        change_counter('num_invites', {instance.first_id: delta,
+                                       instance.second_id: delta})
+    if created or was_accepted != instance.accepted:
+        mark_suggestions_outdated(
+            [instance.first_id, instance.second_id],
+            with_friends=was_accepted != instance.accepted)
+    instance._loaded_accepted = instance.accepted
+
+
+@receiver(post_delete, sender=FriendsModel)
+def update_on_friends_delete(sender, instance, **kwargs):
+    if not instance.accepted:
+        change_counter('num_invites', {instance.first_id: -1,
+                                       instance.second_id: -1})
+    mark_suggestions_outdated([instance.first_id, instance.second_id],
+                              with_friends=instance.accepted)
+
+
+@receiver(m2m_changed, sender=UserModel.friends.through)
+def update_on_friends_add(sender, instance, action, reverse, pk_set, **kwargs):
+    # friends.add() uses bulk_create, so post_save is not sent for new rows
+    # (remove() and clear() delete rows one by one and send post_delete)
+    if action != 'post_add' or not pk_set:
+        return
+    if reverse:
+        added = FriendsModel.objects.filter(second=instance, first__in=pk_set)
+    else:
+        added = FriendsModel.objects.filter(first=instance, second__in=pk_set)
+
+    deltas = Counter()
+    any_accepted = False
+    for first_id, second_id, accepted in added.values_list('first', 'second', 'accepted'):
+        if accepted:
+            any_accepted = True
+        else:
+            deltas[first_id] += 1
+            deltas[second_id] += 1
+    change_counter('num_invites', deltas)
+    mark_suggestions_outdated([instance.pk] + list(pk_set),
+                              with_friends=any_accepted)
@@ -0,0 +1,91 @@
+import gzip
+import posixpath
+import re
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import (ManifestStaticFilesStorage,
+                                                StaticFilesStorage)
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BUNDLE_DIRECTORY = 'ask/bundles'
+# precompressed siblings are written for hashed files with these extensions
+COMPRESSED_EXTENSIONS = ('.css', '.js', '.svg', '.txt', '.json')
+
+
+def gzip_compress(content):
+    # gzip.compress() takes mtime only since Python 3.8; fixed mtime keeps
+    # output the same for the same content
+    output = BytesIO()
+    with gzip.GzipFile(fileobj=output, mode='wb', compresslevel=9,
+                       mtime=0) as file:
+        file.write(content)
+    return output.getvalue()
+
+
+COMPRESSIONS = [('.gz', gzip_compress)]
+if brotli is not None:
+    COMPRESSIONS.append(('.br', brotli.compress))
+
+
+def bundle_name(name):
+    return posixpath.join(BUNDLE_DIRECTORY, name + '.css')
+
+
+def minify_css(css):
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.DOTALL)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip()
+
+
+class BundledManifestStorage(ManifestStaticFilesStorage):
+    # collectstatic concatenates and minifies STYLESHEET_BUNDLES, then
+    # every file is fingerprinted by manifest storage and compressible
+    # ones get .gz (and .br when brotli is installed) siblings
+
+    def url(self, name, force=False):
+        if not self.hashed_files and not force:
+            # collectstatic was not run, e.g. in development or tests
+            return StaticFilesStorage.url(self, name)
+        return super().url(name, force)
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            paths.update(self.build_bundles(paths))
+        yield from super().post_process(paths, dry_run, **options)
+        if not dry_run:
+            self.compress(self.hashed_files.values())
+
+    def build_bundles(self, paths):
+        bundles = {}
+        for name, sources in settings.STYLESHEET_BUNDLES.items():
+            css = []
+            for source in sources:
+                storage, path = paths[source]
+                with storage.open(path) as f:
+                    css.append(f.read().decode())
+            bundle = bundle_name(name)
+            if self.exists(bundle):
+                self.delete(bundle)
+            self._save(bundle, ContentFile(minify_css('\n'.join(css)).encode()))
+            bundles[bundle] = (self, bundle)
+        return bundles
+
+    def compress(self, names):
+        for name in names:
+            if not name.endswith(COMPRESSED_EXTENSIONS):
+                continue
+            with self.open(name) as f:
+                content = f.read()
+            for extension, compress in COMPRESSIONS:
+                if self.exists(name + extension):
+                    # hashed name means the same content
+                    continue
+                self._save(name + extension, ContentFile(compress(content)))
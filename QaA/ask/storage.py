@@ -0,0 +1,43 @@
+import hashlib
+import os
+import pathlib
+import posixpath
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    # files are named by hash of their content, so a name never points to
+    # different content and may be cached forever; saving content which
+    # is already stored reuses existing file
+
+    def save(self, name, content, max_length=None):
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.content_name(name, content)
+        if self.exists(name):
+            self.touch(name)
+            return name
+        return super().save(name, content, max_length)
+
+    def touch(self, name):
+        # refresh modification time so sweeper grace period protects
+        # file which is referenced again
+        os.utime(self.path(name))
+
+    def content_name(self, name, content):
+        # avatars/photo.PNG -> avatars/3f/3f2a...c1.png
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        digest = digest.hexdigest()
+        extension = pathlib.PurePosixPath(name).suffix.lower()
+        return posixpath.join(posixpath.dirname(name), digest[:2],
+                              digest + extension)
+
+
+avatar_storage = ContentAddressedStorage()
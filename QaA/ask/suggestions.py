@@ -0,0 +1,135 @@
+from array import array
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F, Q
+
+from .models import FriendsModel, SuggestionModel, UserModel
+
+SUGGESTIONS_PER_USER = 10
+
+
+class FriendsGraph:
+    # accepted friendships as undirected graph in compressed sparse row
+    # form: neighbours of node i are neighbours[offsets[i]:offsets[i + 1]]
+
+    def __init__(self, edges):
+        firsts, seconds = array('l'), array('l')
+        for first, second in edges:
+            firsts.append(first)
+            seconds.append(second)
+
+        self.ids = array('l', sorted(set(firsts) | set(seconds)))
+        self.index = {user_id: i for i, user_id in enumerate(self.ids)}
+
+        degrees = array('l', [0]) * (len(self.ids) + 1)
+        for first, second in zip(firsts, seconds):
+            degrees[self.index[first] + 1] += 1
+            degrees[self.index[second] + 1] += 1
+        self.offsets = degrees
+        for i in range(1, len(self.offsets)):
+            self.offsets[i] += self.offsets[i - 1]
+
+        self.neighbours = array('l', [0]) * self.offsets[-1]
+        position = array('l', self.offsets[:-1])
+        for first, second in zip(firsts, seconds):
+            i, j = self.index[first], self.index[second]
+            self.neighbours[position[i]] = j
+            position[i] += 1
+            self.neighbours[position[j]] = i
+            position[j] += 1
+
+    @classmethod
+    def from_database(cls):
+        edges = FriendsModel.objects.filter(accepted=True).values_list(
+            'first', 'second').order_by().iterator(chunk_size=10000)
+        return cls(edges)
+
+    def node_neighbours(self, i):
+        return self.neighbours[self.offsets[i]:self.offsets[i + 1]]
+
+    def friends(self, user_id):
+        i = self.index.get(user_id)
+        if i is None:
+            return []
+        return [self.ids[j] for j in self.node_neighbours(i)]
+
+    def mutual_friends_counts(self, user_id, excluded=()):
+        # two-hop neighbours of user ranked by number of mutual friends
+        i = self.index.get(user_id)
+        if i is None:
+            return []
+        friends = set(self.node_neighbours(i))
+        counts = Counter()
+        for friend in friends:
+            counts.update(self.node_neighbours(friend))
+
+        excluded = {self.index[e] for e in excluded if e in self.index}
+        candidates = ((self.ids[j], n) for j, n in counts.items()
+                      if j != i and j not in friends and j not in excluded)
+        return sorted(candidates, key=lambda c: (-c[1], c[0]))
+
+
+def mark_suggestions_outdated(user_ids, with_friends=True):
+    # suggestions of users and (when friendship graph changed) of their
+    # friends depend on friends of given users
+    outdated = Q(pk__in=user_ids)
+    if with_friends:
+        accepted = FriendsModel.objects.filter(accepted=True)
+        outdated |= Q(pk__in=accepted.filter(first__in=user_ids).values('second'))
+        outdated |= Q(pk__in=accepted.filter(second__in=user_ids).values('first'))
+    UserModel.objects.filter(outdated).update(
+        suggestions_outdated=True,
+        suggestions_version=F('suggestions_version') + 1)
+
+
+def refresh_suggestions(user_ids=None, limit=SUGGESTIONS_PER_USER, batch_size=1000):
+    # recomputes suggestions of outdated users (or of given users),
+    # returns number of refreshed users
+    users = UserModel.objects.order_by('id')
+    if user_ids is None:
+        users = users.filter(suggestions_outdated=True)
+    else:
+        users = users.filter(pk__in=user_ids)
+    versions = list(users.values_list('id', 'suggestions_version'))
+    batches = [versions[start:start + batch_size]
+               for start in range(0, len(versions), batch_size)]
+
+    # versions are read before graph, so users whose friendships changed
+    # during refresh keep their flag; flags of batches not stored are kept
+    graph = FriendsGraph.from_database()
+    for batch in batches:
+        with transaction.atomic():
+            store_suggestions(graph, [user_id for user_id, _ in batch], limit)
+            clear_outdated(batch)
+    return len(versions)
+
+
+def clear_outdated(versions):
+    ids_by_version = {}
+    for user_id, version in versions:
+        ids_by_version.setdefault(version, []).append(user_id)
+    for version, user_ids in ids_by_version.items():
+        UserModel.objects.filter(
+            pk__in=user_ids, suggestions_version=version).update(
+            suggestions_outdated=False)
+
+
+def store_suggestions(graph, user_ids, limit):
+    pending = FriendsModel.objects.filter(accepted=False).filter(
+        Q(first__in=user_ids) | Q(second__in=user_ids)).values_list('first', 'second')
+    invited = {}
+    for first, second in pending:
+        invited.setdefault(first, set()).add(second)
+        invited.setdefault(second, set()).add(first)
+
+    suggestions = []
+    for user_id in user_ids:
+        ranked = graph.mutual_friends_counts(user_id, invited.get(user_id, ()))
+        suggestions.extend(
+            SuggestionModel(user_id=user_id, suggested_id=suggested_id,
+                            mutual_friends=mutual_friends)
+            for suggested_id, mutual_friends in ranked[:limit])
+
+    SuggestionModel.objects.filter(user__in=user_ids).delete()
+    SuggestionModel.objects.bulk_create(suggestions)
@@ -0,0 +1,222 @@
+import io
+import random
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connections
+from django.db.models import Max
+
+from .models import AnswerModel, FriendsModel, QuestionModel, UserModel
+
+# dates are spread over the year before EPOCH, so rows do not depend on
+# time of generation
+EPOCH = datetime(2021, 1, 1, tzinfo=timezone.utc)
+SPAN = timedelta(days=365)
+
+WORDS = ('what', 'why', 'how', 'when', 'where', 'who', 'do', 'you', 'think',
+         'about', 'the', 'best', 'worst', 'favourite', 'book', 'film', 'song',
+         'city', 'food', 'game', 'day', 'idea', 'friend', 'weekend', 'work',
+         'school', 'summer', 'winter', 'travel', 'music', 'sport', 'dream')
+
+
+def batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def copy_value(value):
+    # text format of COPY, generated values have no tabs or newlines
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return str(value).replace('\\', '\\\\')
+
+
+class Loader:
+    # writes rows given as tuples of field attnames with COPY on PostgreSQL
+    # and bulk_create elsewhere; bulk_create sets auto_now_add fields to
+    # time of insert, COPY keeps generated dates
+
+    def __init__(self, using, batch_size, copy=None):
+        self.connection = connections[using]
+        self.using = using
+        self.batch_size = batch_size
+        if copy is None:
+            copy = self.connection.vendor == 'postgresql'
+        self.copy = copy
+
+    def load(self, model, fields, rows):
+        count = 0
+        for batch in batches(rows, self.batch_size):
+            if self.copy:
+                self.copy_rows(model, fields, batch)
+            else:
+                model.objects.using(self.using).bulk_create(
+                    [model(**dict(zip(fields, row))) for row in batch])
+            count += len(batch)
+        return count
+
+    def copy_rows(self, model, fields, rows):
+        quote = self.connection.ops.quote_name
+        columns = ', '.join(quote(model._meta.get_field(name).column)
+                            for name in fields)
+        data = io.StringIO()
+        for row in rows:
+            data.write('\t'.join(map(copy_value, row)))
+            data.write('\n')
+        data.seek(0)
+        with self.connection.cursor() as cursor:
+            cursor.copy_expert('COPY {} ({}) FROM STDIN'.format(
+                quote(model._meta.db_table), columns), data)
+
+    def reset_sequences(self, models):
+        # rows were written with explicit ids
+        statements = self.connection.ops.sequence_reset_sql(no_style(), models)
+        with self.connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+
+class SyntheticDataset:
+    # users joined one after another; every new user invites up to
+    # `friends_per_user` earlier users picked with probability proportional
+    # to their degree plus one (preferential attachment), which gives
+    # power-law degree distribution; questions go to popular users the
+    # same way and each owner answers share of them drawn from U-shaped
+    # beta distribution, so most users answer almost all or almost none
+
+    def __init__(self, users, friends_per_user=5, questions_per_user=5,
+                 accepted_ratio=0.9, prefix='synthetic_', password='synthetic',
+                 seed=0):
+        self.users = users
+        self.friends_per_user = friends_per_user
+        self.questions = users * questions_per_user
+        self.accepted_ratio = accepted_ratio
+        self.prefix = prefix
+        self.password = password
+        self.rng = random.Random(seed)
+
+        # user numbers repeated once plus once per friendship
+        self.endpoints = array('i')
+        self.num_unanswered = array('i', [0]) * users
+        self.num_invites = array('i', [0]) * users
+
+    def joined(self, user):
+        return EPOCH - SPAN + SPAN * user / self.users
+
+    def friendships(self, user_ids, first_id):
+        rng = self.rng
+        endpoints = self.endpoints
+        friendship_id = first_id
+        for user in range(self.users):
+            targets = set()
+            for _ in range(min(self.friends_per_user, user)):
+                targets.add(endpoints[rng.randrange(len(endpoints))])
+            endpoints.append(user)
+            for target in sorted(targets):
+                endpoints.append(target)
+                endpoints.append(user)
+                accepted = rng.random() < self.accepted_ratio
+                if not accepted:
+                    self.num_invites[user] += 1
+                    self.num_invites[target] += 1
+                yield (friendship_id, user_ids(user), user_ids(target),
+                       self.joined(user), accepted)
+                friendship_id += 1
+
+    def questions_and_answers(self, user_ids, first_question_id, first_answer_id,
+                              answers):
+        # answers are written to `answers` list of their batch before
+        # questions referring to them
+        rng = self.rng
+        endpoints = self.endpoints
+        answer_ratio = array('d', (rng.betavariate(0.5, 0.5)
+                                   for _ in range(self.users)))
+        answer_id = first_answer_id
+        for number in range(self.questions):
+            owner = endpoints[rng.randrange(len(endpoints))]
+            asked_by = rng.randrange(self.users - 1) if self.users > 1 else owner
+            if asked_by >= owner and self.users > 1:
+                asked_by += 1
+            date = EPOCH - SPAN + SPAN * number / self.questions
+            answer = None
+            if rng.random() < answer_ratio[owner]:
+                answer = answer_id
+                answer_id += 1
+                answers.append((answer, self.text(), date + timedelta(
+                    minutes=rng.expovariate(1 / 600))))
+            else:
+                self.num_unanswered[owner] += 1
+            yield (first_question_id + number, user_ids(owner),
+                   user_ids(asked_by), self.text() + '?', date, answer)
+
+    def text(self):
+        return ' '.join(self.rng.choice(WORDS)
+                        for _ in range(self.rng.randint(3, 20))).capitalize()
+
+    def user_rows(self, user_ids):
+        password = make_password(self.password)
+        for user in range(self.users):
+            yield (user_ids(user), password, False, self.prefix + str(user),
+                   '', '', '', False, True, self.joined(user), False,
+                   self.num_unanswered[user], self.num_invites[user], True, 0)
+
+    def load(self, loader, log=lambda message: None):
+        # users are written last, when their counters are known; foreign
+        # keys are checked at commit, so caller runs this in a transaction
+        using = loader.using
+        first_ids = [
+            (model.objects.using(using).aggregate(Max('id'))['id__max'] or 0) + 1
+            for model in (UserModel, FriendsModel, QuestionModel, AnswerModel)]
+        first_user_id, first_friendship_id, first_question_id, first_answer_id = \
+            first_ids
+
+        def user_ids(user):
+            return first_user_id + user
+
+        def timed(name, load):
+            started = time.perf_counter()
+            count = load()
+            log('{}: {} rows in {:.1f} s'.format(
+                name, count, time.perf_counter() - started))
+
+        timed('friendships', lambda: loader.load(
+            FriendsModel, ('id', 'first_id', 'second_id', 'date', 'accepted'),
+            self.friendships(user_ids, first_friendship_id)))
+
+        def load_questions():
+            answers = []
+            count = 0
+            questions = self.questions_and_answers(
+                user_ids, first_question_id, first_answer_id, answers)
+            for batch in batches(questions, loader.batch_size):
+                count += loader.load(
+                    AnswerModel, ('id', 'content', 'date'), answers)
+                answers.clear()
+                count += loader.load(
+                    QuestionModel, ('id', 'owner_id', 'asked_by_id', 'content',
+                                    'date', 'answer_id'), batch)
+            return count
+        timed('questions and answers', load_questions)
+
+        timed('users', lambda: loader.load(
+            UserModel, ('id', 'password', 'is_superuser', 'username',
+                        'first_name', 'last_name', 'email', 'is_staff',
+                        'is_active', 'date_joined', 'avatar_thumbnails',
+                        'num_unanswered',
+                        'num_invites', 'suggestions_outdated',
+                        'suggestions_version'),
+            self.user_rows(user_ids)))
+
+        loader.reset_sequences(
+            [UserModel, FriendsModel, QuestionModel, AnswerModel])
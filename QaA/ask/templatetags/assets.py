@@ -0,0 +1,24 @@
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+
+from ..staticfiles import bundle_name
+
+register = template.Library()
+
+
+@register.simple_tag
+def stylesheets(name):
+    # one fingerprinted bundle built by collectstatic, or its source files
+    # in development and before collectstatic was run
+    bundle = bundle_name(name)
+    if not settings.DEBUG and bundle in getattr(
+            staticfiles_storage, 'hashed_files', {}):
+        names = [bundle]
+    else:
+        names = settings.STYLESHEET_BUNDLES[name]
+    return format_html_join(
+        '\n', '<link rel="stylesheet" type="text/css" href="{}">',
+        ((static(name),) for name in names))
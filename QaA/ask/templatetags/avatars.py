@@ -0,0 +1,25 @@
+from django import template
+
+from ..storage import avatar_storage
+from ..thumbnails import fitting_size, thumbnail_name
+
+register = template.Library()
+
+
+@register.inclusion_tag('ask/avatar.html')
+def avatar(image, width, css_class, default_class=None):
+    # renders smallest thumbnail fitting displayed width, with webp source
+    # and twice as large variant for high density screens; falls back to
+    # original image until thumbnails are rendered
+    context = {'image': image, 'width': width, 'css_class': css_class,
+               'default_class': default_class or css_class}
+    if image and image.instance.avatar_thumbnails:
+        size = fitting_size(width)
+        double_size = fitting_size(2 * width)
+        for extension in ('webp', 'jpg'):
+            context[extension] = '{} 1x, {} 2x'.format(
+                avatar_storage.url(thumbnail_name(image.name, size, extension)),
+                avatar_storage.url(thumbnail_name(image.name, double_size, extension)))
+        context['src'] = avatar_storage.url(
+            thumbnail_name(image.name, size, 'jpg'))
+    return context
@@ -0,0 +1,24 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from ..navigation import cached_navigation
+
+register = template.Library()
+
+# context of pages whose navigation bar can be cached
+NAVIGATION_KEYS = ('user_avatar', 'num_unanswered', 'num_invites')
+
+
+@register.simple_tag(takes_context=True)
+def navigation_bar(context):
+    # navigation bar of logged in user is rendered once per version, on
+    # hit lazy avatar and counters in context are never evaluated
+    fragment = context.template.engine.get_template(
+        'ask/navigation_fragment.html')
+    user_id = context['request'].session.get('_auth_user_id')
+    # pages rendered without avatar and counters (e.g. invalid form) would
+    # cache incomplete navigation bar
+    if user_id is None or not all(key in context for key in NAVIGATION_KEYS):
+        return fragment.render(context)
+    return mark_safe(cached_navigation(
+        user_id, lambda: fragment.render(context)))
@@ -0,0 +1,75 @@
+import re
+
+from django import template
+from django.utils.safestring import mark_safe
+
+from ..profiles import cached_profile
+
+register = template.Library()
+
+# parts of cached profile rendered for every request, markers can't come
+# from users' content because it is escaped
+CSRF_MARKER = mark_safe('<!--csrf-->')
+UNCACHED_RE = re.compile(r'<!--uncached:([\w/.\-]+)-->')
+
+
+class CachedProfileNode(template.Node):
+
+    def __init__(self, nodelist, profile):
+        self.nodelist = nodelist
+        self.profile = profile
+
+    def render(self, context):
+        profile = self.profile.resolve(context)
+        if profile is None:
+            return self.nodelist.render(context)
+
+        def render():
+            with context.push(csrf_token=CSRF_MARKER, rendering_cached=True):
+                return self.nodelist.render(context)
+
+        user_id, relationship = profile
+        logged_in = context['request'].user.is_authenticated
+        html = cached_profile(user_id, relationship, logged_in, render)
+        html = html.replace(CSRF_MARKER, str(context.get('csrf_token', '')))
+        return mark_safe(UNCACHED_RE.sub(
+            lambda match: render_template(context, match.group(1)), html))
+
+
+class UncachedNode(template.Node):
+
+    def __init__(self, template_name):
+        self.template_name = template_name
+
+    def render(self, context):
+        if context.get('rendering_cached'):
+            return '<!--uncached:{}-->'.format(self.template_name)
+        return render_template(context, self.template_name)
+
+
+def render_template(context, template_name):
+    return context.template.engine.get_template(template_name).render(context)
+
+
+@register.tag
+def cachedprofile(parser, token):
+    # {% cachedprofile profile_cache %}...{% endcachedprofile %} caches
+    # content for (user id, viewer relationship) pair, None disables cache
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise template.TemplateSyntaxError(
+            "'{}' tag takes one argument".format(bits[0]))
+    nodelist = parser.parse(('endcachedprofile',))
+    parser.delete_first_token()
+    return CachedProfileNode(nodelist, parser.compile_filter(bits[1]))
+
+
+@register.tag
+def uncached(parser, token):
+    # {% uncached "template.html" %} is rendered on every request, also
+    # inside cached profile
+    bits = token.split_contents()
+    if len(bits) != 2 or bits[1][0] not in '"\'' or bits[1][0] != bits[1][-1]:
+        raise template.TemplateSyntaxError(
+            "'{}' tag takes quoted template name".format(bits[0]))
+    return UncachedNode(bits[1][1:-1])
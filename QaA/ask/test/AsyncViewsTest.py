@@ -0,0 +1,103 @@
+import asyncio
+import threading
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from ..concurrency import gather
+from ..test.LoginMixIn import *
+from ..test.QuestionsMixIn import *
+from ..view.FriendsViews import (FriendAcceptedView, FriendsAlphabetical,
+                                 FriendsAskView, FriendsBase,
+                                 FriendsInvitationList, FriendsRecent)
+from ..views import (ProfileView, UnansweredFragmentView, UnansweredView,
+                     UserView)
+
+
+class AsyncViewsTest(TestCase, QuestionsMixIn, LoginMixIn):
+
+    def setUp(self):
+        cache.clear()
+        self.create_users()
+        self.create_question1(with_answer=True)
+        self.create_question2()
+        self.login_user(username="TestUser2")
+        self.async_client.cookies = self.client.cookies
+
+    def test_views_are_coroutine_functions(self):
+        for view in (ProfileView, UserView, UnansweredView,
+                     UnansweredFragmentView, FriendsBase, FriendsRecent,
+                     FriendsAlphabetical, FriendsInvitationList,
+                     FriendAcceptedView, FriendsAskView):
+            self.assertTrue(asyncio.iscoroutinefunction(view.as_view()), view)
+
+    async def test_profile_is_served_by_async_handler(self):
+        response = await self.async_client.get(reverse('ask:profile'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Test Question 1")
+        self.assertEqual(response.context['num_unanswered'], 1)
+
+    async def test_user_page_context_is_complete(self):
+        response = await self.async_client.get(
+            reverse('ask:user', args=['TestUser1']))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context['is_friend'])
+        self.assertEqual(response.context['num_mutual_friends'], 0)
+        self.assertEqual(response.context['num_invites'], 0)
+
+    async def test_not_allowed_method_is_answered_by_async_handler(self):
+        response = await self.async_client.put(reverse('ask:profile'))
+
+        self.assertEqual(response.status_code, 405)
+
+
+class ConcurrentLookupsTest(TransactionTestCase, QuestionsMixIn, LoginMixIn):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+
+    def test_lookups_run_at_the_same_time(self):
+        # each call waits for the other one, so both have to run at once
+        barrier = threading.Barrier(2, timeout=5)
+
+        def wait():
+            barrier.wait()
+            return threading.get_ident()
+
+        first, second = async_to_sync(gather)(wait, wait)
+
+        self.assertNotEqual(first, second)
+
+    def test_lookups_run_in_request_thread_inside_transaction(self):
+        with transaction.atomic():
+            idents = async_to_sync(gather)(threading.get_ident,
+                                           threading.get_ident)
+
+        self.assertEqual(idents, [threading.get_ident()] * 2)
+
+    def test_lookups_run_in_request_thread_when_disabled(self):
+        with self.settings(CONCURRENT_LOOKUPS=False):
+            idents = async_to_sync(gather)(threading.get_ident,
+                                           threading.get_ident)
+
+        self.assertEqual(idents, [threading.get_ident()] * 2)
+
+    def test_pages_are_rendered_with_concurrent_lookups(self):
+        self.create_users()
+        self.create_question1(with_answer=True)
+        self.login_user(username="TestUser2")
+
+        profile = self.client.get(reverse('ask:profile'))
+        user = self.client.get(reverse('ask:user', args=['TestUser1']))
+        friends = self.client.get(reverse('ask:friends'))
+
+        self.assertContains(profile, "Test Question 1")
+        self.assertEqual(user.status_code, 200)
+        self.assertEqual(friends.status_code, 200)
+        self.assertEqual(list(friends.context['friends']), [])
@@ -0,0 +1,82 @@
+import os
+from datetime import timedelta
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase
+
+from .. import media
+from ..avatars import sweep_avatars
+from ..storage import avatar_storage
+from ..thumbnails import thumbnail_names
+from ..test.MediaMixIn import *
+from ..test.QuestionsMixIn import *
+
+
+class AvatarStorageTest(TestCase, QuestionsMixIn, MediaMixIn):
+
+    def setUp(self):
+        self.use_temporary_media_root()
+        self.create_users()
+
+    def test_same_content_is_saved_under_same_name(self):
+        first = avatar_storage.save('avatars/a.png', ContentFile(b'image'))
+        second = avatar_storage.save('avatars/b.PNG', ContentFile(b'image'))
+        other = avatar_storage.save('avatars/c.png', ContentFile(b'other'))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertTrue(first.startswith('avatars/'))
+        self.assertTrue(first.endswith('.png'))
+
+    def test_saving_existing_content_refreshes_modification_time(self):
+        name = avatar_storage.save('avatars/a.png', ContentFile(b'image'))
+        os.utime(avatar_storage.path(name), (0, 0))
+
+        avatar_storage.save('avatars/b.png', ContentFile(b'image'))
+
+        self.assertNotEqual(os.path.getmtime(avatar_storage.path(name)), 0)
+
+    def test_sweeper_deletes_only_unreferenced_files(self):
+        used = avatar_storage.save('avatars/a.png', ContentFile(b'used'))
+        unused = avatar_storage.save('avatars/b.png', ContentFile(b'unused'))
+        for name in thumbnail_names(used) + thumbnail_names(unused):
+            with open(avatar_storage.path(name), 'wb') as f:
+                f.write(name.encode())
+        UserModel.objects.filter(pk=self.test_user1.pk).update(avatar=used)
+
+        deleted = sweep_avatars(grace_period=timedelta(0))
+
+        self.assertEqual(len(deleted), 1 + len(thumbnail_names(unused)))
+        self.assertTrue(avatar_storage.exists(used))
+        self.assertFalse(avatar_storage.exists(unused))
+
+    def test_sweeper_keeps_new_files(self):
+        name = avatar_storage.save('avatars/a.png', ContentFile(b'image'))
+
+        self.assertEqual(sweep_avatars(), [])
+        self.assertTrue(avatar_storage.exists(name))
+
+    def test_sweeper_deletes_superseded_legacy_avatars(self):
+        legacy = 'user_id_1_TestUser1/avatar.png'
+        with open(avatar_storage.path('') + '/placeholder', 'w'):
+            pass
+        os.makedirs(os.path.dirname(avatar_storage.path(legacy)))
+        with open(avatar_storage.path(legacy), 'wb') as f:
+            f.write(b'image')
+
+        call_command('sweep_avatars', '--once', '--grace-period', '0',
+                     stdout=StringIO())
+
+        self.assertFalse(avatar_storage.exists(legacy))
+        self.assertTrue(avatar_storage.exists('placeholder'))
+
+    def test_avatars_are_served_with_immutable_cache_headers(self):
+        name = avatar_storage.save('avatars/a.png', ContentFile(b'image'))
+
+        response = media.serve(RequestFactory().get('/media/' + name), name)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age=31536000', response['Cache-Control'])
@@ -0,0 +1,177 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.db.utils import load_backend
+from django.test import SimpleTestCase
+
+from ..db.pool import ConnectionPool, PoolTimeout, connection_pool, pool_stats
+
+
+class ConnectionPoolTest(SimpleTestCase):
+    # SQLite file database stands in for PostgreSQL
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'db.sqlite3')
+
+    def connect(self):
+        return sqlite3.connect(self.path, check_same_thread=False)
+
+    def make_pool(self, **kwargs):
+        pool = ConnectionPool(self.connect, **kwargs)
+        self.addCleanup(pool.close)
+        return pool
+
+    def test_released_connection_is_reused(self):
+        pool = self.make_pool()
+
+        connection = pool.acquire()
+        pool.release(connection)
+
+        self.assertIs(pool.acquire(), connection)
+        stats = pool.stats()
+        self.assertEqual(stats['connects'], 1)
+        self.assertEqual(stats['checkouts'], 2)
+        self.assertEqual(stats['in_use'], 1)
+
+    def test_open_transaction_is_rolled_back_on_release(self):
+        pool = self.make_pool()
+        connection = pool.acquire()
+        connection.execute('CREATE TABLE t (x INTEGER)')
+        connection.commit()
+        connection.execute('INSERT INTO t VALUES (1)')
+
+        pool.release(connection)
+
+        self.assertEqual(self.connect().execute(
+            'SELECT COUNT(*) FROM t').fetchone(), (0,))
+
+    def test_checkout_times_out_when_pool_is_exhausted(self):
+        pool = self.make_pool(max_size=1, timeout=0.05)
+        pool.acquire()
+
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+
+        stats = pool.stats()
+        self.assertEqual(stats['timeouts'], 1)
+        self.assertEqual(stats['waits'], 1)
+        self.assertEqual(stats['size'], 1)
+
+    def test_checkout_waits_for_released_connection(self):
+        pool = self.make_pool(max_size=1, timeout=5)
+        connection = pool.acquire()
+        releaser = threading.Timer(0.1, pool.release, [connection])
+        releaser.start()
+        self.addCleanup(releaser.join)
+
+        self.assertIs(pool.acquire(), connection)
+
+        stats = pool.stats()
+        self.assertEqual(stats['waits'], 1)
+        self.assertGreaterEqual(stats['max_wait_time'], 0.05)
+        self.assertEqual(stats['connects'], 1)
+
+    def test_broken_connection_is_replaced_on_checkout(self):
+        pool = self.make_pool()
+        connection = pool.acquire()
+        pool.release(connection)
+        connection.close()
+
+        replacement = pool.acquire()
+
+        self.assertIsNot(replacement, connection)
+        replacement.execute('SELECT 1')
+        self.assertEqual(pool.stats()['failed_checks'], 1)
+
+    def test_idle_connection_is_recycled(self):
+        pool = self.make_pool(max_idle=0.05)
+        connection = pool.acquire()
+        pool.release(connection)
+        time.sleep(0.1)
+
+        self.assertIsNot(pool.acquire(), connection)
+        stats = pool.stats()
+        self.assertEqual(stats['recycled'], 1)
+        self.assertEqual(stats['size'], 1)
+
+    def test_old_connection_is_recycled_on_release(self):
+        pool = self.make_pool(max_lifetime=0.05)
+        connection = pool.acquire()
+        time.sleep(0.1)
+
+        pool.release(connection)
+
+        stats = pool.stats()
+        self.assertEqual(stats['recycled'], 1)
+        self.assertEqual(stats['size'], 0)
+
+    def test_utilisation_is_share_of_time_connections_were_in_use(self):
+        pool = self.make_pool(max_size=2)
+        first, second = pool.acquire(), pool.acquire()
+        time.sleep(0.1)
+        pool.release(first)
+        pool.release(second)
+
+        stats = pool.stats()
+        self.assertEqual(stats['peak_in_use'], 2)
+        self.assertGreater(stats['utilisation'], 0.5)
+        self.assertLessEqual(stats['utilisation'], 1.0)
+
+
+class PooledBackendTest(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.wrapper = self.make_wrapper(
+            os.path.join(directory, 'db.sqlite3'), 'pooled_test')
+        self.addCleanup(self.close_pool)
+
+    def make_wrapper(self, name, alias, **pool):
+        backend = load_backend('ask.db.backends.sqlite3')
+        return backend.DatabaseWrapper({
+            'NAME': name,
+            'USER': '', 'PASSWORD': '', 'HOST': '', 'PORT': '',
+            'OPTIONS': {}, 'TIME_ZONE': None, 'CONN_MAX_AGE': 0,
+            'AUTOCOMMIT': True, 'ATOMIC_REQUESTS': False,
+            'POOL': dict({'MAX_SIZE': 2, 'STATS_INTERVAL': None}, **pool),
+        }, alias=alias)
+
+    def close_pool(self):
+        self.wrapper.close()
+        connection_pool('pooled_test').close()
+
+    def test_closed_connection_goes_back_to_pool(self):
+        self.wrapper.ensure_connection()
+        raw_connection = self.wrapper.connection
+
+        self.wrapper.close()
+        self.wrapper.ensure_connection()
+
+        self.assertIs(self.wrapper.connection, raw_connection)
+        with self.wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            self.assertEqual(cursor.fetchone(), (1,))
+        stats = pool_stats()['pooled_test']
+        self.assertEqual(stats['connects'], 1)
+        self.assertEqual(stats['max_size'], 2)
+
+    def test_in_memory_database_is_not_pooled(self):
+        # close() of in-memory database keeps connection open, so pooled
+        # connections of threads would never be released
+        wrappers = [self.make_wrapper(':memory:', 'memory_test',
+                                      MAX_SIZE=1, TIMEOUT=0.05)
+                    for _ in range(2)]
+        for wrapper in wrappers:
+            self.addCleanup(wrapper._close)
+            wrapper.ensure_connection()
+            wrapper.close()
+
+        self.assertIsNotNone(wrappers[1].connection)
+        self.assertIsNone(connection_pool('memory_test'))
@@ -0,0 +1,156 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.shortcuts import reverse
+from django.test import TestCase
+
+from ..models import FriendsModel
+from ..test.FriendsMixIn import *
+from ..test.LoginMixIn import *
+from ..test.QuestionsMixIn import *
+
+
+class UnansweredCounterTest(TestCase, QuestionsMixIn, LoginMixIn):
+
+    def setUp(self):
+        self.create_users()
+
+    def test_new_question_increments_owner_counter(self):
+        self.create_question1()
+        self.create_question2()
+
+        self.assertEqual(self.num_unanswered("TestUser2"), 2)
+        self.assertEqual(self.num_unanswered("TestUser1"), 0)
+
+    def test_question_created_with_answer_is_not_counted(self):
+        self.create_question1(with_answer=True)
+
+        self.assertEqual(self.num_unanswered("TestUser2"), 0)
+
+    def test_asking_question_in_view_increments_counter(self):
+        self.login_user(username="TestUser1")
+        form = {'question_content': 'question', 'action': 'ask_question'}
+
+        self.client.post(reverse('ask:user', args=('TestUser2',)), data=form)
+
+        self.assertEqual(self.num_unanswered("TestUser2"), 1)
+
+    def test_answering_question_decrements_counter(self):
+        self.create_question1()
+        self.create_question2()
+        self.login_user(username="TestUser2")
+        form = {'answer_content': 'answer', 'question_id': self.question1.id}
+
+        response = self.client.post(reverse('ask:unanswered'), data=form)
+
+        self.assertEqual(self.num_unanswered("TestUser2"), 1)
+        self.assertEqual(response.context['num_unanswered'], 1)
+
+    def test_answering_answered_question_does_not_change_counter(self):
+        self.create_question1(with_answer=True)
+        self.create_question2()
+        self.login_user(username="TestUser2")
+        form = {'answer_content': 'again', 'question_id': self.question1.id}
+
+        self.client.post(reverse('ask:unanswered'), data=form)
+
+        self.assertEqual(self.num_unanswered("TestUser2"), 1)
+        self.assertEqual(QuestionModel.objects.get(pk=self.question1.pk).answer,
+                         self.answer1)
+        self.assertFalse(AnswerModel.objects.filter(content='again').exists())
+
+    def test_answering_question_of_other_user_does_nothing(self):
+        self.create_question1()
+        self.login_user(username="TestUser1")
+        form = {'answer_content': 'answer', 'question_id': self.question1.id}
+
+        self.client.post(reverse('ask:unanswered'), data=form)
+
+        self.assertEqual(self.num_unanswered("TestUser2"), 1)
+        self.assertIsNone(QuestionModel.objects.get(pk=self.question1.pk).answer)
+
+    def test_deleting_unanswered_question_decrements_counter(self):
+        self.create_question1()
+
+        self.question1.delete()
+
+        self.assertEqual(self.num_unanswered("TestUser2"), 0)
+
+    def num_unanswered(self, username):
+        return UserModel.objects.get(username=username).num_unanswered
+
+
+class InvitesCounterTest(TestCase, FriendsMixIn, LoginMixIn):
+
+    def setUp(self):
+        self.create_users()
+        self.make_friends()
+        self.create_invitations()
+
+    def test_accepted_friends_are_not_counted(self):
+        self.assertEqual(self.num_invites("TestUser1"), 0)
+
+    def test_pending_invitations_are_counted_for_both_users(self):
+        self.assertEqual(self.num_invites("TestUser8"), 4)
+        self.assertEqual(self.num_invites("TestUser6"), 2)
+        self.assertEqual(self.num_invites("TestUser3"), 1)
+
+    def test_add_friend_increments_counters(self):
+        self.login_user(username="IhaveNoFriends")
+
+        self.client.post(reverse('ask:user', args=('TestUser1',)),
+                         data={'action': 'add_friend'})
+
+        self.assertEqual(self.num_invites("IhaveNoFriends"), 1)
+        self.assertEqual(self.num_invites("TestUser1"), 1)
+
+    def test_accepting_invitation_decrements_counters(self):
+        self.login_user(username="TestUser8")
+
+        response = self.client.post(reverse('ask:friends.accept'),
+                                    data={'user_id': self.user2.id})
+
+        self.assertEqual(self.num_invites("TestUser8"), 3)
+        self.assertEqual(self.num_invites("TestUser2"), 0)
+        self.assertEqual(response.context['num_invites'], 3)
+
+    def test_removing_pending_friend_decrements_counters(self):
+        self.login_user(username="TestUser8")
+
+        self.client.post(reverse('ask:user', args=('TestUser3',)),
+                         data={'action': 'remove_friend'})
+
+        self.assertEqual(self.num_invites("TestUser8"), 3)
+        self.assertEqual(self.num_invites("TestUser3"), 0)
+
+    def test_removing_accepted_friend_does_not_change_counters(self):
+        self.login_user(username="TestUser1")
+
+        self.client.post(reverse('ask:user', args=('TestUser2',)),
+                         data={'action': 'remove_friend'})
+
+        self.assertEqual(self.num_invites("TestUser1"), 0)
+        self.assertEqual(self.num_invites("TestUser2"), 1)
+
+    def test_rebuild_counters_fixes_drifted_values(self):
+        UserModel.objects.update(num_invites=7, num_unanswered=3)
+        out = StringIO()
+
+        call_command('rebuild_counters', stdout=out)
+
+        self.assertEqual(self.num_invites("TestUser8"), 4)
+        self.assertEqual(self.num_invites("TestUser1"), 0)
+        self.assertEqual(
+            UserModel.objects.get(username="TestUser8").num_unanswered, 0)
+        self.assertIn('8 users were out of date', out.getvalue())
+
+    def test_rebuild_counters_of_single_user(self):
+        UserModel.objects.update(num_invites=7)
+
+        call_command('rebuild_counters', 'TestUser8', stdout=StringIO())
+
+        self.assertEqual(self.num_invites("TestUser8"), 4)
+        self.assertEqual(self.num_invites("TestUser1"), 7)
+
+    def num_invites(self, username):
+        return UserModel.objects.get(username=username).num_invites
@@ -0,0 +1,67 @@
+from importlib import import_module
+
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from django.test import TestCase
+
+from ..models import FriendsModel, UserModel
+from ..test.FriendsMixIn import *
+
+migration = import_module('ask.migrations.0005_hot_query_indexes')
+
+
+class DuplicatedFriendsMigrationTest(TestCase, FriendsMixIn):
+
+    def setUp(self):
+        self.create_users()
+        # duplicated pairs were possible before 0013, dropped index is
+        # restored when test transaction is rolled back
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX friends_unique_unordered_pair')
+
+    def remove_duplicated_friends(self):
+        # historical models, which send no signals
+        apps = MigrationLoader(connection).project_state(
+            ('ask', '0004_usermodel_counters')).apps
+        migration.remove_duplicated_friends(apps, None)
+
+    def test_accepted_row_of_pair_is_kept(self):
+        FriendsModel.objects.create(first=self.user1, second=self.user2)
+        accepted = FriendsModel.objects.create(
+            first=self.user2, second=self.user1, accepted=True)
+
+        self.remove_duplicated_friends()
+
+        self.assertEqual(list(FriendsModel.objects.all()), [accepted])
+
+    def test_oldest_pending_row_of_pair_is_kept(self):
+        oldest = FriendsModel.objects.create(first=self.user1, second=self.user2)
+        FriendsModel.objects.create(first=self.user2, second=self.user1)
+
+        self.remove_duplicated_friends()
+
+        self.assertEqual(list(FriendsModel.objects.all()), [oldest])
+
+    def test_invite_counters_are_recomputed(self):
+        FriendsModel.objects.create(first=self.user1, second=self.user2)
+        FriendsModel.objects.create(
+            first=self.user2, second=self.user1, accepted=True)
+        FriendsModel.objects.create(first=self.user3, second=self.user1)
+        UserModel.objects.update(num_invites=9)
+
+        self.remove_duplicated_friends()
+
+        self.assertEqual(UserModel.objects.get(pk=self.user1.pk).num_invites, 1)
+        self.assertEqual(UserModel.objects.get(pk=self.user2.pk).num_invites, 0)
+        # not in duplicated pair
+        self.assertEqual(UserModel.objects.get(pk=self.user3.pk).num_invites, 9)
+
+    def test_pairs_without_duplicates_are_left_alone(self):
+        FriendsModel.objects.create(first=self.user1, second=self.user2)
+        FriendsModel.objects.create(first=self.user3, second=self.user2)
+        UserModel.objects.filter(pk=self.user2.pk).update(num_invites=5)
+
+        self.remove_duplicated_friends()
+
+        self.assertEqual(FriendsModel.objects.count(), 2)
+        self.assertEqual(UserModel.objects.get(pk=self.user2.pk).num_invites, 5)
@@ -1,8 +1,11 @@
+from unittest import mock
+
 from django.shortcuts import reverse
 from django.test import TestCase
 
 from ..test.FriendsMixIn import *
 from ..test.LoginMixIn import *
+from ..view.FriendsViews import FriendSearchView
 
 
 class FriendSearchViewTest(TestCase, FriendsMixIn, LoginMixIn):
@@ -27,7 +30,7 @@ class FriendSearchViewTest(TestCase, FriendsMixIn, LoginMixIn):
         response = self.client.post(reverse('ask:friends.search'), data=form)
 
         self.assertEqual(list(response.context['friends']), [
-                         self.user4, self.user1, self.user5])
+                         self.user1, self.user4, self.user5])
 
     def test_search_for_user2_with_one_matching_user_returns_one_user(self):
         self.login_user(username="TestUser2")
@@ -44,3 +47,42 @@ class FriendSearchViewTest(TestCase, FriendsMixIn, LoginMixIn):
         response = self.client.post(reverse('ask:friends.search'), data=form)
 
         self.assertEqual(list(response.context['friends']), [])
+
+    def test_search_is_case_insensitive(self):
+        self.login_user(username="TestUser2")
+        form = {'search_text': 'testuser4'}
+
+        response = self.client.post(reverse('ask:friends.search'), data=form)
+
+        self.assertEqual(list(response.context['friends']), [self.user4])
+
+    def test_search_usernames_starting_with_text_are_first(self):
+        self.login_user(username="TestUser5")
+        self.user6.username = "MyTestUser6"
+        self.user6.save()
+        form = {'search_text': 'test'}
+
+        response = self.client.post(reverse('ask:friends.search'), data=form)
+
+        self.assertEqual(list(response.context['friends']), [
+                         self.user1, self.user2, self.user3, self.user4, self.user6])
+
+    def test_search_does_not_return_pending_friends(self):
+        self.login_user(username="TestUser8")
+        form = {'search_text': 'TestUser'}
+
+        response = self.client.post(reverse('ask:friends.search'), data=form)
+
+        self.assertEqual(list(response.context['friends']), [])
+
+    def test_search_results_are_paginated(self):
+        self.login_user(username="TestUser5")
+        url = reverse('ask:friends.search')
+
+        with mock.patch.object(FriendSearchView, 'paginate_by', 2):
+            response = self.client.get(
+                url, {'search_text': 'TestUser', 'page': 2})
+
+        self.assertEqual(list(response.context['friends']), [
+                         self.user3, self.user4])
+        self.assertContains(response, 'search_text=TestUser&page=3')
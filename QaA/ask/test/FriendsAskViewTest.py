@@ -0,0 +1,68 @@
+from django.shortcuts import reverse
+from django.test import TestCase
+
+from ..models import QuestionModel
+from ..test.FriendsMixIn import *
+from ..test.LoginMixIn import *
+
+
+class FriendsAskViewTest(TestCase, FriendsMixIn, LoginMixIn):
+    url = reverse('ask:friends.ask')
+
+    def setUp(self):
+        self.create_users()
+        self.make_friends()
+        self.create_invitations()
+
+    def test_POST_question_is_asked_to_all_friends(self):
+        self.login_user(username="TestUser5")
+
+        response = self.client.post(self.url, data={'question_content': 'Hi all?'})
+
+        self.assertEqual(response.status_code, 200)
+        owners = QuestionModel.objects.filter(
+            content='Hi all?').values_list('owner', flat=True)
+        self.assertEqual(sorted(owners), sorted([
+            self.user1.id, self.user2.id, self.user3.id, self.user4.id, self.user6.id]))
+
+    def test_POST_question_is_not_asked_to_pending_friends(self):
+        self.login_user(username="TestUser8")
+
+        self.client.post(self.url, data={'question_content': 'Hi all?'})
+
+        self.assertEqual(QuestionModel.objects.count(), 0)
+
+    def test_POST_question_is_asked_to_selected_friends_only(self):
+        self.login_user(username="TestUser5")
+        form = {'question_content': 'Hi?',
+                'recipients': [self.user1.id, self.user3.id, self.user8.id]}
+
+        self.client.post(self.url, data=form)
+
+        owners = QuestionModel.objects.values_list('owner', flat=True)
+        self.assertEqual(sorted(owners), [self.user1.id, self.user3.id])
+
+    def test_POST_unanswered_counters_of_recipients_are_incremented(self):
+        self.login_user(username="TestUser5")
+
+        self.client.post(self.url, data={'question_content': 'Hi all?'})
+        self.client.post(self.url, data={'question_content': 'Hi again?',
+                                         'recipients': [self.user1.id]})
+
+        self.assertEqual(UserModel.objects.get(
+            username="TestUser1").num_unanswered, 2)
+        self.assertEqual(UserModel.objects.get(
+            username="TestUser6").num_unanswered, 1)
+        self.assertEqual(UserModel.objects.get(
+            username="TestUser5").num_unanswered, 0)
+
+    def test_POST_number_of_writes_does_not_depend_on_number_of_friends(self):
+        self.login_user(username="TestUser5")
+
+        # user, savepoint, recipients, insert, counters update,
+        # release savepoint, friends, suggestions
+        with self.assertNumQueries(8):
+            self.client.post(self.url, data={'question_content': 'Hi all?'})
+        with self.assertNumQueries(8):
+            self.client.post(self.url, data={'question_content': 'Hi?',
+                                             'recipients': [self.user1.id]})
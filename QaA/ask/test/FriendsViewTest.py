@@ -1,8 +1,10 @@
+from django.db.models import QuerySet
 from django.shortcuts import reverse
 from django.test import TestCase
 
 from ..test.FriendsMixIn import *
 from ..test.LoginMixIn import *
+from ..view.MixIns import FriendsMixIn as FriendsViewMixIn
 
 
 class FriendsViewTest(TestCase, FriendsMixIn, LoginMixIn):
@@ -117,3 +119,30 @@ class FriendsViewTest(TestCase, FriendsMixIn, LoginMixIn):
 
         self.assertEqual(list(response.context['invitations']), [
                          self.user8, self.user4])
+
+    def test_user_friends_is_lazy_queryset(self):
+        friends = FriendsViewMixIn().user_friends(self.user5)
+
+        self.assertIsInstance(friends, QuerySet)
+
+    def test_user_friends_in_both_directions_with_single_query(self):
+        with self.assertNumQueries(1):
+            friends = list(FriendsViewMixIn().user_friends(self.user5))
+
+        self.assertEqual(friends,
+                         [self.user1, self.user2, self.user4, self.user3, self.user6])
+
+    def test_user_friends_annotated_with_friendship_date(self):
+        friends = FriendsViewMixIn().user_friends(self.user1)
+
+        friendship = FriendsModel.objects.get(
+            first=self.user5, second=self.user1)
+        self.assertEqual(friends.get(pk=self.user5.pk).friendship_date,
+                         friendship.date)
+
+    def test_GET_friends_page_number_of_queries(self):
+        self.login_user(username="TestUser5")
+
+        # user, friends, suggestions
+        with self.assertNumQueries(3):
+            self.client.get(reverse('ask:friends'))
@@ -0,0 +1,64 @@
+from django.shortcuts import reverse
+from django.test import RequestFactory, TestCase
+
+from ..identity import IdentityMapMiddleware
+from ..test.FriendsMixIn import *
+from ..test.LoginMixIn import *
+from ..view.MixIns import get_user, get_user_by_username
+
+
+class IdentityMapTest(TestCase, FriendsMixIn, LoginMixIn):
+
+    def setUp(self):
+        self.create_users()
+        self.make_friends()
+        self.create_invitations()
+
+    def test_GET_profile_fetches_logged_in_user_once(self):
+        self.login_user(username="TestUser2")
+
+        # user, answered questions
+        with self.assertNumQueries(2):
+            self.client.get(reverse('ask:profile'))
+
+    def test_GET_user_fetches_each_user_once(self):
+        self.login_user(username="TestUser2")
+
+        # logged in user, viewed user, answered questions, friendship in
+        # both directions, mutual friends
+        with self.assertNumQueries(6):
+            self.client.get(reverse('ask:user', args=('TestUser1',)))
+
+    def test_GET_settings_fetches_logged_in_user_once(self):
+        self.login_user(username="TestUser2")
+
+        with self.assertNumQueries(1):
+            self.client.get(reverse('ask:settings'))
+
+    def test_user_is_fetched_once_in_request(self):
+        request = RequestFactory().get('/')
+        users = []
+
+        def view(request):
+            users.append(get_user(self.user1.id))
+            users.append(get_user(str(self.user1.id)))
+            users.append(get_user_by_username("TestUser1"))
+            return None
+
+        with self.assertNumQueries(1):
+            IdentityMapMiddleware(view)(request)
+
+        self.assertIs(users[0], users[1])
+        self.assertIs(users[0], users[2])
+
+    def test_users_are_not_cached_outside_of_request(self):
+        with self.assertNumQueries(2):
+            get_user(self.user1.id)
+            get_user(self.user1.id)
+
+    def test_identity_map_is_dropped_after_request(self):
+        request = RequestFactory().get('/')
+        IdentityMapMiddleware(lambda request: get_user(self.user1.id))(request)
+
+        with self.assertNumQueries(1):
+            get_user(self.user1.id)
@@ -0,0 +1,142 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.servers.basehttp import WSGIServer
+from django.test import LiveServerTestCase, SimpleTestCase
+from django.test.testcases import LiveServerThread, QuietWSGIRequestHandler
+
+from ..loadtest import Recorder, compare_reports, percentile, url_name
+from ..management.commands.loadtest import Command as LoadTestCommand
+from ..models import AnswerModel, FriendsModel, QuestionModel, UserModel
+
+
+class LoadTestReportTest(SimpleTestCase):
+
+    def test_percentile_is_nearest_rank(self):
+        values = list(range(1, 101))
+
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 99), 7)
+        self.assertIsNone(percentile([], 50))
+
+    def test_requests_are_grouped_by_url_name(self):
+        self.assertEqual(url_name('GET', '/ask/user/TestUser1'), 'GET ask:user')
+        self.assertEqual(url_name('POST', '/ask/friends/accept'),
+                         'POST ask:friends.accept')
+        self.assertEqual(url_name('GET', '/missing'), 'GET /missing')
+
+    def test_report_contains_percentiles_and_errors(self):
+        recorder = Recorder()
+        recorder.start()
+        for milliseconds in range(1, 101):
+            recorder.record('GET ask:profile', milliseconds / 1000, True)
+        recorder.record('POST ask:unanswered', 0.5, False)
+        recorder.stop()
+
+        report = recorder.report()
+
+        profile = report['urls']['GET ask:profile']
+        self.assertEqual(report['requests'], 101)
+        self.assertEqual(report['errors'], 1)
+        self.assertEqual(profile['p50'], 50)
+        self.assertEqual(profile['p95'], 95)
+        self.assertEqual(profile['p99'], 99)
+        self.assertEqual(profile['max'], 100)
+        self.assertEqual(report['urls']['POST ask:unanswered']['errors'], 1)
+
+    def test_reports_are_compared_by_url_name(self):
+        baseline = {'urls': {'GET ask:profile': {
+            'p50': 10, 'p95': 20, 'p99': 30, 'throughput': 5}}}
+        report = {'urls': {
+            'GET ask:profile': {'p50': 11, 'p95': 25, 'p99': 30, 'throughput': 4},
+            'GET ask:friends': {'p50': 1, 'p95': 1, 'p99': 1, 'throughput': 1}}}
+
+        self.assertEqual(compare_reports(baseline, report), [
+            ('GET ask:profile', 'p50', 10, 11),
+            ('GET ask:profile', 'p95', 20, 25),
+            ('GET ask:profile', 'p99', 30, 30),
+            ('GET ask:profile', 'throughput', 5, 4)])
+
+
+    def test_missing_throughput_is_compared_as_not_available(self):
+        baseline = {'urls': {'GET ask:profile': {
+            'p50': 10, 'p95': 20, 'p99': 30, 'throughput': None}}}
+        report = {'urls': {'GET ask:profile': {
+            'p50': 20, 'p95': 20, 'p99': 30, 'throughput': 4}}}
+        out = StringIO()
+
+        LoadTestCommand(stdout=out).write_comparison(baseline, report)
+
+        lines = out.getvalue().splitlines()
+        self.assertRegex(lines[0], r'p50 +10\.0 -> +20\.0 \(\+100\.0%\)$')
+        self.assertRegex(lines[3], r'throughput +n/a -> +4\.0$')
+
+
+class SerialLiveServerThread(LiveServerThread):
+    # in-memory SQLite database shared with server threads locks tables on
+    # concurrent writes, so requests of virtual users are served one by one
+
+    def _create_server(self):
+        return WSGIServer((self.host, self.port), QuietWSGIRequestHandler,
+                          allow_reuse_address=False)
+
+
+class LoadTestCommandTest(LiveServerTestCase):
+    databases = {'default', 'replica'}
+    server_thread_class = SerialLiveServerThread
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.report_path = os.path.join(directory, 'report.json')
+
+    def run_load_test(self, *args):
+        call_command('loadtest', '--base-url', self.live_server_url,
+                     '--users', '2', '--iterations', '2', '--create-users',
+                     '--report', self.report_path, *args,
+                     stdout=StringIO(), stderr=StringIO())
+        with open(self.report_path) as file:
+            return json.load(file)
+
+    def test_journeys_run_against_live_server(self):
+        # virtual users accept invitations of each other by inviting back,
+        # pending ones come from user outside of the load test
+        inviter = UserModel.objects.create_user('inviter')
+        for number in range(2):
+            FriendsModel.objects.create(
+                first=inviter, second=UserModel.objects.create_user(
+                    'loadtest_{}'.format(number), password='loadtest'))
+
+        report = self.run_load_test()
+
+        self.assertEqual(report['failures'], [])
+        self.assertEqual(report['errors'], 0)
+        self.assertEqual(report['users'], 2)
+        for name in ('POST ask:login', 'GET ask:profile', 'POST ask:user',
+                     'GET ask:unanswered', 'POST ask:unanswered',
+                     'GET ask:friends.inv', 'POST ask:friends.accept',
+                     'GET ask:friends.search'):
+            self.assertIn(name, report['urls'])
+            self.assertGreater(report['urls'][name]['p99'], 0)
+        self.assertEqual(UserModel.objects.filter(
+            username__startswith='loadtest_').count(), 2)
+        self.assertFalse(FriendsModel.objects.filter(
+            first=inviter, accepted=False).exists())
+        self.assertEqual(QuestionModel.objects.count(), 4)
+        self.assertGreater(AnswerModel.objects.count(), 0)
+
+    def test_wrong_password_is_reported(self):
+        UserModel.objects.create_user('loadtest_0', password='other')
+
+        report = self.run_load_test()
+
+        self.assertEqual(report['failures'],
+                         ['loadtest_0 could not log in (200)'])
@@ -0,0 +1,102 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..mail import claim_due_mail, enqueue_mail, send_queued_mail
+from ..models import OutgoingEmailModel
+from ..test.SMTPMixIn import *
+
+
+class MailQueueTest(TestCase, SMTPMixIn):
+
+    def setUp(self):
+        for i in range(3):
+            enqueue_mail("Subject {}".format(i), "Body", "from@example.com",
+                         ["to{}@email.com".format(i)])
+
+    def test_due_emails_are_sent_in_one_batch(self):
+        sent, failed = send_queued_mail()
+
+        self.assertEqual((sent, failed), (3, 0))
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(OutgoingEmailModel.objects.filter(
+            status=OutgoingEmailModel.SENT).count(), 3)
+
+    def test_sent_emails_are_not_sent_again(self):
+        send_queued_mail()
+        send_queued_mail()
+
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_batch_size_limits_number_of_sent_emails(self):
+        sent, failed = send_queued_mail(batch_size=2)
+
+        self.assertEqual(sent, 2)
+
+    def test_failed_email_is_retried_with_backoff(self):
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                        side_effect=ConnectionError('smtp down')):
+            sent, failed = send_queued_mail()
+
+        self.assertEqual((sent, failed), (0, 3))
+        email = OutgoingEmailModel.objects.first()
+        self.assertEqual(email.status, OutgoingEmailModel.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertIn('smtp down', email.last_error)
+        self.assertGreater(email.next_attempt, timezone.now())
+        self.assertEqual(send_queued_mail(), (0, 0))
+
+    def test_email_is_dead_after_max_attempts(self):
+        OutgoingEmailModel.objects.update(attempts=4)
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                        side_effect=ConnectionError('smtp down')):
+            send_queued_mail(max_attempts=5)
+
+        self.assertEqual(OutgoingEmailModel.objects.filter(
+            status=OutgoingEmailModel.DEAD).count(), 3)
+
+    def test_retried_email_is_sent_when_due(self):
+        OutgoingEmailModel.objects.update(
+            attempts=1, next_attempt=timezone.now() - timedelta(seconds=1))
+
+        sent, failed = send_queued_mail()
+
+        self.assertEqual(sent, 3)
+
+    def test_emails_being_sent_are_not_claimed_by_other_sender(self):
+        other_sender = []
+
+        def send_messages(messages):
+            if not other_sender:
+                other_sender.append(send_queued_mail())
+            return len(messages)
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                        side_effect=send_messages):
+            sent, failed = send_queued_mail()
+
+        self.assertEqual((sent, failed), (3, 0))
+        self.assertEqual(other_sender, [(0, 0)])
+
+    def test_emails_of_dead_sender_are_sent_after_lease(self):
+        claim_due_mail(batch_size=100)
+
+        self.assertEqual(send_queued_mail(), (0, 0))
+        OutgoingEmailModel.objects.update(
+            next_attempt=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(send_queued_mail(), (3, 0))
+
+    @override_settings(EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend')
+    def test_batch_is_sent_over_one_smtp_connection(self):
+        server = self.start_smtp_server()
+
+        sent, failed = send_queued_mail()
+
+        self.assertEqual(sent, 3)
+        self.assertEqual(len(server.messages), 3)
+        self.assertEqual(server.connections, 1)
+        self.assertIn('Subject: Subject 0', server.messages[0])
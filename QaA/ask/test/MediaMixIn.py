@@ -0,0 +1,14 @@
+import shutil
+import tempfile
+
+
+class MediaMixIn:
+
+    def use_temporary_media_root(self):
+        # uploaded files go to directory removed after test
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media_settings = self.settings(MEDIA_ROOT=media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        return media_root
@@ -0,0 +1,117 @@
+import os
+
+from django.test import TestCase
+
+from ..test.MediaMixIn import *
+
+CONTENT = bytes(range(256)) * 4
+
+
+class MediaServingTest(TestCase, MediaMixIn):
+    url = '/media/files/data.bin'
+
+    def setUp(self):
+        media_root = self.use_temporary_media_root()
+        os.makedirs(os.path.join(media_root, 'files'))
+        self.path = os.path.join(media_root, 'files', 'data.bin')
+        with open(self.path, 'wb') as f:
+            f.write(CONTENT)
+
+    def test_file_is_served_whole(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['Content-Length'], str(len(CONTENT)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_missing_file_directory_and_paths_outside_media_are_rejected(self):
+        self.assertEqual(self.client.get('/media/files/missing').status_code, 404)
+        self.assertEqual(self.client.get('/media/files').status_code, 404)
+        self.assertEqual(self.client.get('/media/../manage.py').status_code, 400)
+
+    def test_matching_etag_returns_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_not_modified_since_returns_not_modified(self):
+        last_modified = self.client.get(self.url)['Last-Modified']
+
+        response = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_changed_file_has_new_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        os.utime(self.path, (0, 0))
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_range_returns_partial_content(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19')
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[10:20])
+        self.assertEqual(response['Content-Range'],
+                         'bytes 10-19/{}'.format(len(CONTENT)))
+        self.assertEqual(response['Content-Length'], '10')
+
+    def test_open_and_suffix_ranges(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=1000-')
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[1000:])
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-24')
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[-24:])
+
+    def test_range_past_end_is_not_satisfiable(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=5000-6000')
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'],
+                         'bytes */{}'.format(len(CONTENT)))
+
+    def test_range_is_ignored_when_if_range_does_not_match(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19',
+                                   HTTP_IF_RANGE='"outdated"')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+
+    def test_x_accel_redirect_hands_file_off(self):
+        with self.settings(MEDIA_DELIVERY='x-accel-redirect'):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response['X-Accel-Redirect'],
+                         '/protected-media/files/data.bin')
+        self.assertEqual(response.content, b'')
+
+    def test_x_sendfile_hands_file_off(self):
+        with self.settings(MEDIA_DELIVERY='x-sendfile'):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response['X-Sendfile'], self.path)
+
+    def test_non_ascii_paths_are_percent_encoded_when_handed_off(self):
+        path = os.path.join(os.path.dirname(self.path), 'żółw plik.bin')
+        with open(path, 'wb') as f:
+            f.write(CONTENT)
+        url = '/media/files/%C5%BC%C3%B3%C5%82w%20plik.bin'
+
+        with self.settings(MEDIA_DELIVERY='x-accel-redirect'):
+            accel_response = self.client.get(url)
+        with self.settings(MEDIA_DELIVERY='x-sendfile'):
+            sendfile_response = self.client.get(url)
+
+        self.assertEqual(accel_response['X-Accel-Redirect'],
+                         '/protected-media/files/'
+                         '%C5%BC%C3%B3%C5%82w%20plik.bin')
+        self.assertEqual(sendfile_response['X-Sendfile'],
+                         self.path.replace('data.bin', '')
+                         + '%C5%BC%C3%B3%C5%82w%20plik.bin')
@@ -0,0 +1,52 @@
+from django.shortcuts import reverse
+from django.test import TestCase
+
+from ..friendships import mutual_friends, mutual_friends_preview
+from ..test.FriendsMixIn import *
+from ..test.LoginMixIn import *
+
+
+class MutualFriendsTest(TestCase, FriendsMixIn, LoginMixIn):
+
+    def setUp(self):
+        self.create_users()
+        self.make_friends()
+        self.create_invitations()
+
+    def test_mutual_friends_are_intersection_ordered_by_username(self):
+        self.assertEqual(list(mutual_friends(self.user1, self.user4)),
+                         [self.user2, self.user5])
+        self.assertEqual(list(mutual_friends(self.user1, self.user5)),
+                         [self.user2, self.user3])
+
+    def test_mutual_friends_are_symmetrical(self):
+        self.assertEqual(list(mutual_friends(self.user4, self.user1)),
+                         list(mutual_friends(self.user1, self.user4)))
+
+    def test_pending_invitations_are_not_mutual_friends(self):
+        self.assertEqual(list(mutual_friends(self.user8, self.user1)), [])
+        self.assertEqual(list(mutual_friends(self.user6, self.user4)),
+                         [self.user5])
+
+    def test_preview_is_limited_but_count_is_total(self):
+        preview, count = mutual_friends_preview(
+            self.user1, self.user4, limit=1)
+
+        self.assertEqual(preview, [self.user2])
+        self.assertEqual(count, 2)
+
+    def test_preview_skips_count_query_when_all_fit(self):
+        with self.assertNumQueries(1):
+            preview, count = mutual_friends_preview(self.user1, self.user4)
+
+        self.assertEqual(count, 2)
+
+    def test_GET_user_page_contains_mutual_friends(self):
+        self.login_user(username="TestUser1")
+
+        response = self.client.get(reverse('ask:user', args=('TestUser4',)))
+
+        self.assertEqual(response.context['num_mutual_friends'], 2)
+        self.assertEqual(response.context['mutual_friends'],
+                         [self.user2, self.user5])
+        self.assertContains(response, "2 mutual friends")
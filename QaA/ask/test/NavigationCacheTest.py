@@ -0,0 +1,108 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.shortcuts import reverse
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase
+
+from ..navigation import (FRAGMENT_KEY, STATS_FLUSH_EVERY, STATS_KEY,
+                          bump_navigation_version, navigation_stats, record,
+                          reset_navigation_stats)
+from ..test.LoginMixIn import *
+from ..test.QuestionsMixIn import *
+
+
+class NavigationCacheTest(TestCase, QuestionsMixIn, LoginMixIn):
+
+    def setUp(self):
+        cache.clear()
+        reset_navigation_stats()
+        self.create_users()
+        self.login_user(username="TestUser2")
+
+    def test_navigation_bar_is_rendered_once(self):
+        self.client.get(reverse('ask:settings'))
+        self.client.get(reverse('ask:settings'))
+        self.client.get(reverse('ask:profile'))
+
+        stats = navigation_stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 2)
+
+    def test_cached_navigation_bar_is_used_until_version_changes(self):
+        self.client.get(reverse('ask:settings'))
+        UserModel.objects.filter(username="TestUser2").update(num_unanswered=7)
+
+        response = self.client.get(reverse('ask:settings'))
+        self.assertNotContains(response, "Unanswered questions(7)")
+
+        bump_navigation_version([self.test_user2.pk])
+        response = self.client.get(reverse('ask:settings'))
+        self.assertContains(response, "Unanswered questions(7)")
+
+    def test_new_question_changes_navigation_bar(self):
+        self.client.get(reverse('ask:settings'))
+
+        self.create_question1()
+
+        response = self.client.get(reverse('ask:settings'))
+        self.assertContains(response, "Unanswered questions(1)")
+
+    def test_new_invitation_changes_navigation_bar(self):
+        self.client.get(reverse('ask:settings'))
+
+        self.test_user1.friends.add(self.test_user2)
+
+        response = self.client.get(reverse('ask:settings'))
+        self.assertContains(response, "Friends(1)")
+
+    def test_navigation_bar_is_cached_per_user(self):
+        self.create_question1()
+        self.client.get(reverse('ask:settings'))
+
+        self.login_user(username="TestUser1")
+        response = self.client.get(reverse('ask:settings'))
+
+        self.assertNotContains(response, "Unanswered questions(1)")
+        self.assertContains(response, "Unanswered questions</a>")
+
+    def test_invalid_settings_form_caches_complete_navigation_bar(self):
+        self.create_question1()
+
+        response = self.client.post(reverse('ask:settings'))
+        self.assertContains(response, "Unanswered questions(1)")
+
+        response = self.client.get(reverse('ask:settings'))
+        self.assertContains(response, "Unanswered questions(1)")
+
+    def test_navigation_bar_without_counters_is_not_cached(self):
+        request = RequestFactory().get('/')
+        request.session = {'_auth_user_id': str(self.test_user2.pk)}
+        request.user = self.test_user2
+
+        Template('{% load navigation %}{% navigation_bar %}').render(
+            Context({'request': request}))
+
+        self.assertIsNone(cache.get(FRAGMENT_KEY.format(self.test_user2.pk)))
+
+    def test_stats_are_flushed_to_cache(self):
+        for _ in range(STATS_FLUSH_EVERY - 1):
+            record('hits')
+        record('misses')
+
+        self.assertEqual(cache.get(STATS_KEY.format('hits')),
+                         STATS_FLUSH_EVERY - 1)
+        self.assertEqual(cache.get(STATS_KEY.format('misses')), 1)
+        self.assertEqual(navigation_stats()['hit_ratio'],
+                         (STATS_FLUSH_EVERY - 1) / STATS_FLUSH_EVERY)
+
+    def test_stats_command(self):
+        record('hits')
+        record('misses')
+        out = StringIO()
+
+        call_command('navigation_stats', '--reset', stdout=out)
+
+        self.assertIn('hits 1, misses 1, hit ratio 50.00%', out.getvalue())
+        self.assertEqual(navigation_stats()['hits'], 0)
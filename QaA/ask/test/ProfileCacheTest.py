@@ -0,0 +1,116 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.shortcuts import reverse
+from django.test import TestCase
+
+from ..fragments import get_or_render
+from ..models import AnswerModel, FriendsModel
+from ..test.LoginMixIn import *
+from ..test.QuestionsMixIn import *
+
+
+class ProfileCacheTest(TestCase, QuestionsMixIn, LoginMixIn):
+    url = reverse('ask:user', args=('TestUser2',))
+
+    def setUp(self):
+        cache.clear()
+        self.create_users()
+        self.login_user(username="TestUser1")
+
+    def answer(self, question, content):
+        answer = AnswerModel(content=content)
+        answer.save()
+        question.answer = answer
+        question.save()
+
+    def test_second_visit_does_not_query_questions(self):
+        self.create_question1(with_answer=True)
+        self.client.get(self.url)
+
+        # logged in user, viewed user, friendship in both directions,
+        # mutual friends
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url)
+        self.assertContains(response, "Asked by: TestUser1")
+
+    def test_answering_question_invalidates_profile(self):
+        self.create_question1()
+        self.client.get(self.url)
+
+        self.answer(self.question1, "fresh answer")
+
+        self.assertContains(self.client.get(self.url), "fresh answer")
+
+    def test_bulk_answering_invalidates_profile(self):
+        self.create_question1()
+        self.client.get(self.url)
+
+        self.login_user(username="TestUser2")
+        self.client.post(reverse('ask:unanswered.bulk'), data={
+            'answers-TOTAL_FORMS': 1, 'answers-INITIAL_FORMS': 0,
+            'answers-0-question_id': self.question1.id,
+            'answers-0-answer_content': 'bulk answer'})
+        self.login_user(username="TestUser1")
+
+        self.assertContains(self.client.get(self.url), "bulk answer")
+
+    def test_profile_is_cached_per_relationship(self):
+        self.client.get(self.url)
+
+        self.client.post(self.url, data={'action': 'add_friend'})
+        self.assertContains(self.client.get(self.url),
+                            "Your invitation have been sent")
+
+        FriendsModel.objects.update(accepted=True)
+        self.assertContains(self.client.get(self.url), "Remove from friends")
+
+        FriendsModel.objects.all().delete()
+        self.assertContains(self.client.get(self.url), "Add to friends")
+
+    def test_csrf_token_is_not_cached(self):
+        self.client.get(self.url)
+        self.client.cookies.clear()
+        self.login_user(username="TestUser1")
+
+        response = self.client.get(self.url)
+
+        token = response.context['csrf_token']
+        self.assertContains(response, 'value="{}"'.format(token), count=2)
+        self.assertNotContains(response, '<!--csrf-->')
+
+    def test_mutual_friends_are_rendered_for_each_viewer(self):
+        FriendsModel.objects.create(first=self.test_user1,
+                                    second=self.test_user3, accepted=True)
+        FriendsModel.objects.create(first=self.test_user2,
+                                    second=self.test_user3, accepted=True)
+        UserModel.objects.create(username="TestUser4")
+        self.login_user(username="TestUser4")
+        self.assertNotContains(self.client.get(self.url), "mutual friend")
+
+        self.login_user(username="TestUser1")
+        response = self.client.get(self.url)
+
+        self.assertContains(response, "1 mutual friend:")
+
+    def test_concurrent_misses_are_rendered_once(self):
+        renders = []
+
+        def render():
+            renders.append(1)
+            time.sleep(0.2)
+            return 'profile'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(
+            get_or_render('v', 'c', render, 60, coalesce=True)))
+            for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(renders), 1)
+        self.assertEqual([fragment for fragment, _ in results],
+                         ['profile'] * 4)
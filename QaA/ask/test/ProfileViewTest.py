@@ -1,3 +1,4 @@
+from asgiref.sync import async_to_sync
 from django.http.response import HttpResponse
 from django.test import RequestFactory, TestCase
 from django.urls import reverse
@@ -16,7 +17,7 @@ class ProfileViewTest(TestCase, QuestionsMixIn, LoginMixIn):
         request = self.factory.get('ask/user')
         request.session = {}
 
-        response = ProfileView.as_view()(request)
+        response = async_to_sync(ProfileView.as_view())(request)
 
         self.assertEqual(response.status_code, 302)
         self.assertIsInstance(response, HttpResponse)
@@ -25,7 +26,7 @@ class ProfileViewTest(TestCase, QuestionsMixIn, LoginMixIn):
         request = self.factory.get('ask/user')
         request.session = {'logged_in': False}
 
-        response = ProfileView.as_view()(request)
+        response = async_to_sync(ProfileView.as_view())(request)
 
         self.assertEqual(response.status_code, 302)
         self.assertIsInstance(response, HttpResponse)
@@ -112,3 +113,71 @@ class ProfileViewTest(TestCase, QuestionsMixIn, LoginMixIn):
         response = self.client.get(reverse('ask:profile'))
 
         self.assertEqual(response.context['num_unanswered'], 1)
+
+    def test_first_page_contains_six_newest_questions(self):
+        self.create_users()
+        questions = self.create_answered_questions(8)
+        self.login_user(username="TestUser2")
+
+        response = self.client.get(reverse('ask:profile'))
+        page = response.context['questions_with_answers']
+
+        self.assertEqual([q for q, a in page], questions[::-1][:6])
+        self.assertTrue(page.has_next())
+        self.assertFalse(page.has_previous())
+
+    def test_after_cursor_returns_older_questions(self):
+        self.create_users()
+        questions = self.create_answered_questions(8)
+        self.login_user(username="TestUser2")
+
+        first_page = self.client.get(reverse('ask:profile')).context[
+            'questions_with_answers']
+        response = self.client.get(reverse('ask:profile'),
+                                   {'after': first_page.next_cursor})
+        page = response.context['questions_with_answers']
+
+        self.assertEqual([q for q, a in page], questions[1::-1])
+        self.assertFalse(page.has_next())
+        self.assertTrue(page.has_previous())
+
+    def test_before_cursor_returns_newer_questions(self):
+        self.create_users()
+        questions = self.create_answered_questions(8)
+        self.login_user(username="TestUser2")
+
+        first_page = self.client.get(reverse('ask:profile')).context[
+            'questions_with_answers']
+        second_page = self.client.get(reverse('ask:profile'), {
+            'after': first_page.next_cursor}).context['questions_with_answers']
+        response = self.client.get(reverse('ask:profile'),
+                                   {'before': second_page.previous_cursor})
+        page = response.context['questions_with_answers']
+
+        self.assertEqual([q for q, a in page], questions[::-1][:6])
+        self.assertTrue(page.has_next())
+        self.assertFalse(page.has_previous())
+
+    def test_invalid_cursor_returns_first_page(self):
+        self.create_users()
+        questions = self.create_answered_questions(2)
+        self.login_user(username="TestUser2")
+
+        response = self.client.get(reverse('ask:profile'),
+                                   {'after': 'not a cursor'})
+        page = response.context['questions_with_answers']
+
+        self.assertEqual([q for q, a in page], questions[::-1])
+
+    def create_answered_questions(self, n):
+        questions = []
+        for i in range(n):
+            answer = AnswerModel(content="Answer {}".format(i))
+            answer.save()
+            question = QuestionModel(asked_by=self.test_user1,
+                                     owner=self.test_user2,
+                                     content="Question {}".format(i),
+                                     answer=answer)
+            question.save()
+            questions.append(question)
+        return questions
@@ -0,0 +1,56 @@
+from django.shortcuts import reverse
+from django.test import TestCase
+
+from ..test.LoginMixIn import *
+from ..test.QuestionsMixIn import *
+
+
+class QuestionFeedQueriesTest(TestCase, QuestionsMixIn, LoginMixIn):
+
+    def setUp(self):
+        self.create_users()
+        self.login_user(username="TestUser2")
+
+    def test_GET_profile_number_of_queries_does_not_depend_on_page_size(self):
+        for num_questions in (1, 6):
+            self.create_questions(num_questions, answered=True)
+
+            # user, questions with answers and askers
+            with self.assertNumQueries(2):
+                response = self.client.get(reverse('ask:profile'))
+            self.assertContains(response, "Asked by: Asker0")
+
+    def test_GET_user_number_of_queries_does_not_depend_on_page_size(self):
+        self.login_user(username="TestUser1")
+        for num_questions in (1, 6):
+            self.create_questions(num_questions, answered=True)
+
+            # logged in user, viewed user, questions with answers and
+            # askers, friendship in both directions, mutual friends
+            with self.assertNumQueries(6):
+                response = self.client.get(
+                    reverse('ask:user', args=('TestUser2',)))
+            self.assertContains(response, "Asked by: Asker0")
+
+    def test_GET_unanswered_number_of_queries_does_not_depend_on_page_size(self):
+        for num_questions in (1, 6):
+            self.create_questions(num_questions, answered=False)
+
+            # user, questions with askers
+            with self.assertNumQueries(2):
+                response = self.client.get(reverse('ask:unanswered'))
+            self.assertContains(response, "Asked by: Asker0")
+
+    def create_questions(self, n, answered):
+        QuestionModel.objects.all().delete()
+        for i in range(n):
+            asker, _ = UserModel.objects.get_or_create(
+                username="Asker{}".format(i))
+            answer = None
+            if answered:
+                answer = AnswerModel(content="Answer {}".format(i))
+                answer.save()
+            question = QuestionModel(asked_by=asker, owner=self.test_user2,
+                                     content="Question {}".format(i),
+                                     answer=answer)
+            question.save()
@@ -0,0 +1,80 @@
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.shortcuts import reverse
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..navigation import FRAGMENT_KEY, bump_navigation_version
+from ..replicas import PIN_COOKIE, ReplicaRouter, ReplicaState, _state
+from ..test.LoginMixIn import *
+from ..test.QuestionsMixIn import *
+
+
+class ReplicaRoutingTest(TransactionTestCase, QuestionsMixIn, LoginMixIn):
+    # replica is test mirror of default, so routing is checked on queries
+    # each connection received
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.create_users()
+        self.create_question1(with_answer=True)
+        self.login_user(username="TestUser2")
+
+    def get(self, url):
+        with CaptureQueriesContext(connections['replica']) as replica_queries:
+            response = self.client.get(url)
+        return response, replica_queries
+
+    def test_reads_of_profile_go_to_replica(self):
+        response, replica_queries = self.get(reverse('ask:profile'))
+
+        self.assertContains(response, "Test Question 1")
+        self.assertGreater(len(replica_queries), 0)
+        self.assertFalse(any('django_session' in query['sql']
+                             for query in replica_queries))
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_views_without_replica_reads_use_primary(self):
+        response, replica_queries = self.get(reverse('ask:settings'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(replica_queries), 0)
+
+    def test_write_pins_browser_to_primary(self):
+        url = reverse('ask:user', args=['TestUser1'])
+        with CaptureQueriesContext(connections['replica']) as replica_queries:
+            response = self.client.post(url, data={
+                'action': 'ask_question',
+                'question_content': 'question test content'})
+        pin = response.cookies[PIN_COOKIE]
+
+        response, later_replica_queries = self.get(reverse('ask:profile'))
+
+        self.assertEqual(pin['max-age'], 10)
+        self.assertEqual(len(later_replica_queries), 0)
+        # the write itself went to primary
+        self.assertFalse(any('INSERT' in query['sql']
+                             for query in replica_queries))
+
+    def test_transaction_reads_from_primary(self):
+        token = _state.set(ReplicaState(pinned=False))
+        self.addCleanup(_state.reset, token)
+        _state.get().replica_reads = True
+        router = ReplicaRouter()
+
+        self.assertEqual(router.db_for_read(QuestionModel), 'replica')
+        self.assertEqual(router.db_for_read(Session), 'default')
+        with transaction.atomic():
+            self.assertEqual(router.db_for_read(QuestionModel), 'default')
+
+    def test_fragment_is_not_cached_from_replica_right_after_change(self):
+        bump_navigation_version([self.test_user2.pk])
+
+        self.get(reverse('ask:profile'))
+        self.assertIsNone(cache.get(FRAGMENT_KEY.format(self.test_user2.pk)))
+
+        with self.settings(REPLICA_STICKINESS=0):
+            self.get(reverse('ask:profile'))
+        self.assertIsNotNone(cache.get(FRAGMENT_KEY.format(self.test_user2.pk)))
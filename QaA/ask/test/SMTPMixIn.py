@@ -0,0 +1,59 @@
+import socketserver
+import threading
+
+from django.conf import settings
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    # just enough of SMTP for django's smtp backend
+
+    def handle(self):
+        self.reply('220 localhost stand-in')
+        message = None
+        while True:
+            line = self.rfile.readline().decode()
+            if not line:
+                return
+            command = line[:4].upper()
+            if message is not None:
+                if line.rstrip('\r\n') == '.':
+                    self.server.messages.append(''.join(message))
+                    message = None
+                    self.reply('250 OK')
+                else:
+                    message.append(line)
+            elif command in ('HELO', 'EHLO'):
+                self.reply('250 localhost')
+            elif command == 'DATA':
+                message = []
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+            elif command == 'QUIT':
+                self.server.connections += 1
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+    def reply(self, line):
+        self.wfile.write((line + '\r\n').encode())
+
+
+class SMTPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class SMTPMixIn:
+
+    def start_smtp_server(self):
+        try:
+            server = SMTPServer(
+                (settings.EMAIL_HOST, settings.EMAIL_PORT), SMTPHandler)
+        except OSError:
+            self.skipTest('port {} is busy'.format(settings.EMAIL_PORT))
+        server.messages = []
+        server.connections = 0
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.shortcuts import reverse
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..test.LoginMixIn import *
+from ..test.QuestionsMixIn import *
+
+
+class SessionStorageTest(TestCase, QuestionsMixIn, LoginMixIn):
+
+    def setUp(self):
+        self.create_users()
+        self.login_user(username="TestUser2")
+
+    def get_profile(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('ask:profile'))
+        session_queries = [query['sql'] for query in queries
+                           if 'django_session' in query['sql']]
+        return response, session_queries
+
+    def test_page_view_reads_session_from_cache(self):
+        response, session_queries = self.get_profile()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(session_queries, [])
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+    def test_session_missing_in_cache_is_read_from_database_once(self):
+        caches[settings.SESSION_CACHE_ALIAS].clear()
+
+        response, session_queries = self.get_profile()
+        _, later_session_queries = self.get_profile()
+
+        self.assertEqual(len(session_queries), 1)
+        self.assertTrue(session_queries[0].startswith('SELECT'))
+        self.assertEqual(later_session_queries, [])
+
+    def test_signed_cookie_sessions_are_not_stored_on_server(self):
+        with self.settings(
+                SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies'):
+            self.login_user(username="TestUser2")
+            response, session_queries = self.get_profile()
+
+        self.assertContains(response, "TestUser2")
+        self.assertEqual(session_queries, [])
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
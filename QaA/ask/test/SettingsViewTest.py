@@ -1,25 +1,27 @@
+import hashlib
 import os
+from datetime import timedelta
 from io import BytesIO
-import shutil
 
 from django import forms
 from django.core.files.uploadedfile import InMemoryUploadedFile
 from django.shortcuts import reverse
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from PIL import Image
 
+from ..avatars import sweep_avatars
+from ..thumbnails import thumbnail_names
+from ..test.MediaMixIn import *
 from ..test.QuestionsMixIn import *
 from ..test.LoginMixIn import *
 
 
-class SettingsViewTest(TestCase, QuestionsMixIn, LoginMixIn):
+@override_settings(AVATAR_THUMBNAIL_WORKERS=0)
+class SettingsViewTest(TestCase, QuestionsMixIn, LoginMixIn, MediaMixIn):
     url = reverse('ask:settings')
 
-    def __del__(self):
-
-        for dir in os.listdir('media/'):
-            if dir.count('TestUser') > 0:
-                shutil.rmtree('media/' + dir)
+    def setUp(self):
+        self.media_root = self.use_temporary_media_root()
 
     def test_after_uploading_img_is_saved_in_media_directory(self):
         self.create_users()
@@ -30,37 +32,64 @@ class SettingsViewTest(TestCase, QuestionsMixIn, LoginMixIn):
 
         self.client.post(self.url, data=form)
 
-        # for some reason ImageFields are not saved
-        # so we cant test if database filed changed
-        # self.assertNotEqual(self.test_user2.avatar, None)
-
-        filepath = 'media/user_id_{0}_{1}/{2}'.format(
-            self.test_user2.id, self.test_user2.username, 'avatar.png')
+        user = UserModel.objects.get(username="TestUser2")
+        filepath = os.path.join(self.media_root, user.avatar.name)
         self.assertTrue(self.file_exist(filepath))
 
-    def test_after_uploading_when_previous_file_exists_only_new_file_is_keept(self):
+    def test_uploaded_img_is_named_by_content_hash(self):
+        self.create_users()
+        self.login_user(username="TestUser2")
+
+        img = self.get_img('media/testimage.png')
+        digest = hashlib.sha256(img.read()).hexdigest()
+        img.seek(0)
+        self.client.post(self.url, data={'image': img})
+
+        user = UserModel.objects.get(username="TestUser2")
+        self.assertEqual(user.avatar.name,
+                         'avatars/{}/{}.png'.format(digest[:2], digest))
+
+    def test_same_img_uploaded_by_two_users_is_stored_once(self):
         self.create_users()
         self.login_user(username="TestUser2")
+        self.client.post(self.url, data={
+                         'image': self.get_img('media/testimage.png')})
+        self.login_user(username="TestUser1")
+        self.client.post(self.url, data={
+                         'image': self.get_img('media/testimage.png')})
+
+        user1 = UserModel.objects.get(username="TestUser1")
+        user2 = UserModel.objects.get(username="TestUser2")
+        self.assertEqual(user1.avatar.name, user2.avatar.name)
+        avatar_dir = os.path.dirname(user1.avatar.path)
+        self.assertEqual(sorted(os.listdir(avatar_dir)), sorted(
+            [os.path.basename(name) for name in
+             [user1.avatar.name] + thumbnail_names(user1.avatar.name)]))
 
-        shutil.copyfile('media/testimage.png', 'media/testimage1.png')
+    def test_after_uploading_when_previous_file_exists_only_new_file_is_keept(self):
+        self.create_users()
+        self.login_user(username="TestUser2")
 
         img = self.get_img('media/testimage.png')
         form = {'image': img}
         self.client.post(self.url, data=form)
+        old_avatar = UserModel.objects.get(username="TestUser2").avatar.path
 
-        img = self.get_img('media/testimage1.png')
+        img = self.get_img('media/testimage.png', size=(50, 50))
         form = {'image': img}
         self.client.post(self.url, data=form)
+        new_avatar = UserModel.objects.get(username="TestUser2").avatar.path
 
-        user_imgs_dir = 'media/user_id_{0}_{1}'.format(
-            self.test_user2.id, self.test_user2.username)
-        filepath = os.path.join(user_imgs_dir, '{0}'.format('avatar.png'))
-        self.assertTrue(self.file_exist(filepath))
-
-        num_files = len(os.listdir(user_imgs_dir))
-        self.assertEqual(num_files, 1)
+        # superseded file is removed later by sweeper
+        self.assertTrue(self.file_exist(old_avatar))
+        sweep_avatars(grace_period=timedelta(0))
+        self.assertFalse(self.file_exist(old_avatar))
+        self.assertTrue(self.file_exist(new_avatar))
 
-        os.remove('media/testimage1.png')
+        # original and its thumbnails
+        num_files = sum(len(files) for _, _, files in os.walk(
+            os.path.join(self.media_root, 'avatars')))
+        self.assertEqual(num_files, 1 + len(thumbnail_names(new_avatar)))
 
     def test_after_uploading_img_context_has_user_avatar(self):
         self.create_users()
@@ -72,14 +101,14 @@ class SettingsViewTest(TestCase, QuestionsMixIn, LoginMixIn):
         self.client.post(self.url, data=form)
         response = self.client.get(self.url)
 
-        user_id = UserModel.objects.get(username="TestUser2").id
-        self.assertEqual(
-            response.context['user_avatar'].name,
-            'user_id_{}_TestUser2/avatar.png'.format(user_id))
+        avatar = UserModel.objects.get(username="TestUser2").avatar
+        self.assertEqual(response.context['user_avatar'].name, avatar.name)
 
-    def get_img(self, path):
+    def get_img(self, path, size=None):
         f = open(path, 'rb')
         im = Image.open(f, mode='r')
+        if size:
+            im = im.resize(size)
         im_io = BytesIO()
         im.save(im_io, 'png')
         im_io.seek(0)
@@ -1,9 +1,12 @@
+from io import StringIO
+
 from django.core import mail
+from django.core.management import call_command
 from django.http.response import HttpResponseRedirect
 from django.shortcuts import reverse
 from django.test import RequestFactory, TestCase
 
-from ..models import UserModel
+from ..models import OutgoingEmailModel, UserModel
 from ..views import SignUpView
 
 
@@ -198,9 +201,17 @@ class SignUpTests(TestCase):
         queryset = UserModel.objects.filter(username='jj')
         self.assertEqual(queryset[0].first_name, 'JJ')
 
+    def test_form_correct_email_is_queued_not_sent(self):
+        form_input = self.valid_form()
+        self.client.post(self.url, data=form_input)
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutgoingEmailModel.objects.get().to, 'some1@email.com')
+
     def test_form_correct_email_sent(self):
         form_input = self.valid_form()
         self.client.post(self.url, data=form_input)
+        call_command('send_queued_mail', '--once', stdout=StringIO())
 
         self.assertEqual(len(mail.outbox), 1)
         self.assertEqual(mail.outbox[0].subject,
@@ -210,17 +221,12 @@ class SignUpTests(TestCase):
         self.assertEqual(mail.outbox[0].from_email, 'from@example.com')
         self.assertEqual(mail.outbox[0].to, ['some1@email.com'])
 
-    def test_form_correct_user_is_logged_in_session(self):
-        form_input = self.valid_form()
-        response = self.client.post(self.url, data=form_input)
-
-        self.assertEqual(self.client.session['logged_in'], True)
-
-    def test_form_correct_username_is_stored_in_session(self):
+    def test_form_correct_session_keeps_only_authentication_keys(self):
         form_input = self.valid_form()
         response = self.client.post(self.url, data=form_input)
 
-        self.assertEqual(self.client.session['username'], 'jj')
+        self.assertEqual(set(self.client.session.keys()), {
+            '_auth_user_id', '_auth_user_backend', '_auth_user_hash'})
 
     def test_form_correct_user_id_is_stored_in_session(self):
         form_input = self.valid_form()
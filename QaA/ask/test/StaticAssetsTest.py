@@ -0,0 +1,108 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import RequestFactory, SimpleTestCase
+
+from ..media import IMMUTABLE_MAX_AGE, serve_static
+from ..staticfiles import bundle_name, gzip_compress, minify_css
+
+
+class MinifyCssTest(SimpleTestCase):
+
+    def test_comments_and_whitespace_are_removed(self):
+        css = '/* header */\n.a > .b ,\n.c {\n    color:  red;\n    margin: 0 auto;\n}\n'
+
+        self.assertEqual(minify_css(css), '.a>.b,.c{color:red;margin:0 auto}')
+
+    def test_gzip_output_does_not_depend_on_time(self):
+        compressed = gzip_compress(b'.a{color:red}')
+
+        self.assertEqual(gzip.decompress(compressed), b'.a{color:red}')
+        self.assertEqual(compressed, gzip_compress(b'.a{color:red}'))
+        # mtime field of gzip header
+        self.assertEqual(compressed[4:8], b'\0\0\0\0')
+
+
+class StaticAssetsTest(SimpleTestCase):
+
+    def setUp(self):
+        static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, static_root)
+        static_settings = self.settings(STATIC_ROOT=static_root)
+        static_settings.enable()
+        self.addCleanup(static_settings.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        self.static_root = static_root
+        self.bundle = staticfiles_storage.hashed_files[bundle_name('profile')]
+
+    def render_stylesheets(self, name):
+        return Template('{% load assets %}{% stylesheets name %}').render(
+            Context({'name': name}))
+
+    def test_bundle_concatenates_minified_sources(self):
+        with open(os.path.join(self.static_root, self.bundle)) as f:
+            bundle = f.read()
+
+        self.assertRegex(self.bundle, r'^ask/bundles/profile\.[0-9a-f]{12}\.css$')
+        self.assertNotIn('\n', bundle)
+        for source in ('login_bar', 'navigation_bar', 'questions', 'profile'):
+            with open(os.path.join(self.static_root, 'ask', source + '.css')) as f:
+                self.assertIn(minify_css(f.read()), bundle)
+
+    def test_hashed_files_have_gzip_siblings(self):
+        with open(os.path.join(self.static_root, self.bundle), 'rb') as f:
+            content = f.read()
+        with gzip.open(os.path.join(self.static_root, self.bundle + '.gz')) as f:
+            self.assertEqual(f.read(), content)
+        self.assertFalse(os.path.exists(os.path.join(
+            self.static_root, staticfiles_storage.hashed_files['ask/default.png'] + '.gz')))
+
+    def test_template_links_single_fingerprinted_bundle(self):
+        html = self.render_stylesheets('profile')
+
+        self.assertEqual(html.count('<link'), 1)
+        self.assertIn('/static/{}'.format(self.bundle), html)
+
+    def test_sources_are_linked_in_debug(self):
+        with self.settings(DEBUG=True):
+            html = self.render_stylesheets('profile')
+
+        self.assertEqual(html.count('<link'), 4)
+        self.assertIn('/static/ask/profile.css', html)
+
+    def test_fingerprinted_file_is_immutable(self):
+        response = serve_static(RequestFactory().get('/'), self.bundle)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age={}'.format(IMMUTABLE_MAX_AGE), response['Cache-Control'])
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_unhashed_file_is_not_immutable(self):
+        response = serve_static(RequestFactory().get('/'), 'ask/profile.css')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Cache-Control'))
+
+    def test_gzip_variant_is_served_when_accepted(self):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='deflate, gzip;q=0.8')
+
+        response = serve_static(request, self.bundle)
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        with open(os.path.join(self.static_root, self.bundle + '.gz'), 'rb') as f:
+            self.assertEqual(b''.join(response.streaming_content), f.read())
+
+    def test_refused_encoding_is_not_served(self):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip;q=0')
+
+        response = serve_static(request, self.bundle)
+
+        self.assertFalse(response.has_header('Content-Encoding'))
@@ -0,0 +1,133 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.shortcuts import reverse
+from django.test import TestCase
+
+from ..models import SuggestionModel
+from ..suggestions import (FriendsGraph, mark_suggestions_outdated,
+                           refresh_suggestions)
+from ..test.FriendsMixIn import *
+from ..test.LoginMixIn import *
+
+
+class SuggestionsTest(TestCase, FriendsMixIn, LoginMixIn):
+
+    def setUp(self):
+        self.create_users()
+        self.make_friends()
+        self.create_invitations()
+
+    def test_graph_contains_friends_in_both_directions(self):
+        graph = FriendsGraph.from_database()
+
+        self.assertEqual(sorted(graph.friends(self.user1.id)),
+                         sorted([self.user2.id, self.user3.id, self.user5.id]))
+        self.assertEqual(graph.friends(self.user8.id), [])
+
+    def test_graph_ranks_by_mutual_friends(self):
+        graph = FriendsGraph.from_database()
+
+        self.assertEqual(graph.mutual_friends_counts(self.user1.id),
+                         [(self.user4.id, 2), (self.user6.id, 1)])
+
+    def test_suggestions_exclude_pending_invitations(self):
+        refresh_suggestions()
+
+        suggested = SuggestionModel.objects.filter(
+            user=self.user6).values_list('suggested', flat=True)
+        self.assertEqual(sorted(suggested), sorted(
+            [self.user1.id, self.user2.id, self.user3.id]))
+
+    def test_refresh_clears_outdated_flag(self):
+        refresh_suggestions()
+
+        self.assertFalse(UserModel.objects.filter(
+            suggestions_outdated=True).exists())
+        self.assertEqual(refresh_suggestions(), 0)
+
+    def test_users_changed_during_refresh_stay_outdated(self):
+        from_database = FriendsGraph.from_database
+
+        def change_friendships():
+            mark_suggestions_outdated([self.user8.id], with_friends=False)
+            return from_database()
+
+        with mock.patch.object(FriendsGraph, 'from_database',
+                               side_effect=change_friendships):
+            refresh_suggestions()
+
+        outdated = UserModel.objects.filter(
+            suggestions_outdated=True).values_list('username', flat=True)
+        self.assertEqual(list(outdated), ["TestUser8"])
+
+    def test_users_of_failed_batch_stay_outdated(self):
+        with mock.patch('ask.suggestions.store_suggestions',
+                        side_effect=[None, RuntimeError('database down')]):
+            with self.assertRaises(RuntimeError):
+                refresh_suggestions(batch_size=4)
+
+        outdated = UserModel.objects.filter(
+            suggestions_outdated=True).order_by('id')
+        self.assertEqual(list(outdated), list(
+            UserModel.objects.order_by('id')[4:]))
+
+    def test_accepting_friendship_marks_users_and_their_friends_outdated(self):
+        refresh_suggestions()
+        self.login_user(username="TestUser8")
+
+        self.client.post(reverse('ask:friends.accept'),
+                         data={'user_id': self.user2.id})
+
+        outdated = UserModel.objects.filter(
+            suggestions_outdated=True).values_list('username', flat=True)
+        self.assertEqual(sorted(outdated), [
+                         "TestUser1", "TestUser2", "TestUser4", "TestUser5", "TestUser8"])
+
+    def test_refresh_updates_only_outdated_users(self):
+        refresh_suggestions()
+        friends = FriendsModel.objects.get(first=self.user8, second=self.user2)
+        friends.accepted = True
+        friends.save()
+
+        refreshed = refresh_suggestions()
+
+        self.assertEqual(refreshed, 5)
+        suggested = SuggestionModel.objects.filter(
+            user=self.user8).values_list('suggested', flat=True)
+        self.assertEqual(sorted(suggested), sorted(
+            [self.user1.id, self.user4.id]))
+
+    def test_GET_friends_page_contains_suggestions(self):
+        call_command('refresh_suggestions', stdout=StringIO())
+        self.login_user(username="TestUser1")
+
+        response = self.client.get(reverse('ask:friends'))
+
+        suggestions = response.context['suggestions']
+        self.assertEqual([s.suggested for s in suggestions],
+                         [self.user4, self.user6])
+        self.assertContains(response, "2 mutual friends<")
+        self.assertContains(response, "1 mutual friend<")
+
+    def test_command_keeps_refreshing_with_interval(self):
+        class Stop(Exception):
+            pass
+
+        def change_friendship(seconds):
+            # friendship changes between first and second run
+            if sleep.call_count > 1:
+                raise Stop
+            friends = FriendsModel.objects.get(first=self.user8, second=self.user2)
+            friends.accepted = True
+            friends.save()
+
+        with mock.patch('time.sleep', side_effect=change_friendship) as sleep:
+            with self.assertRaises(Stop):
+                call_command('refresh_suggestions', '--interval', '60',
+                             stdout=StringIO())
+
+        sleep.assert_called_with(60)
+        self.assertIn(self.user1.id, SuggestionModel.objects.filter(
+            user=self.user8).values_list('suggested', flat=True))
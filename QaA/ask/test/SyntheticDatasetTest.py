@@ -0,0 +1,82 @@
+from collections import Counter
+from io import StringIO
+from statistics import median
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase
+
+from ..counters import rebuild_counters
+from ..models import AnswerModel, FriendsModel, QuestionModel, UserModel
+from ..synthetic import SyntheticDataset, copy_value
+
+
+class SyntheticDatasetTest(TestCase):
+
+    def generate(self, *args):
+        call_command('generate_dataset', '--users', '300', '--batch-size', '100',
+                     *args, stdout=StringIO())
+
+    def test_rows_are_generated(self):
+        self.generate()
+
+        self.assertEqual(UserModel.objects.count(), 300)
+        self.assertEqual(QuestionModel.objects.count(), 1500)
+        self.assertEqual(AnswerModel.objects.count(),
+                         QuestionModel.objects.exclude(answer=None).count())
+        self.assertGreater(FriendsModel.objects.count(), 1000)
+        self.assertTrue(FriendsModel.objects.filter(accepted=False).exists())
+
+    def test_counters_are_consistent(self):
+        self.generate()
+
+        self.assertEqual(rebuild_counters(), [])
+
+    def test_friendship_degrees_follow_power_law(self):
+        self.generate()
+
+        degrees = Counter()
+        for first, second in FriendsModel.objects.values_list('first', 'second'):
+            degrees[first] += 1
+            degrees[second] += 1
+        self.assertGreater(max(degrees.values()), 5 * median(degrees.values()))
+
+    def test_generated_user_can_log_in(self):
+        self.generate('--prefix', 'bench_', '--password', 'secret')
+
+        self.assertTrue(self.client.login(username='bench_7', password='secret'))
+
+    def test_new_rows_get_next_ids(self):
+        self.generate()
+        self.generate('--prefix', 'other_')
+
+        self.assertEqual(UserModel.objects.count(), 600)
+        user = UserModel.objects.create(username='after')
+        self.assertEqual(user.id, UserModel.objects.order_by('-id')[1].id + 1)
+
+    def test_existing_prefix_is_refused(self):
+        self.generate()
+
+        with self.assertRaises(CommandError):
+            self.generate()
+
+
+class SyntheticGraphTest(SimpleTestCase):
+
+    def rows(self, seed):
+        dataset = SyntheticDataset(100, seed=seed)
+        friendships = [row[1:3] for row in dataset.friendships(int, 1)]
+        answers = []
+        questions = [(row[1], row[2], row[5]) for row in
+                     dataset.questions_and_answers(int, 1, 1, answers)]
+        return friendships, questions
+
+    def test_same_seed_generates_same_rows(self):
+        self.assertEqual(self.rows(1), self.rows(1))
+        self.assertNotEqual(self.rows(1), self.rows(2))
+
+    def test_copy_values(self):
+        self.assertEqual(copy_value(None), '\\N')
+        self.assertEqual(copy_value(True), 't')
+        self.assertEqual(copy_value(False), 'f')
+        self.assertEqual(copy_value('a\\b'), 'a\\\\b')
@@ -0,0 +1,131 @@
+import os
+from concurrent.futures import Future
+from io import StringIO
+
+from django.core.management import call_command
+from django.shortcuts import reverse
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from ..thumbnails import (SIZES, executor, fitting_size, render_thumbnails,
+                          thumbnail_name, thumbnail_names, thumbnails_done)
+from ..test.MediaMixIn import *
+from ..test.QuestionsMixIn import *
+from ..test.LoginMixIn import *
+from ..test.SettingsViewTest import SettingsViewTest
+
+
+@override_settings(AVATAR_THUMBNAIL_WORKERS=0)
+class ThumbnailsTest(TestCase, QuestionsMixIn, LoginMixIn, MediaMixIn):
+    url = reverse('ask:settings')
+    get_img = SettingsViewTest.get_img
+
+    def setUp(self):
+        self.use_temporary_media_root()
+        self.create_users()
+        self.login_user(username="TestUser2")
+
+    def upload_avatar(self):
+        self.client.post(self.url, data={
+                         'image': self.get_img('media/testimage.png')})
+        return UserModel.objects.get(username="TestUser2")
+
+    def test_thumbnail_name_is_next_to_original(self):
+        self.assertEqual(thumbnail_name('user_id_1_user/avatar.png', 100, 'webp'),
+                         'user_id_1_user/avatar_100.webp')
+
+    def test_fitting_size_is_smallest_not_smaller_than_width(self):
+        self.assertEqual(fitting_size(50), 100)
+        self.assertEqual(fitting_size(100), 100)
+        self.assertEqual(fitting_size(101), 200)
+        self.assertEqual(fitting_size(1000), SIZES[-1])
+
+    def test_upload_renders_square_thumbnails_in_every_format(self):
+        user = self.upload_avatar()
+
+        self.assertTrue(user.avatar_thumbnails)
+        for size in SIZES:
+            for extension, format in (('webp', 'WEBP'), ('jpg', 'JPEG')):
+                path = thumbnail_name(user.avatar.path, size, extension)
+                with Image.open(path) as image:
+                    self.assertEqual(image.size, (size, size))
+                    self.assertEqual(image.format, format)
+
+    def test_thumbnails_of_same_image_are_reused(self):
+        user = self.upload_avatar()
+        thumbnails = [thumbnail_name(user.avatar.path, size, extension)
+                      for size in SIZES for extension in ('webp', 'jpg')]
+        # marks file which would be replaced by rendering
+        with open(thumbnails[0], 'wb') as f:
+            f.write(b'rendered before')
+        for thumbnail in thumbnails:
+            os.utime(thumbnail, (0, 0))
+
+        self.login_user(username="TestUser1")
+        self.client.post(self.url, data={
+                         'image': self.get_img('media/testimage.png')})
+
+        with open(thumbnails[0], 'rb') as f:
+            self.assertEqual(f.read(), b'rendered before')
+        # sweeper grace period protects reused thumbnails again
+        for thumbnail in thumbnails:
+            self.assertNotEqual(os.path.getmtime(thumbnail), 0)
+        self.assertTrue(UserModel.objects.get(
+            username="TestUser1").avatar_thumbnails)
+
+    def test_navigation_bar_serves_smallest_fitting_thumbnail(self):
+        user = self.upload_avatar()
+
+        response = self.client.get(self.url)
+
+        self.assertContains(
+            response, '<source type="image/webp" srcset="/media/{} 1x, /media/{} 2x">'.format(
+                thumbnail_name(user.avatar.name, 100, 'webp'),
+                thumbnail_name(user.avatar.name, 200, 'webp')))
+        self.assertContains(
+            response, 'src="/media/{}"'.format(
+                thumbnail_name(user.avatar.name, 100, 'jpg')))
+
+    def test_original_is_served_until_thumbnails_are_ready(self):
+        user = self.upload_avatar()
+        UserModel.objects.filter(pk=user.pk).update(avatar_thumbnails=False)
+
+        response = self.client.get(self.url)
+
+        self.assertNotContains(response, '<picture>')
+        self.assertContains(response, 'src="/media/{}"'.format(user.avatar.name))
+
+    def test_command_renders_missing_thumbnails(self):
+        user = self.upload_avatar()
+        for thumbnail in thumbnail_names(user.avatar.path):
+            os.remove(thumbnail)
+        UserModel.objects.filter(pk=user.pk).update(avatar_thumbnails=False)
+
+        call_command('generate_thumbnails', stdout=StringIO())
+
+        self.assertTrue(UserModel.objects.get(pk=user.pk).avatar_thumbnails)
+        for thumbnail in thumbnail_names(user.avatar.path):
+            self.assertTrue(os.path.exists(thumbnail))
+
+    def test_thumbnails_are_rendered_in_worker_process(self):
+        user = self.upload_avatar()
+        for thumbnail in thumbnail_names(user.avatar.path):
+            os.remove(thumbnail)
+
+        with self.settings(AVATAR_THUMBNAIL_WORKERS=1):
+            executor().submit(render_thumbnails, user.avatar.path).result()
+
+        for thumbnail in thumbnail_names(user.avatar.path):
+            self.assertTrue(os.path.exists(thumbnail))
+
+    def test_failed_rendering_is_logged(self):
+        user = self.upload_avatar()
+        UserModel.objects.filter(pk=user.pk).update(avatar_thumbnails=False)
+        future = Future()
+        future.set_exception(OSError('cannot identify image file'))
+
+        with self.assertLogs('ask.thumbnails', 'ERROR') as logs:
+            thumbnails_done(user.pk, user.avatar.name, future)
+
+        self.assertIn('cannot identify image file', logs.output[0])
+        self.assertFalse(UserModel.objects.get(pk=user.pk).avatar_thumbnails)
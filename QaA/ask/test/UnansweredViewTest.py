@@ -72,6 +72,97 @@ class UnansweredViewTest(TestCase, QuestionsMixIn, LoginMixIn):
         question = QuestionModel.objects.get(content="Test Question 1")
         self.assertEqual(question.answer, None)
 
+    def test_GET_first_chunk_contains_newest_questions(self):
+        self.create_users()
+        questions = self.create_unanswered_questions(12)
+        self.login_user(username="TestUser2")
+
+        response = self.client.get(self.url)
+        page = response.context['unanswered_questions']
+
+        self.assertEqual(list(page), questions[::-1][:10])
+        self.assertTrue(page.has_next())
+        self.assertContains(response, reverse('ask:unanswered.more'))
+
+    def test_GET_fragment_returns_next_chunk(self):
+        self.create_users()
+        questions = self.create_unanswered_questions(12)
+        self.login_user(username="TestUser2")
+        first_chunk = self.client.get(self.url).context['unanswered_questions']
+
+        response = self.client.get(reverse('ask:unanswered.more'),
+                                   {'after': first_chunk.next_cursor})
+
+        self.assertEqual(list(response.context['unanswered_questions']),
+                         questions[1::-1])
+        self.assertNotContains(response, '<nav>')
+        self.assertNotContains(response, 'Load more')
+
+    def test_GET_fragment_not_logged_in_redirect_to_login_page(self):
+        response = self.client.get(reverse('ask:unanswered.more'))
+
+        self.assertEqual(response.status_code, 302)
+
+    def test_POST_bulk_answers_all_questions(self):
+        self.create_users()
+        questions = self.create_unanswered_questions(3)
+        self.login_user(username="TestUser2")
+        form = self.bulk_form({questions[0].id: 'First', questions[2].id: 'Third'})
+
+        response = self.client.post(reverse('ask:unanswered.bulk'), data=form)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(response.json()['answered']),
+                         [questions[0].id, questions[2].id])
+        self.assertEqual(response.json()['num_unanswered'], 1)
+        self.assertEqual(QuestionModel.objects.get(
+            id=questions[0].id).answer.content, 'First')
+        self.assertEqual(QuestionModel.objects.get(
+            id=questions[1].id).answer, None)
+
+    def test_POST_bulk_does_not_answer_questions_of_other_users(self):
+        self.create_users()
+        self.create_question3()
+        self.question3.save()
+        self.login_user(username="TestUser2")
+        form = self.bulk_form({self.question3.id: 'Not mine'})
+
+        response = self.client.post(reverse('ask:unanswered.bulk'), data=form)
+
+        self.assertEqual(response.json()['answered'], [])
+        self.assertEqual(AnswerModel.objects.count(), 0)
+
+    def test_POST_bulk_invalid_formset_nothing_is_answered(self):
+        self.create_users()
+        questions = self.create_unanswered_questions(2)
+        self.login_user(username="TestUser2")
+        form = self.bulk_form({questions[0].id: 'First', questions[1].id: ''})
+
+        response = self.client.post(reverse('ask:unanswered.bulk'), data=form)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(AnswerModel.objects.count(), 0)
+
+    def bulk_form(self, answers):
+        form = {
+            'answers-TOTAL_FORMS': len(answers),
+            'answers-INITIAL_FORMS': 0,
+        }
+        for i, (question_id, content) in enumerate(answers.items()):
+            form['answers-{}-question_id'.format(i)] = question_id
+            form['answers-{}-answer_content'.format(i)] = content
+        return form
+
+    def create_unanswered_questions(self, n):
+        questions = []
+        for i in range(n):
+            question = QuestionModel(asked_by=self.test_user1,
+                                     owner=self.test_user2,
+                                     content="Question {}".format(i))
+            question.save()
+            questions.append(question)
+        return questions
+
     def valid_form(self, question_content="Test Question 1"):
         question = QuestionModel.objects.get(content=question_content)
         return {
@@ -1,10 +1,13 @@
+from unittest import mock
 
+from django.db import IntegrityError
 from django.shortcuts import reverse
 from django.test.testcases import TestCase
 
 from ..test.QuestionsMixIn import *
 from ..test.LoginMixIn import *
 from ..models import FriendsModel
+from ..views import UserView
 
 
 class UserViewTest(TestCase, QuestionsMixIn, LoginMixIn):
@@ -267,6 +270,65 @@ class UserViewTest(TestCase, QuestionsMixIn, LoginMixIn):
             first=self.test_user1, second=self.test_user2)
         self.assertEqual(created_friend[0].accepted, False)
 
+    def test_POST_invite_friend_twice_FriendModel_is_created_once(self):
+        self.create_users()
+        self.login_user(username="TestUser1")
+        form = self.get_valid_invite_form()
+
+        self.client.post(self.url, data=form)
+        self.client.post(self.url, data=form)
+
+        created_friend = FriendsModel.objects.filter(
+            first=self.test_user1, second=self.test_user2)
+        self.assertEqual(len(created_friend), 1)
+
+    def test_POST_invite_back_accepts_invitation(self):
+        self.create_users()
+        self.login_user(username="TestUser1")
+        FriendsModel(first=self.test_user2, second=self.test_user1).save()
+
+        self.client.post(self.url, data=self.get_valid_invite_form())
+
+        friends = FriendsModel.objects.get()
+        self.assertEqual((friends.first, friends.second),
+                         (self.test_user2, self.test_user1))
+        self.assertTrue(friends.accepted)
+        self.assertEqual(UserModel.objects.get(pk=self.test_user1.pk).num_invites, 0)
+
+    def test_duplicated_FriendModel_is_not_allowed(self):
+        self.create_users()
+        FriendsModel(first=self.test_user1, second=self.test_user2).save()
+
+        with self.assertRaises(IntegrityError):
+            FriendsModel(first=self.test_user1, second=self.test_user2).save()
+
+    def test_FriendModel_in_other_direction_is_not_allowed(self):
+        self.create_users()
+        FriendsModel(first=self.test_user1, second=self.test_user2).save()
+
+        with self.assertRaises(IntegrityError):
+            FriendsModel(first=self.test_user2, second=self.test_user1).save()
+
+    def test_POST_invite_while_invited_back_accepts_invitation(self):
+        self.create_users()
+        self.login_user(username="TestUser1")
+        invitation = UserView.invitation
+
+        def invited_meanwhile(view, first, second):
+            # viewed user invites logged in user after first lookup
+            if not FriendsModel.objects.exists():
+                FriendsModel(first=first, second=second).save()
+                return None
+            return invitation(view, first, second)
+
+        with mock.patch.object(UserView, 'invitation', invited_meanwhile):
+            self.client.post(self.url, data=self.get_valid_invite_form())
+
+        friends = FriendsModel.objects.get()
+        self.assertEqual((friends.first, friends.second),
+                         (self.test_user2, self.test_user1))
+        self.assertTrue(friends.accepted)
+
     def test_POST_after_remove_friend_is_friend_added_is_False(self):
         self.create_users()
         self.login_user(username="TestUser1")
@@ -1,8 +1,28 @@
 from .test.SignUpViewTest import *
 from .test.ProfileViewTest import *
 from .test.UserViewTest import *
+from .test.DuplicatedFriendsMigrationTest import *
 from .test.UnansweredViewTest import *
 from .test.FriendsViewTest import *
 from .test.FriendAcceptedTest import *
 from .test.FriendSearchViewTest import *
 from .test.SettingsViewTest import *
+from .test.CountersTest import *
+from .test.IdentityMapTest import *
+from .test.QuestionFeedQueriesTest import *
+from .test.MailQueueTest import *
+from .test.FriendsAskViewTest import *
+from .test.SuggestionsTest import *
+from .test.MutualFriendsTest import *
+from .test.ThumbnailsTest import *
+from .test.AvatarStorageTest import *
+from .test.MediaServingTest import *
+from .test.NavigationCacheTest import *
+from .test.ProfileCacheTest import *
+from .test.StaticAssetsTest import *
+from .test.AsyncViewsTest import *
+from .test.ConnectionPoolTest import *
+from .test.ReplicaRoutingTest import *
+from .test.SessionStorageTest import *
+from .test.LoadTestTest import *
+from .test.SyntheticDatasetTest import *
@@ -0,0 +1,123 @@
+import logging
+import multiprocessing
+import pathlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import django
+from django.conf import settings
+from django.db import connection
+from PIL import Image, ImageOps
+
+from .identity import forget_users
+from .models import UserModel
+from .navigation import bump_navigation_version
+from .storage import avatar_storage
+
+# square edge lengths in pixels, avatars are shown at 100px (navigation bar,
+# friend cards) so 200px variant covers high density screens
+SIZES = (100, 200, 400)
+# content type and extension, first format is preferred by browsers
+FORMATS = (('image/webp', 'webp'), ('image/jpeg', 'jpg'))
+QUALITY = 80
+
+_executor = None
+
+logger = logging.getLogger(__name__)
+
+
+def thumbnail_name(name, size, extension):
+    # user_id_1_user/avatar.png -> user_id_1_user/avatar_100.webp
+    path = pathlib.PurePosixPath(name)
+    return str(path.with_name('{}_{}.{}'.format(path.stem, size, extension)))
+
+
+def thumbnail_names(name):
+    return [thumbnail_name(name, size, extension)
+            for size in SIZES for _, extension in FORMATS]
+
+
+def fitting_size(width):
+    # smallest variant not smaller than displayed width
+    for size in SIZES:
+        if size >= width:
+            return size
+    return SIZES[-1]
+
+
+def render_thumbnails(path):
+    # runs in worker process, works on files only so it does not touch
+    # database or Django state
+    with Image.open(path) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.split()[-1])
+            image = background
+        else:
+            image = image.convert('RGB')
+
+    for size in SIZES:
+        thumbnail = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        for _, extension in FORMATS:
+            thumbnail.save(
+                thumbnail_name(path, size, extension),
+                'JPEG' if extension == 'jpg' else extension.upper(),
+                quality=QUALITY, optimize=True)
+
+
+def executor():
+    global _executor
+    if _executor is None:
+        # forked worker would inherit database connections and locks held
+        # by other threads of web process, spawned one sets Django up anew
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.AVATAR_THUMBNAIL_WORKERS,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=django.setup)
+    return _executor
+
+
+def generate_thumbnails(user):
+    # renders thumbnails of user's current avatar in worker process,
+    # with AVATAR_THUMBNAIL_WORKERS = 0 they are rendered in place
+    name = user.avatar.name
+    path = avatar_storage.path(name)
+    if all(avatar_storage.exists(thumbnail)
+           for thumbnail in thumbnail_names(name)):
+        # same image was uploaded before, its thumbnails are reused
+        for thumbnail in thumbnail_names(name):
+            avatar_storage.touch(thumbnail)
+        mark_thumbnails_ready(user.pk, name)
+        return
+    if not settings.AVATAR_THUMBNAIL_WORKERS:
+        render_thumbnails(path)
+        mark_thumbnails_ready(user.pk, name)
+        return
+
+    future = executor().submit(render_thumbnails, path)
+    future.add_done_callback(partial(thumbnails_done, user.pk, name))
+
+
+def thumbnails_done(user_id, name, future):
+    # called in executor thread of web process; if rendering failed
+    # templates keep serving the original image
+    error = future.exception()
+    if error is not None:
+        logger.error('Rendering thumbnails of %s failed', name,
+                     exc_info=error)
+        return
+    try:
+        mark_thumbnails_ready(user_id, name)
+    finally:
+        connection.close()
+
+
+def mark_thumbnails_ready(user_id, name):
+    # avatar could be replaced in meantime, then its own thumbnails will
+    # mark it ready
+    UserModel.objects.filter(pk=user_id, avatar=name).update(
+        avatar_thumbnails=True)
+    forget_users([user_id])
+    bump_navigation_version([user_id])
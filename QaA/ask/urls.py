@@ -1,5 +1,5 @@
 from django.urls import path
-from django.contrib.auth.views import TemplateView
+from django.contrib.auth.views import LoginView, LogoutView, TemplateView
 from django.contrib.sitemaps.views import sitemap
 
 from . import views
@@ -14,9 +14,9 @@ sitemaps = {
 app_name = "ask"
 urlpatterns = [
     path('', views.index, name='index'),
-    path('login', views.CustomLoginView.as_view(
+    path('login', LoginView.as_view(
         template_name='ask/login.html'), name='login'),
-    path('logout', views.CustomLogoutView.as_view(
+    path('logout', LogoutView.as_view(
         template_name='ask/logout.html'), name='logout'),
     path('signup', views.SignUpView.as_view(), name='signup'),
 
@@ -28,6 +28,10 @@ urlpatterns = [
     path('profile', views.ProfileView.as_view(), name='profile'),
     path('user/<str:username>', views.UserView.as_view(), name='user'),
     path('unanswered', views.UnansweredView.as_view(), name='unanswered'),
+    path('unanswered/more', views.UnansweredFragmentView.as_view(),
+         name='unanswered.more'),
+    path('unanswered/bulk', views.UnansweredBulkView.as_view(),
+         name='unanswered.bulk'),
     path('settings', views.SettingsView.as_view(), name='settings'),
 
     path('friends/recent', friends.FriendsRecent.as_view(), name='friends.recent'),
@@ -35,6 +39,7 @@ urlpatterns = [
     path('friends/inv', friends.FriendsInvitationList.as_view(), name='friends.inv'),
     path('friends/accept', friends.FriendAcceptedView.as_view(),
          name='friends.accept'),
+    path('friends/ask', friends.FriendsAskView.as_view(), name='friends.ask'),
     path('friends/search', friends.FriendSearchView.as_view(), name='friends.search'),
     path('friends', friends.FriendsBase.as_view(), name='friends'),
     path('sitemap.xml', sitemap, {'sitemaps': sitemaps},
@@ -1,118 +1,157 @@
 
+from django.core.paginator import Paginator
+from django.db import transaction
 from django.http.response import HttpResponseRedirect
 from django.shortcuts import render, reverse
 from django.views.generic.base import View
 from django.views.generic.edit import FormMixin
 
-from ..forms import FriendAcceptedForm, FriendSearchForm
+from ..concurrency import lookup, run
+from ..counters import change_counter
+from ..forms import BroadcastQuestionForm, FriendAcceptedForm, FriendSearchForm
+from ..friendships import search_friends
 from ..models import FriendsModel
 from .MixIns import *
 
 
-class FriendsBase(View, QuestionsMixIn, FriendsMixIn):
+class FriendsBase(AsyncViewMixIn, ReplicaReadsMixIn, View, QuestionsMixIn, FriendsMixIn):
 
-    def get(self, request):
-        try:
-            user = UserModel.objects.get(
-                pk=request.session['_auth_user_id'])
-        except KeyError:
+    async def get(self, request):
+        user = await run(get_logged_in_user, request)
+        if user is None:
             return HttpResponseRedirect(reverse('ask:login'))
 
-        context = self.get_context(user, request)
-        return render(request, "ask/friends.html", context=context)
+        context = await self.get_context(user, request)
+        return await run(render, request, "ask/friends.html", context=context)
 
-    @QuestionsMixIn.add_num_unanswered_to_context
-    @FriendsMixIn.add_num_invites_to_context
-    @AvatarMinIn.add_avatar_to_context
-    def get_context(self, user, request):
-        friends = self.user_friends(user)
+    @QuestionsMixIn.add_num_unanswered_to_async_context
+    @FriendsMixIn.add_num_invites_to_async_context
+    @FriendsMixIn.add_suggestions_to_async_context
+    @AvatarMinIn.add_avatar_to_async_context
+    async def get_context(self, user, request):
+        friends = await lookup(lambda: list(self.user_friends(user)))
         context = {"friends": friends}
         return context
 
 
 class FriendsRecent(FriendsBase):
 
-    @QuestionsMixIn.add_num_unanswered_to_context
-    @FriendsMixIn.add_num_invites_to_context
-    @AvatarMinIn.add_avatar_to_context
-    def get_context(self, user, request):
-        friends = self.order_by_date(user)
+    @QuestionsMixIn.add_num_unanswered_to_async_context
+    @FriendsMixIn.add_num_invites_to_async_context
+    @FriendsMixIn.add_suggestions_to_async_context
+    @AvatarMinIn.add_avatar_to_async_context
+    async def get_context(self, user, request):
+        friends = await lookup(lambda: list(self.order_by_date(user)))
         context = {"friends": friends}
         return context
 
     def order_by_date(self, user):
-        date = [f.date for f in user.friendsmodel_set.all()]
-        second_date = [f.date for f in user.friends_second.all()]
-        friends_with_date = list(
-            zip(self.user_friends(user), date + second_date))
-        friends_with_date.sort(key=lambda t: t[1].time())
-        friends = [t[0] for t in friends_with_date]
-        return friends[::-1]
+        friends = self.user_friends(user)
+        return friends.order_by('-friendship_date', '-friendship_id')
 
 
 class FriendsAlphabetical(FriendsBase):
 
-    @QuestionsMixIn.add_num_unanswered_to_context
-    @FriendsMixIn.add_num_invites_to_context
-    @AvatarMinIn.add_avatar_to_context
-    def get_context(self, user, request):
-        friends = self.order_by_alphabet(user)
+    @QuestionsMixIn.add_num_unanswered_to_async_context
+    @FriendsMixIn.add_num_invites_to_async_context
+    @FriendsMixIn.add_suggestions_to_async_context
+    @AvatarMinIn.add_avatar_to_async_context
+    async def get_context(self, user, request):
+        friends = await lookup(lambda: list(self.order_by_alphabet(user)))
         context = {"friends": friends}
         return context
 
     def order_by_alphabet(self, user):
         friends = self.user_friends(user)
-        friends.sort(key=lambda f: f.username)
-        return friends
+        return friends.order_by('username')
 
 
 class FriendsInvitationList(FriendsBase):
 
-    @QuestionsMixIn.add_num_unanswered_to_context
-    @FriendsMixIn.add_num_invites_to_context
-    @AvatarMinIn.add_avatar_to_context
-    def get_context(self, user, request):
+    @QuestionsMixIn.add_num_unanswered_to_async_context
+    @FriendsMixIn.add_num_invites_to_async_context
+    @FriendsMixIn.add_suggestions_to_async_context
+    @AvatarMinIn.add_avatar_to_async_context
+    async def get_context(self, user, request):
         context = {
             'show_invites': True,
-            'invitations': self.user_friends(user, accepted=False),
+            'invitations': await lookup(
+                lambda: list(self.user_friends(user, accepted=False))),
         }
         return context
 
 
-class FriendAcceptedView(View, FormMixin):
+class FriendAcceptedView(AsyncViewMixIn, View, FormMixin):
     form_class = FriendAcceptedForm
 
-    def post(self, request):
-        form = self.get_form()
+    async def post(self, request):
+        form = await run(self.get_form)
 
-        if form.is_valid():
-            self.find_users_and_accept(request.session['_auth_user_id'],
-                                       form.cleaned_data['user_id'])
+        if await run(form.is_valid):
+            await run(lambda: self.find_users_and_accept(
+                request.session['_auth_user_id'], form.cleaned_data['user_id']))
 
-        return FriendsInvitationList().get(request)
+        return await FriendsInvitationList().get(request)
 
     def find_users_and_accept(self, user1_id, user2_id):
-        user_first = UserModel.objects.get(pk=user1_id)
-        user_second = UserModel.objects.get(pk=user2_id)
+        user_first = get_user(user1_id)
+        user_second = get_user(user2_id)
 
         try:
             self.accept_invitation(user_second, user_first)
         except FriendsModel.DoesNotExist:
             self.accept_invitation(user_first, user_second)
 
+    @transaction.atomic
     def accept_invitation(self, user1, user2):
         friends = FriendsModel.objects.get(first=user1, second=user2)
         friends.accepted = True
         friends.save()
 
 
-class FriendSearchView(View, QuestionsMixIn, FriendsMixIn, FormMixin):
+class FriendsAskView(AsyncViewMixIn, View, FriendsMixIn, FormMixin):
+    form_class = BroadcastQuestionForm
+    http_method_names = ['post']
+
+    async def post(self, request):
+        user = await run(get_logged_in_user, request)
+        if user is None:
+            return HttpResponseRedirect(reverse('ask:login'))
+
+        form = await run(self.get_form)
+        if await run(form.is_valid):
+            await run(self.ask_friends, user,
+                      form.cleaned_data['question_content'],
+                      form.cleaned_data['recipients'])
+
+        return await FriendsBase().get(request)
+
+    @transaction.atomic
+    def ask_friends(self, user, content, recipients=None):
+        friends = self.user_friends(user)
+        if recipients:
+            friends = friends.filter(pk__in=recipients)
+        owner_ids = list(friends.order_by().values_list('id', flat=True))
+
+        QuestionModel.objects.bulk_create(
+            [QuestionModel(owner_id=owner_id, asked_by=user, content=content)
+             for owner_id in owner_ids],
+            batch_size=1000)
+        # bulk_create does not send post_save, so counters are changed here
+        change_counter('num_unanswered', {owner_id: 1 for owner_id in owner_ids})
+        return owner_ids
+
+
+class FriendSearchView(ReplicaReadsMixIn, View, QuestionsMixIn, FriendsMixIn, FormMixin):
     form_class = FriendSearchForm
+    paginate_by = 20
+
+    def get(self, request):
+        return self.post(request)
 
     def post(self, request):
         try:
-            user = UserModel.objects.get(
-                pk=request.session['_auth_user_id'])
+            user = get_user(request.session['_auth_user_id'])
         except KeyError:
             return HttpResponseRedirect(reverse('ask:login'))
 
@@ -121,16 +160,26 @@ class FriendSearchView(View, QuestionsMixIn, FriendsMixIn, FormMixin):
 
     @QuestionsMixIn.add_num_unanswered_to_context
     @FriendsMixIn.add_num_invites_to_context
+    @FriendsMixIn.add_suggestions_to_context
     @AvatarMinIn.add_avatar_to_context
     def get_context(self, user, request):
         form = self.get_form()
         context = {}
         if form.is_valid():
             searched_user = form.cleaned_data['search_text']
-            context = {'friends': self.get_matching_friends(
-                user, searched_user)}
+            paginator = Paginator(
+                self.get_matching_friends(user, searched_user), self.paginate_by)
+            context = {
+                'friends': paginator.get_page(request.GET.get('page')),
+                'search_text': searched_user,
+            }
         return context
 
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        if self.request.method == 'GET':
+            kwargs['data'] = self.request.GET
+        return kwargs
+
     def get_matching_friends(self, user, searched_user):
-        friends = self.user_friends(user)
-        return [f for f in friends if searched_user in f.username]
+        return search_friends(user, searched_user)
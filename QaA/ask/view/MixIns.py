@@ -1,37 +1,113 @@
-from ..models import QuestionModel, UserModel
+import asyncio
+
+from django.utils.functional import SimpleLazyObject
+
+from ..concurrency import lookup
+from ..friendships import friends_of, mutual_friends_preview
+from ..identity import current_identity_map
+from ..models import QuestionModel, SuggestionModel, UserModel
+from ..replicas import allow_replica_reads
 
 
 def get_user(user_id):
     if type(user_id) == int:
-        user = UserModel.objects.get(pk=user_id)
+        user = current_identity_map().get(user_id)
     elif type(user_id) == str:
-        user = UserModel.objects.get(pk=user_id)
+        user = current_identity_map().get(user_id)
     else:
         user = user_id
     return user
 
 
+def get_user_by_username(username):
+    return current_identity_map().get_by_username(username)
+
+
+def get_logged_in_user(request):
+    try:
+        return get_user(request.session['_auth_user_id'])
+    except KeyError:
+        return None
+
+
+# columns rendered in question lists, fetched with single joined query
+FEED_COLUMNS = ('id', 'date', 'content', 'owner_id',
+                'answer', 'answer__content', 'answer__date',
+                'asked_by', 'asked_by__username')
+
+
+class AsyncViewMixIn:
+    # class based view with coroutine handlers; Django 3.2 awaits only
+    # function views, so view returned by as_view is marked as coroutine
+    # function and remaining handlers of View are made async
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        view._is_coroutine = asyncio.coroutines._is_coroutine
+        return view
+
+    async def options(self, request, *args, **kwargs):
+        return super().options(request, *args, **kwargs)
+
+    async def http_method_not_allowed(self, request, *args, **kwargs):
+        return super().http_method_not_allowed(request, *args, **kwargs)
+
+
+class ReplicaReadsMixIn:
+    # read-only queries of view go to replicas, unless user wrote
+    # something in last REPLICA_STICKINESS seconds
+
+    def setup(self, request, *args, **kwargs):
+        super().setup(request, *args, **kwargs)
+        allow_replica_reads()
+
+
 class QuestionsMixIn:
 
     def questions_with_answers(self, user):
+        answered_questions = self.answered_questions(user)
+        return self.with_answers(answered_questions)
+
+    def answered_questions(self, user):
         answered_questions = QuestionModel.objects.filter(
-            owner=user).exclude(answer=None).order_by('date')[::-1]
-        answers = [question.answer for question in answered_questions]
-        return list(zip(answered_questions, answers))
+            owner=user).exclude(answer=None).order_by('-date', '-id')
+        return self.question_feed(answered_questions)
+
+    def question_feed(self, questions):
+        return questions.select_related(
+            'answer', 'asked_by').only(*FEED_COLUMNS)
+
+    def with_answers(self, questions):
+        answers = [question.answer for question in questions]
+        return list(zip(questions, answers))
 
     @staticmethod
     def add_num_unanswered_to_context(func, *args, **kwargs):
         def context_with_unanswered(self, *args, **kwargs):
             context = func(self, *args, **kwargs)
             user_id = args[0]
-            context["num_unanswered"] = self.get_num_unanswered(user_id)
+            # lazy, navigation bar cache hit does not need it
+            context["num_unanswered"] = SimpleLazyObject(
+                lambda: self.get_num_unanswered(user_id))
+            return context
+        return context_with_unanswered
+
+    @staticmethod
+    def add_num_unanswered_to_async_context(func, *args, **kwargs):
+        async def context_with_unanswered(self, *args, **kwargs):
+            user_id = args[0]
+            # looked up while decorated coroutine builds rest of context
+            context, num_unanswered = await asyncio.gather(
+                func(self, *args, **kwargs),
+                lookup(self.get_num_unanswered, user_id))
+            context["num_unanswered"] = num_unanswered
             return context
         return context_with_unanswered
 
     def get_num_unanswered(self, user_id):
         user = get_user(user_id)
-        unanswered_questions = self.unanswered_questions(user)
-        return len(unanswered_questions)
+        return user.num_unanswered
 
     def unanswered_questions(self, user):
         unanswered_questions = QuestionModel.objects.filter(
@@ -46,25 +122,59 @@ class FriendsMixIn:
         def context_with_invites(self, *args, **kwargs):
             context = func(self, *args, **kwargs)
             user_id = args[0]
-            context["num_invites"] = self.get_num_invites(user_id)
+            context["num_invites"] = SimpleLazyObject(
+                lambda: self.get_num_invites(user_id))
+            return context
+        return context_with_invites
+
+    @staticmethod
+    def add_num_invites_to_async_context(func, *args, **kwargs):
+        async def context_with_invites(self, *args, **kwargs):
+            user_id = args[0]
+            context, num_invites = await asyncio.gather(
+                func(self, *args, **kwargs),
+                lookup(self.get_num_invites, user_id))
+            context["num_invites"] = num_invites
             return context
         return context_with_invites
 
     def get_num_invites(self, user_id):
         user = get_user(user_id)
-        user_invites = self.user_friends(user, accepted=False)
-        return len(user_invites)
+        return user.num_invites
 
     def user_friends(self, user, accepted=True):
-        friends = list(user.friends.all())
-        second_friends = [f.first for f in user.friends_second.all()]
-        friends_accepted = [f.accepted for f in user.friendsmodel_set.all()]
-        second_accepted = [f.accepted for f in user.friends_second.all()]
-        friends_with_accepted = list(
-            zip(friends + second_friends, friends_accepted + second_accepted))
-        filtered = filter(lambda t: t[1] == accepted, friends_with_accepted)
+        return friends_of(user, accepted)
 
-        return [f[0] for f in filtered]
+    def mutual_friends(self, user, other, limit=5):
+        return mutual_friends_preview(user, other, limit)
+
+    @staticmethod
+    def add_suggestions_to_context(func, *args, **kwargs):
+        def context_with_suggestions(self, *args, **kwargs):
+            context = func(self, *args, **kwargs)
+            user_id = args[0]
+            context["suggestions"] = self.get_suggestions(user_id)
+            return context
+        return context_with_suggestions
+
+    @staticmethod
+    def add_suggestions_to_async_context(func, *args, **kwargs):
+        async def context_with_suggestions(self, *args, **kwargs):
+            user_id = args[0]
+            context, suggestions = await asyncio.gather(
+                func(self, *args, **kwargs),
+                lookup(lambda: list(self.get_suggestions(user_id))))
+            context["suggestions"] = suggestions
+            return context
+        return context_with_suggestions
+
+    def get_suggestions(self, user_id, limit=5):
+        user = get_user(user_id)
+        suggestions = SuggestionModel.objects.filter(user=user).select_related(
+            'suggested').only('mutual_friends', 'suggested__username',
+                              'suggested__avatar',
+                              'suggested__avatar_thumbnails')
+        return suggestions.order_by('-mutual_friends')[:limit]
 
 
 class AvatarMinIn:
@@ -73,7 +183,19 @@ class AvatarMinIn:
     def add_avatar_to_context(func, *args, **kwargs):
         def context_with_avatar(self, *args, **kwargs):
             context = func(self, *args, **kwargs)
-            user = get_user(args[0])
-            context['user_avatar'] = user.avatar
+            user_id = args[0]
+            context['user_avatar'] = SimpleLazyObject(
+                lambda: get_user(user_id).avatar)
+            return context
+        return context_with_avatar
+
+    @staticmethod
+    def add_avatar_to_async_context(func, *args, **kwargs):
+        async def context_with_avatar(self, *args, **kwargs):
+            user_id = args[0]
+            context, avatar = await asyncio.gather(
+                func(self, *args, **kwargs),
+                lookup(lambda: get_user(user_id).avatar))
+            context['user_avatar'] = avatar
             return context
         return context_with_avatar
@@ -1,16 +1,23 @@
 import os
+from functools import partial
 
 from django.contrib.auth import authenticate, login
-from django.contrib.auth.views import LoginView, LogoutView
-from django.core.mail import send_mail
-from django.core.paginator import Paginator
-from django.http.response import HttpResponseRedirect
+from django.db import IntegrityError, connection, transaction
+from django.http.response import HttpResponseRedirect, JsonResponse
 from django.shortcuts import render, reverse
+from django.utils.functional import SimpleLazyObject
 from django.views.generic.base import View
 from django.views.generic.edit import FormMixin, FormView
 
-from .forms import AnswerForm, ProfileImageForm, QuestionForm, SignUpForm
+from .concurrency import gather, lookup, run
+from .counters import change_counter
+from .forms import (AnswerForm, AnswerFormSet, ProfileImageForm, QuestionForm,
+                    SignUpForm)
+from .mail import enqueue_mail
 from .models import AnswerModel, FriendsModel, UserModel
+from .pagination import KeysetPaginator
+from .profiles import bump_profile_version, relationship
+from .thumbnails import generate_thumbnails
 from .view.MixIns import *
 
 
@@ -18,22 +25,6 @@ def index(request):
     return render(request, "ask/index.html")
 
 
-class CustomLoginView(LoginView):
-
-    def form_valid(self, form):
-        self.request.session['logged_in'] = True
-        self.request.session['username'] = form.cleaned_data['username']
-        return super().form_valid(form)
-
-
-class CustomLogoutView(LogoutView):
-
-    def post(self, request, *args, **kwargs):
-        del request['logged_in']
-        del request['username']
-        super().post(request, *args, **kwargs)
-
-
 class SignUpView(FormView):
     template_name = 'ask/signup.html'
     form_class = SignUpForm
@@ -42,14 +33,14 @@ class SignUpView(FormView):
     def post(self, request, *args, **kwargs):
         form = self.get_form()
         if form.is_valid():
-            user = self.form_to_model(form)
-            user.set_password(form.cleaned_data['password'])
-            user.save()
-            send_mail("Account created in Questions&Answers",
-                      "Thank you for creating account",
-                      "from@example.com",
-                      [user.email],
-                      fail_silently=False)
+            with transaction.atomic():
+                user = self.form_to_model(form)
+                user.set_password(form.cleaned_data['password'])
+                user.save()
+                enqueue_mail("Account created in Questions&Answers",
+                             "Thank you for creating account",
+                             "from@example.com",
+                             [user.email])
             self.log_in(user.username, form.cleaned_data['password'], request)
             return self.form_valid(form)
         else:
@@ -66,58 +57,60 @@ class SignUpView(FormView):
         return UserModel(**userdata)
 
     def log_in(self, username, password, request):
+        # session keeps only authentication keys, templates read user
+        # from request.user
         user = authenticate(request, username=username, password=password)
         if user:
             login(request, user)
 
-        request.session['logged_in'] = True
-        request.session['username'] = username
 
+class ProfileView(AsyncViewMixIn, ReplicaReadsMixIn, View, QuestionsMixIn, FriendsMixIn):
 
-class ProfileView(View, QuestionsMixIn, FriendsMixIn):
-
-    def get(self, request):
-        try:
-            user = UserModel.objects.get(
-                pk=request.session['_auth_user_id'])
-        except KeyError:
+    async def get(self, request):
+        user = await run(get_logged_in_user, request)
+        if user is None:
             return HttpResponseRedirect(reverse('ask:login'))
 
-        context = self.get_context(user)
-        self.add_pagination(context, request)
-        return render(request, "ask/profile.html", context=context)
+        context = await self.get_context(user, request)
+        return await run(render, request, "ask/profile.html", context=context)
 
-    @QuestionsMixIn.add_num_unanswered_to_context
-    @FriendsMixIn.add_num_invites_to_context
-    @AvatarMinIn.add_avatar_to_context
-    def get_context(self, user):
-        questions_with_answers = self.questions_with_answers(
-            user)
-        context = {"questions_with_answers": questions_with_answers}
+    @QuestionsMixIn.add_num_unanswered_to_async_context
+    @FriendsMixIn.add_num_invites_to_async_context
+    @AvatarMinIn.add_avatar_to_async_context
+    async def get_context(self, user, request):
+        page = await lookup(self.answered_page, user,
+                            request.GET.get('after'), request.GET.get('before'))
+        context = {"questions_with_answers": page}
         return context
 
-    def add_pagination(self, context, request):
-        paginator = Paginator(context["questions_with_answers"], 6)
-        page = request.GET.get('page')
-        context["questions_with_answers"] = paginator.get_page(page)
+    def answered_page(self, user, after=None, before=None):
+        paginator = KeysetPaginator(self.answered_questions(user), 6)
+        page = paginator.get_page(after=after, before=before)
+        page.object_list = self.with_answers(page.object_list)
+        return page
 
 
-class UserView(View, FormMixin, QuestionsMixIn, FriendsMixIn):
+class UserView(AsyncViewMixIn, ReplicaReadsMixIn, View, FormMixin, QuestionsMixIn, FriendsMixIn):
     form_class = QuestionForm
 
-    def get(self, request, username):
-        context = self.get_context(
-            request.session['_auth_user_id'], username)
-        return render(request, "ask/user.html", context=context)
-
-    def post(self, request, username):
-        form = self.get_form()
-        context = self.get_context(
-            request.session['_auth_user_id'], username)
-        if form.is_valid():
-            self.dispatch_action(form.cleaned_data, context,
-                                 username, request.session['_auth_user_id'])
-        return render(request, "ask/user.html", context=context)
+    async def get(self, request, username):
+        logedin_user = await run(self.get_auth_user, request)
+        context = await self.get_context(logedin_user, username)
+        return await run(render, request, "ask/user.html", context=context)
+
+    async def post(self, request, username):
+        form = await run(self.get_form)
+        logedin_user = await run(self.get_auth_user, request)
+        context = await self.get_context(logedin_user, username)
+        if await run(form.is_valid):
+            await run(self.dispatch_action, form.cleaned_data, context,
+                      username, logedin_user)
+        # context could be changed by action, so response is not cached
+        context['profile_cache'] = None
+        return await run(render, request, "ask/user.html", context=context)
+
+    def get_auth_user(self, request):
+        return get_user(request.session['_auth_user_id'])
 
     def dispatch_action(self, cleaned_data, context, username, auth_user_id):
         if cleaned_data['action'] == 'ask_question':
@@ -131,24 +124,32 @@ class UserView(View, FormMixin, QuestionsMixIn, FriendsMixIn):
             context['is_friend'] = False
             self.remove_friend(auth_user_id, username)
 
-    @QuestionsMixIn.add_num_unanswered_to_context
-    @FriendsMixIn.add_num_invites_to_context
-    @AvatarMinIn.add_avatar_to_context
-    def get_context(self, logedin_user_id, username):
-        viewed_user = UserModel.objects.get(username=username)
-        questions_with_answers = self.questions_with_answers(viewed_user)
-        is_friend_is_accepted = self.is_friend_is_accepted(
-            logedin_user_id, viewed_user)
+    @QuestionsMixIn.add_num_unanswered_to_async_context
+    @FriendsMixIn.add_num_invites_to_async_context
+    @AvatarMinIn.add_avatar_to_async_context
+    async def get_context(self, logedin_user, username):
+        viewed_user = await lookup(get_user_by_username, username)
+        # lazy, not needed when profile is cached
+        questions_with_answers = SimpleLazyObject(
+            lambda: self.questions_with_answers(viewed_user))
+        is_friend_is_accepted, (mutual_friends, num_mutual_friends) = \
+            await gather(
+                partial(self.is_friend_is_accepted, logedin_user, viewed_user),
+                partial(self.mutual_friends, logedin_user, viewed_user))
         context = {
             'username': username,
             'questions_with_answers': questions_with_answers,
             'is_friend': is_friend_is_accepted[0],
             'accepted': is_friend_is_accepted[1],
+            'mutual_friends': mutual_friends,
+            'num_mutual_friends': num_mutual_friends,
+            'profile_cache': (viewed_user.id, relationship(
+                *is_friend_is_accepted)),
         }
         return context
 
     def is_friend_is_accepted(self, logedin_user_id, viewed_user):
-        logedin_user = UserModel.objects.get(pk=logedin_user_id)
+        logedin_user = get_user(logedin_user_id)
 
         try:
             friends = FriendsModel.objects.get(
@@ -164,69 +165,169 @@ class UserView(View, FormMixin, QuestionsMixIn, FriendsMixIn):
         else:
             return True, friends.accepted
 
+    @transaction.atomic
     def create_question(self, owner_username, logedin_user_id, content):
-        asked_by = UserModel.objects.filter(pk=logedin_user_id)[0]
-        owner = UserModel.objects.filter(username=owner_username)[0]
+        asked_by = get_user(logedin_user_id)
+        owner = get_user_by_username(owner_username)
         question = QuestionModel(owner=owner,
                                  asked_by=asked_by,
                                  content=content)
         question.save()
 
+    @transaction.atomic
     def add_friend(self, logedin_user_id, username):
-        logged_in_user = UserModel.objects.get(pk=logedin_user_id)
-        viewed_user = UserModel.objects.get(username=username)
-        friend = FriendsModel(first=logged_in_user, second=viewed_user)
-        friend.save()
-
+        logged_in_user = get_user(logedin_user_id)
+        viewed_user = get_user_by_username(username)
+        # invitation from viewed user is accepted instead of inviting back,
+        # so the pair keeps one row
+        invitation = self.invitation(viewed_user, logged_in_user)
+        if invitation is None:
+            try:
+                with transaction.atomic():
+                    FriendsModel.objects.get_or_create(
+                        first=logged_in_user, second=viewed_user)
+                return
+            except IntegrityError:
+                # viewed user invited logged in user meanwhile
+                invitation = self.invitation(viewed_user, logged_in_user)
+        if not invitation.accepted:
+            invitation.accepted = True
+            invitation.save()
+
+    def invitation(self, first, second):
+        return FriendsModel.objects.select_for_update().filter(
+            first=first, second=second).first()
+
+    @transaction.atomic
     def remove_friend(self, logedin_user_id, username):
-        logged_in_user = UserModel.objects.get(pk=logedin_user_id)
-        viewed_user = UserModel.objects.get(username=username)
+        logged_in_user = get_user(logedin_user_id)
+        viewed_user = get_user_by_username(username)
         FriendsModel.objects.filter(
             first=logged_in_user, second=viewed_user).delete()
         FriendsModel.objects.filter(
             first=viewed_user, second=logged_in_user).delete()
 
 
-class UnansweredView(View, FormMixin, QuestionsMixIn, FriendsMixIn):
+class UnansweredView(AsyncViewMixIn, View, FormMixin, QuestionsMixIn, FriendsMixIn):
     form_class = AnswerForm
+    paginate_by = 10
 
-    def get(self, request):
-        try:
-            user = UserModel.objects.get(
-                pk=request.session['_auth_user_id'])
-        except KeyError:
+    async def get(self, request):
+        user = await run(get_logged_in_user, request)
+        if user is None:
             return HttpResponseRedirect(reverse('ask:login'))
 
-        context = self.get_context(user)
-        return render(request, 'ask/unanswered.html', context=context)
-
-    @QuestionsMixIn.add_num_unanswered_to_context
-    @FriendsMixIn.add_num_invites_to_context
-    @AvatarMinIn.add_avatar_to_context
-    def get_context(self, user):
-        unanswered_questions = self.unanswered_questions(user)
-        unanswered_questions = unanswered_questions.order_by('date')[::-1]
-        context = {'unanswered_questions': unanswered_questions}
-        return context
-
-    def post(self, request):
-        form = self.get_form()
-        if form.is_valid():
-            answer = self.create_answer(form.cleaned_data['answer_content'])
-            self.attach_answer_to_question(
-                answer, form.cleaned_data['question_id'])
+        context = await self.get_context(user, request.GET.get('after'))
+        return await run(render, request, 'ask/unanswered.html', context=context)
+
+    @QuestionsMixIn.add_num_unanswered_to_async_context
+    @FriendsMixIn.add_num_invites_to_async_context
+    @AvatarMinIn.add_avatar_to_async_context
+    async def get_context(self, user, after=None):
+        return {'unanswered_questions':
+                await lookup(self.unanswered_page, user, after)}
+
+    def unanswered_page(self, user, after=None):
+        unanswered_questions = self.question_feed(
+            self.unanswered_questions(user))
+        paginator = KeysetPaginator(unanswered_questions, self.paginate_by)
+        return paginator.get_page(after=after)
+
+    async def post(self, request):
+        user = await run(get_logged_in_user, request)
+        if user is None:
+            return HttpResponseRedirect(reverse('ask:login'))
 
-        return self.get(request)
+        form = await run(self.get_form)
+        if await run(form.is_valid):
+            await run(self.answer_question, user,
+                      form.cleaned_data['answer_content'],
+                      form.cleaned_data['question_id'])
+
+        return await self.get(request)
+
+    @transaction.atomic
+    def answer_question(self, user, content, question_id):
+        # row is locked and must still be unanswered, so concurrent answers
+        # to one question decrement num_unanswered once
+        question = self.unanswered_questions(user).select_for_update().filter(
+            id=question_id).first()
+        if question is None:
+            return
+        question.answer = self.create_answer(content)
+        question.save()
 
     def create_answer(self, content):
         answer = AnswerModel(content=content)
         answer.save()
         return answer
 
-    def attach_answer_to_question(self, answer, user_id):
-        question = QuestionModel.objects.get(id=user_id)
-        question.answer = answer
-        question.save()
+
+class UnansweredFragmentView(UnansweredView):
+    http_method_names = ['get']
+
+    async def get(self, request):
+        user = await run(get_logged_in_user, request)
+        if user is None:
+            return HttpResponseRedirect(reverse('ask:login'))
+
+        context = {'unanswered_questions': await lookup(
+            self.unanswered_page, user, request.GET.get('after'))}
+        return await run(render, request, 'ask/unanswered_questions.html',
+                         context=context)
+
+
+class UnansweredBulkView(View, QuestionsMixIn):
+    http_method_names = ['post']
+
+    def post(self, request):
+        try:
+            user = get_user(request.session['_auth_user_id'])
+        except KeyError:
+            return HttpResponseRedirect(reverse('ask:login'))
+
+        formset = AnswerFormSet(request.POST, prefix='answers')
+        if not formset.is_valid():
+            return JsonResponse({'errors': formset.errors}, status=400)
+
+        answers = {}
+        for form in formset:
+            if form.cleaned_data:
+                answers.setdefault(form.cleaned_data['question_id'],
+                                   form.cleaned_data['answer_content'])
+        answered = self.answer_questions(user, answers)
+        return JsonResponse({
+            'answered': answered,
+            'num_unanswered': get_user(user.id).num_unanswered,
+        })
+
+    @transaction.atomic
+    def answer_questions(self, user, answers):
+        questions = list(self.unanswered_questions(user).filter(
+            id__in=answers).select_for_update().only('id', 'owner_id'))
+        if not questions:
+            return []
+
+        new_answers = [AnswerModel(content=answers[question.id])
+                       for question in questions]
+        new_answers = self.bulk_create_answers(new_answers)
+        for question, answer in zip(questions, new_answers):
+            question.answer = answer
+        QuestionModel.objects.bulk_update(questions, ['answer'])
+        # bulk_update does not send post_save, so counter and cached
+        # profile are changed here
+        change_counter('num_unanswered', {user.id: -len(questions)})
+        bump_profile_version([user.id])
+        return [question.id for question in questions]
+
+    def bulk_create_answers(self, answers):
+        # primary keys are needed for questions, but not every database
+        # returns them from bulk insert (e.g. SQLite)
+        if connection.features.can_return_rows_from_bulk_insert:
+            return AnswerModel.objects.bulk_create(answers)
+        for answer in answers:
+            answer.save()
+        return answers
 
 
 class SettingsView(FormView, QuestionsMixIn, FriendsMixIn):
@@ -236,8 +337,7 @@ class SettingsView(FormView, QuestionsMixIn, FriendsMixIn):
 
     def get(self, request):
         try:
-            user = UserModel.objects.get(
-                pk=request.session['_auth_user_id'])
+            user = get_user(request.session['_auth_user_id'])
         except KeyError:
             return HttpResponseRedirect(reverse('ask:login'))
 
@@ -255,18 +355,23 @@ class SettingsView(FormView, QuestionsMixIn, FriendsMixIn):
         form = self.get_form()
         if form.is_valid():
             user = self.get_logged_in_user(request)
-            self.remove_old_avatar(user)
+            # previous avatar may be shared with other users, it is removed
+            # by `manage.py sweep_avatars` once nobody refers to it
             user.avatar = form.cleaned_data['image']
-            user.save()
+            user.avatar_thumbnails = False
+            user.save(update_fields=['avatar', 'avatar_thumbnails'])
+            generate_thumbnails(user)
             return self.form_valid(form)
         else:
             return self.form_invalid(form)
 
+    def form_invalid(self, form):
+        # same navigation bar as on get, with form errors
+        context = self.get_context(self.get_logged_in_user(self.request))
+        context['form'] = form
+        return self.render_to_response(context)
+
     def get_logged_in_user(self, request):
         user_id = request.session['_auth_user_id']
-        user = UserModel.objects.get(pk=user_id)
+        user = get_user(user_id)
         return user
-
-    def remove_old_avatar(self, user):
-        if user.__dict__['avatar']:
-            user.avatar.delete(save=True)